@@ -51,7 +51,18 @@ def main() -> None:
         action="store_true",
         help="Resume generation by skipping existing outputs and loading state",
     )
-    parser.add_argument("--seed", type=int, help="Random seed for reproducible runs")
+    parser.add_argument(
+        "--verify-outputs",
+        action="store_true",
+        help="On resume, also check digests of rendered outputs and re-render corrupt ones",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        help="Seed for reproducible runs; each ID draws from its own stream under it. "
+        "The batch and enumeration planners are reproducible only for the same "
+        "seed, NFT count and existing state, not per ID",
+    )
     parser.add_argument(
         "--workers", type=int, help="Number of worker processes for trait generation"
     )
@@ -71,7 +82,9 @@ def main() -> None:
     )
     parser.add_argument("--max-attempts", type=int, help="Max attempts per NFT")
     parser.add_argument(
-        "--max-trait-attempts", type=int, help="Max attempts per trait selection"
+        "--max-trait-attempts",
+        type=int,
+        help="DEPRECATED: traits are drawn from their legal options only, so no per-trait retries happen",
     )
     parser.add_argument(
         "--dry-run",
@@ -79,10 +92,52 @@ def main() -> None:
         help="Do not write images/metadata; just simulate",
     )
     parser.add_argument(
+        "--journal-sync-every",
         "--checkpoint-every",
+        dest="journal_sync_every",
         type=int,
         default=25,
-        help="Checkpoint resume state every N IDs",
+        help="Fsync the run journal every N rendered NFTs; the journal is "
+        "always appended per NFT (--checkpoint-every is the old name)",
+    )
+    parser.add_argument(
+        "--plan-file",
+        help="Plan file to reuse and update (default: output/plan.json)",
+    )
+    parser.add_argument(
+        "--plan-only",
+        action="store_true",
+        help="Plan trait assignments and write the plan file without rendering",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        help="Plan with vectorized NumPy candidate batches of this many rows "
+        "(0 disables; default: automatic for 100k+ NFTs when numpy is installed)",
+    )
+    parser.add_argument(
+        "--enumeration-limit",
+        type=int,
+        help="Plan by enumerating every valid combination when there are at most "
+        "this many and sampling with retries would cost more (0 disables; default: 5M)",
+    )
+    parser.add_argument(
+        "--render-id",
+        dest="render_ids",
+        nargs="+",
+        type=int,
+        metavar="ID",
+        help="Re-render only these planned IDs and exit",
+    )
+    parser.add_argument(
+        "--check-feasibility",
+        action="store_true",
+        help="Report how many unique NFTs the configuration allows and exit",
+    )
+    parser.add_argument(
+        "--skip-feasibility",
+        action="store_true",
+        help="Plan even when the requested number of NFTs is provably unreachable",
     )
     parser.add_argument(
         "--skip-validate",
@@ -172,6 +227,25 @@ def main() -> None:
             f"🎨 Rules loaded: {len(generator.ruler.rules)} compatibility rules"
         )
 
+        if args.check_feasibility:
+            report = generator.analyze_feasibility(args.num_nfts)
+            for line in report.summary():
+                logging.info(line)
+            if not report.feasible:
+                logging.error(f"❌ {args.num_nfts} NFTs cannot be generated")
+            return
+
+        if args.render_ids:
+            rendered = generator.render_ids(
+                args.render_ids,
+                compact_metadata=args.compact_metadata,
+                img_format=args.format,
+                quality=args.quality,
+                plan_file=args.plan_file,
+            )
+            logging.info(f"Re-rendered {len(rendered)}/{len(args.render_ids)} NFTs")
+            return
+
         # Define progress callback
         def progress_callback(current: int, total: int) -> None:
             if current % 100 == 0:
@@ -184,10 +258,16 @@ def main() -> None:
             workers=args.workers,
             compact_metadata=args.compact_metadata,
             dry_run=args.dry_run,
-            checkpoint_every=args.checkpoint_every,
+            journal_sync_every=args.journal_sync_every,
             img_format=args.format,
             quality=args.quality,
             progress_callback=progress_callback,
+            plan_file=args.plan_file,
+            plan_only=args.plan_only,
+            batch_size=args.batch_size,
+            check_feasibility=not args.skip_feasibility,
+            enumeration_limit=args.enumeration_limit,
+            verify_outputs=args.verify_outputs,
         )
 
         logging.info("✅ NFT generation completed successfully!")
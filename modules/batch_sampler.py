@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Batch sampler module for NFT Generator
+Draws thousands of candidate trait combinations at once as an integer
+matrix with NumPy and filters rule violations with compiled pair masks.
+"""
+
+import logging
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from modules.rule_engine import CompiledRules
+from modules.trait_index import TraitIndex
+
+# Optional import for vectorized candidate generation
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+
+class BatchCandidateSampler:
+    """
+    Vectorized candidate generator for large planning runs.
+
+    Rows are candidates and columns are trait types in ``trait_order``;
+    cells hold the option index, or the trait's option count when the trait
+    is not included. Every trait is drawn independently and rule-violating
+    rows are discarded, so survivors follow the weights conditioned on
+    validity rather than the step-by-step renormalization of TraitSampler.
+    """
+
+    def __init__(
+        self,
+        index: TraitIndex,
+        rules: CompiledRules,
+        generation_order: List[str],
+        include_percent: Dict[str, float],
+        option_weights: Dict[str, List[float]],
+        seed: int,
+        batch_size: int,
+    ):
+        """
+        Initialize batch sampler.
+
+        Args:
+            index: Trait index providing option IDs
+            rules: Compiled compatibility rules
+            generation_order: Trait order used for the returned trait dicts
+            include_percent: Inclusion probability in percent per trait type
+            option_weights: Option weights per trait type, in index order
+            seed: Seed for the NumPy generator
+            batch_size: Number of candidate rows drawn per batch
+
+        Raises:
+            ImportError: If NumPy is not installed
+        """
+        if not NUMPY_AVAILABLE:
+            raise ImportError("Batch candidate sampling requires numpy")
+
+        self.index = index
+        self.batch_size = batch_size
+        self.trait_order = index.trait_order
+        self.generation_order = list(generation_order)
+        self._rng = np.random.default_rng(seed)
+        self._columns = [self.trait_order.index(t) for t in self.generation_order]
+        self._names = [index.option_names[t] for t in self.trait_order]
+        self._counts = [len(names) for names in self._names]
+        self._include = np.array(
+            [include_percent[t] for t in self.trait_order], dtype=np.float64
+        )
+        self._probs = []
+        for trait_type in self.trait_order:
+            weights = np.asarray(option_weights[trait_type], dtype=np.float64)
+            self._probs.append(weights / weights.sum())
+
+        # Conflict tables for every trait pair touched by a rule; the extra
+        # last row/column stands for "not included" and never conflicts
+        self._pair_tables: List[Tuple[int, int, "np.ndarray"]] = []
+        for i, type_i in enumerate(self.trait_order):
+            offset_i = index.offsets[type_i]
+            for j in range(i + 1, len(self.trait_order)):
+                type_j = self.trait_order[j]
+                offset_j = index.offsets[type_j]
+                mask_j = index.trait_masks[type_j]
+                table = None
+                for a in range(self._counts[i]):
+                    excluded = (rules.exclusion_masks[offset_i + a] & mask_j) >> offset_j
+                    if not excluded:
+                        continue
+                    if table is None:
+                        table = np.zeros(
+                            (self._counts[i] + 1, self._counts[j] + 1), dtype=bool
+                        )
+                    while excluded:
+                        low = excluded & -excluded
+                        table[a, low.bit_length() - 1] = True
+                        excluded ^= low
+                if table is not None:
+                    self._pair_tables.append((i, j, table))
+
+        self._buffer: Deque[Tuple[int, ...]] = deque()
+        self.rejected = 0
+
+    def sample_batch(self, size: Optional[int] = None) -> "np.ndarray":
+        """
+        Draw a matrix of rule-valid candidate rows.
+
+        Args:
+            size: Rows to draw before filtering (default: batch_size)
+
+        Returns:
+            Integer matrix of surviving candidates, columns in trait_order
+        """
+        size = size or self.batch_size
+        columns = []
+        draws = self._rng.random((size, len(self.trait_order)))
+        included = draws * 100 < self._include
+        for col, count in enumerate(self._counts):
+            picks = self._rng.choice(count, size=size, p=self._probs[col])
+            columns.append(np.where(included[:, col], picks, count))
+        matrix = np.stack(columns, axis=1).astype(np.int32, copy=False)
+
+        valid = np.ones(size, dtype=bool)
+        for i, j, table in self._pair_tables:
+            valid &= ~table[matrix[:, i], matrix[:, j]]
+        self.rejected += int(size - valid.sum())
+        return matrix[valid]
+
+    def next_candidate(self) -> Optional[Dict[str, str]]:
+        """
+        Return the next rule-valid candidate as a trait dict.
+
+        Returns:
+            Trait dict in generation order, or None if a whole batch was
+            rejected by the rules
+        """
+        if not self._buffer:
+            survivors = self.sample_batch()
+            if not len(survivors):
+                logging.debug("Batch of candidates fully rejected by rules")
+                return None
+            self._buffer.extend(map(tuple, survivors.tolist()))
+
+        row = self._buffer.popleft()
+        traits = {}
+        for col in self._columns:
+            idx = row[col]
+            if idx < self._counts[col]:
+                traits[self.trait_order[col]] = self._names[col][idx]
+        return traits
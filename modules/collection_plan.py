@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Collection plan module for NFT Generator
+Holds the ID -> trait assignments produced by the planning phase so that
+rendering can be scheduled, parallelized and resumed independently.
+"""
+
+import json
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from modules.resource_manager import resource_manager
+from modules.trait_index import TraitIndex
+
+PLAN_FORMAT_VERSION = 1
+
+
+@dataclass
+class PlannedNFT:
+    """A single planned NFT: its ID, selected traits and trait hash."""
+    nft_id: int
+    traits: Dict[str, str]
+    nft_hash: str
+    combination_id: Optional[int] = None
+
+
+@dataclass
+class CollectionPlan:
+    """Ordered set of planned NFTs keyed by NFT ID."""
+    items: Dict[int, PlannedNFT] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __iter__(self) -> Iterator[PlannedNFT]:
+        return iter(self.items.values())
+
+    def __contains__(self, nft_id: int) -> bool:
+        return nft_id in self.items
+
+    def add(self, item: PlannedNFT) -> None:
+        """Add or replace the planned NFT for ``item.nft_id``."""
+        self.items[item.nft_id] = item
+
+    def get(self, nft_id: int) -> Optional[PlannedNFT]:
+        """Return the planned NFT for an ID, or None if it is not planned."""
+        return self.items.get(nft_id)
+
+    def select(self, nft_ids: List[int]) -> List[PlannedNFT]:
+        """Return planned NFTs for the given IDs, preserving their order."""
+        return [self.items[i] for i in nft_ids if i in self.items]
+
+    def render_order(self, nft_ids: List[int], index: TraitIndex) -> List[PlannedNFT]:
+        """
+        Return planned NFTs for the given IDs in cache-friendly render order.
+
+        NFTs are sorted by their layer stack in composition order, compared
+        as tuples of global option IDs, so NFTs sharing leading layers
+        render back to back and the image and composite caches stay warm.
+        Which traits an ID gets is unaffected.
+
+        Args:
+            nft_ids: IDs to render
+            index: Trait index whose trait order is the composition order
+
+        Returns:
+            Planned NFTs sorted by layer stack
+        """
+        order = [(t, index.option_ids[t]) for t in index.trait_order]
+
+        def stack(item: PlannedNFT) -> Tuple[int, ...]:
+            traits = item.traits
+            return tuple(ids[traits[t]] for t, ids in order if t in traits)
+
+        return sorted(self.select(nft_ids), key=stack)
+
+    def save(self, path: Union[str, Path]) -> None:
+        """
+        Write the plan to disk atomically.
+
+        Args:
+            path: Destination plan file
+        """
+        data = {
+            "version": PLAN_FORMAT_VERSION,
+            "items": [
+                {
+                    "id": item.nft_id,
+                    "traits": item.traits,
+                    "hash": item.nft_hash,
+                    "combination": item.combination_id,
+                }
+                for item in sorted(self.items.values(), key=lambda x: x.nft_id)
+            ],
+        }
+        with resource_manager.atomic_file_write(Path(path)) as f:
+            json.dump(data, f, separators=(",", ":"))
+        logging.info(f"Saved collection plan with {len(self.items)} NFTs: {path}")
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "CollectionPlan":
+        """
+        Load a plan previously written with ``save``.
+
+        Args:
+            path: Plan file to read
+
+        Returns:
+            CollectionPlan: Loaded plan
+
+        Raises:
+            ValueError: If the file is not a supported plan
+        """
+        with open(path, "r") as f:
+            data = json.load(f)
+        if not isinstance(data, dict) or data.get("version") != PLAN_FORMAT_VERSION:
+            raise ValueError(f"Unsupported plan file format: {path}")
+        plan = cls()
+        for entry in data.get("items", []):
+            plan.add(
+                PlannedNFT(
+                    nft_id=int(entry["id"]),
+                    traits=dict(entry["traits"]),
+                    nft_hash=entry["hash"],
+                    combination_id=entry.get("combination"),
+                )
+            )
+        return plan
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Combination space module for NFT Generator
+Encodes trait combinations as single integers (mixed radix over option
+index plus a "not included" slot per trait type) for cheap deduplication.
+"""
+
+from typing import Dict, List, Optional
+
+from modules.trait_index import TraitIndex
+
+
+class CombinationSpace:
+    """
+    Mixed-radix encoding of trait combinations.
+
+    Each trait type in ``trait_order`` is one digit with radix
+    ``option_count + 1``: digit 0 means "not included", digit ``k + 1``
+    means the option at index ``k``. The first trait type is the least
+    significant digit. IDs are stable as long as trait_order and the option
+    lists do not change.
+    """
+
+    def __init__(self, index: TraitIndex):
+        """
+        Initialize combination space.
+
+        Args:
+            index: Trait index providing option order
+        """
+        self.index = index
+        self.trait_order = index.trait_order
+        self.radices: List[int] = [
+            len(index.option_names[t]) + 1 for t in self.trait_order
+        ]
+        self.places: Dict[str, int] = {}
+        place = 1
+        for trait_type, radix in zip(self.trait_order, self.radices):
+            self.places[trait_type] = place
+            place *= radix
+        # Total number of encodable combinations, including the empty one
+        self.size = place
+        self._digits: Dict[str, Dict[str, int]] = {
+            t: {name: k + 1 for k, name in enumerate(index.option_names[t])}
+            for t in self.trait_order
+        }
+
+    def encode(self, traits: Dict[str, str]) -> int:
+        """
+        Encode a trait selection as its combination ID.
+
+        Raises:
+            KeyError: If a trait type or option is not configured
+        """
+        places = self.places
+        digits = self._digits
+        return sum(places[t] * digits[t][name] for t, name in traits.items())
+
+    def try_encode(self, traits: Dict[str, str]) -> Optional[int]:
+        """Encode a trait selection, or return None if it is not encodable."""
+        try:
+            return self.encode(traits)
+        except KeyError:
+            return None
+
+    def decode(self, combination_id: int) -> Dict[str, str]:
+        """Decode a combination ID into a trait dict in trait_order order."""
+        traits = {}
+        for trait_type, radix in zip(self.trait_order, self.radices):
+            combination_id, digit = divmod(combination_id, radix)
+            if digit:
+                traits[trait_type] = self.index.option_names[trait_type][digit - 1]
+        return traits
@@ -9,6 +9,14 @@ from typing import Final
 
 # Cache settings
 DEFAULT_IMAGE_CACHE_SIZE: Final[int] = 128
+# Frequency sketch counters per cache entry, and increments (per cache
+# entry) between halvings of every counter
+FREQUENCY_SKETCH_WIDTH_FACTOR: Final[int] = 8
+FREQUENCY_SKETCH_SAMPLE_FACTOR: Final[int] = 10
+# Share of the image cache memory budget that partial composites may use
+COMPOSITE_CACHE_MEMORY_SHARE: Final[float] = 0.5
+# Share of the composite cache holding the most recent composites
+COMPOSITE_WINDOW_SHARE: Final[float] = 0.2
 
 # File paths
 OUTPUT_DIR: Final[str] = "output"
@@ -19,11 +27,50 @@ METADATA_DIR: Final[str] = "metadata"
 DEFAULT_MAX_ATTEMPTS: Final[int] = 1000
 DEFAULT_MAX_TRAIT_ATTEMPTS: Final[int] = 100
 
+# Vectorized (NumPy) candidate batches for large planning runs
+DEFAULT_CANDIDATE_BATCH_SIZE: Final[int] = 4096
+BATCH_PLANNING_THRESHOLD: Final[int] = 100_000
+
+# Planning by enumerating every valid combination (small trait spaces)
+ENUMERATION_LIMIT: Final[int] = 5_000_000
+ENUMERATION_POOL_FACTOR: Final[int] = 2
+# Share of the space a plan must fill to enumerate without a feasibility report
+ENUMERATION_MIN_FILL: Final[float] = 0.5
+
+# Pruning options that would complete a saturated pattern (tracker lookahead)
+LOOKAHEAD_TRIGGER_ATTEMPTS: Final[int] = 8
+LOOKAHEAD_MAX_ENTRIES: Final[int] = 2_000_000
+
+# Multiprocess rendering
+RENDER_CHUNKS_IN_FLIGHT_PER_WORKER: Final[int] = 4
+MAX_RENDER_CHUNK_SIZE: Final[int] = 32
+RENDER_RESULT_TIMEOUT_S: Final[int] = 300
+
 # Animation settings
 DEFAULT_GIF_DURATION_MS: Final[int] = 120
 DEFAULT_GIF_LOOP: Final[int] = 0
 
 # Resume functionality
-SEEN_HASHES_FILE: Final[str] = "seen_hashes.json"
-TRACKER_STATE_FILE: Final[str] = "tracker_state.json"
-RNG_STATE_FILE: Final[str] = "rng_state.json"
+SEEN_COMBINATIONS_FILE: Final[str] = "seen_combinations.bin"
+TRACKER_STATE_FILE: Final[str] = "tracker_state.bin"
+RUN_JOURNAL_FILE: Final[str] = "run_journal.bin"
+# Trait hashes kept by output directories from before the binary resume
+# state; read once on resume
+LEGACY_SEEN_HASHES_FILE: Final[str] = "seen_hashes.json"
+
+# Counter-based random streams, identified by (purpose, ...) under the run seed
+RNG_STREAM_CANDIDATES: Final[int] = 1
+RNG_STREAM_ID_ORDER: Final[int] = 2
+RNG_STREAM_BATCH: Final[int] = 3
+RNG_STREAM_ENUMERATION: Final[int] = 4
+RNG_STREAM_SELECT: Final[int] = 5
+
+# Two-phase generation
+PLAN_FILE: Final[str] = "plan.json"
+
+# Pre-flight feasibility analysis
+FEASIBILITY_STATE_LIMIT: Final[int] = 100_000
+FEASIBILITY_SAMPLES: Final[int] = 20_000
+FEASIBILITY_SEARCH_STEPS: Final[int] = 40
+FEASIBILITY_MAX_OPTIONAL_TRAITS: Final[int] = 10
+FEASIBILITY_FAILURE_WARN_PROBABILITY: Final[float] = 0.01
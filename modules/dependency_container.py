@@ -81,6 +81,8 @@ class DependencyContainer:
         cache_size = kwargs.get('cache_size', 128)
         max_memory_mb = kwargs.get('max_memory_mb', 512)
         max_similar = kwargs.get('max_similar', 1)
+        pattern_size = kwargs.get('pattern_size')
+        signature_traits = kwargs.get('signature_traits')
 
         # Create dependencies
         config_manager = self.get(ConfigManager) if ConfigManager in self._singletons else ConfigManager(
@@ -94,7 +96,7 @@ class DependencyContainer:
         )
 
         trait_tracker = self.get(TraitTracker) if TraitTracker in self._singletons else TraitTracker(
-            max_similar
+            max_similar, pattern_size, signature_traits
         )
 
         metadata_manager = self.get(MetadataManager) if MetadataManager in self._singletons else MetadataManager()
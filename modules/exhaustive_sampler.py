@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Exhaustive sampler module for NFT Generator
+Enumerates every rule-valid trait combination of a small enough space and
+draws from it without replacement, so planning never retries duplicates.
+"""
+
+import hashlib
+import heapq
+import math
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from modules.combination_space import CombinationSpace
+from modules.trait_sampler import DOMAIN_TABLE_CACHE_SIZE, TraitSampler
+
+
+class ExhaustiveSampler:
+    """
+    Weighted sampling without replacement over all valid combinations.
+
+    Combinations are enumerated depth-first in generation order, pruned to
+    the same legal domains TraitSampler draws from, and each carries the
+    probability TraitSampler would draw it with. Every combination gets an
+    Efraimidis-Spirakis key computed from a keyed hash of its combination
+    ID, so ascending key order is a weighted random permutation. A single
+    enumeration keeps only the ``pool_size`` smallest keys, so memory stays
+    bounded however large the space is.
+    """
+
+    def __init__(
+        self,
+        sampler: TraitSampler,
+        space: CombinationSpace,
+        seed: int,
+        pool_size: int,
+    ):
+        """
+        Initialize exhaustive sampler.
+
+        Args:
+            sampler: Trait sampler providing legal domains and weights
+            space: Combination space used to encode and decode combinations
+            seed: Seed for the per-combination keys
+            pool_size: Most combinations handed out by ``candidates``
+        """
+        self.sampler = sampler
+        self.space = space
+        self.pool_size = max(1, pool_size)
+        self.generation_order = sampler.generation_order
+        self._hash_key = (seed % (1 << 64)).to_bytes(8, "little")
+        self._id_bytes = max(1, (space.size.bit_length() + 7) // 8)
+        # Cached (option indices, log-probabilities) per domain table
+        self._domains: Dict[object, Tuple[List[int], List[float]]] = {}
+
+        # Per trait type in generation order: (trait type, log include
+        # probability or None, log exclude probability or None, place, offset)
+        self._levels = []
+        for trait_type in self.generation_order:
+            q = min(max(sampler.include_percent[trait_type], 0), 100) / 100
+            self._levels.append(
+                (
+                    trait_type,
+                    math.log(q) if q > 0 else None,
+                    math.log(1 - q) if q < 1 else None,
+                    space.places[trait_type],
+                    sampler.index.offsets[trait_type],
+                )
+            )
+
+        self.enumerated = 0
+        self.complete = False
+
+    def _domain(
+        self, trait_type: str, forbidden: int
+    ) -> Optional[Tuple[List[int], List[float]]]:
+        """Return legal option indices and their log-probabilities, or None."""
+        table = self.sampler.domain_table(trait_type, forbidden)
+        if table is None:
+            return None
+        cached = self._domains.get(table)
+        if cached is None:
+            weights = self.sampler.option_weights[trait_type]
+            values = [i for i in table.values if weights[i] > 0]
+            total = sum(weights[i] for i in values)
+            cached = (values, [math.log(weights[i] / total) for i in values])
+            if len(self._domains) >= DOMAIN_TABLE_CACHE_SIZE:
+                self._domains.clear()
+            self._domains[table] = cached
+        return cached
+
+    def scan(self, visit: Callable[[int, float], None]) -> None:
+        """
+        Enumerate every valid combination.
+
+        Args:
+            visit: Called with (combination ID, log draw probability)
+        """
+        masks = self.sampler.rules.exclusion_masks
+        levels = self._levels
+        depth_end = len(levels)
+        domain = self._domain
+
+        def walk(depth: int, forbidden: int, combination_id: int, log_p: float) -> None:
+            if depth == depth_end:
+                visit(combination_id, log_p)
+                return
+            trait_type, log_in, log_out, place, offset = levels[depth]
+            if log_out is not None:
+                walk(depth + 1, forbidden, combination_id, log_p + log_out)
+            if log_in is None:
+                return
+            options = domain(trait_type, forbidden)
+            if options is None:
+                return
+            for idx, log_w in zip(*options):
+                walk(
+                    depth + 1,
+                    forbidden | masks[offset + idx],
+                    combination_id + place * (idx + 1),
+                    log_p + log_in + log_w,
+                )
+
+        walk(0, 0, 0, 0.0)
+
+    def key(self, combination_id: int, log_p: float) -> float:
+        """
+        Return the sort key of a combination; smaller keys are drawn first.
+
+        This is -log of the Efraimidis-Spirakis key u ** (1 / p), kept in
+        log space so that tiny probabilities do not underflow.
+        """
+        digest = hashlib.blake2b(
+            combination_id.to_bytes(self._id_bytes, "little"),
+            key=self._hash_key,
+            digest_size=8,
+        ).digest()
+        u = (int.from_bytes(digest, "little") + 0.5) / 18446744073709551616.0
+        return math.log(-math.log(u)) - log_p
+
+    def candidates(self) -> Iterator[Tuple[Dict[str, str], int]]:
+        """
+        Yield the ``pool_size`` first combinations of a weighted random order.
+
+        The space is enumerated once, keeping a bounded max-heap of the
+        smallest keys. ``complete`` is set once the pool is sorted and tells
+        whether it holds every valid combination.
+
+        Yields:
+            Tuple of (traits in generation order, combination ID)
+        """
+        # Max-heap of the pool_size smallest (key, ID) pairs
+        heap: List[Tuple[float, int]] = []
+        size = self.pool_size
+        key = self.key
+
+        def visit(combination_id: int, log_p: float) -> None:
+            self.enumerated += 1
+            item = (-key(combination_id, log_p), -combination_id)
+            if len(heap) < size:
+                heapq.heappush(heap, item)
+            elif item > heap[0]:
+                heapq.heapreplace(heap, item)
+
+        self.enumerated = 0
+        self.scan(visit)
+        self.complete = self.enumerated <= size
+        for _key, combination_id in sorted(heap, reverse=True):
+            yield self._traits(-combination_id), -combination_id
+
+    def _traits(self, combination_id: int) -> Dict[str, str]:
+        """Decode a combination ID into a trait dict in generation order."""
+        decoded = self.space.decode(combination_id)
+        return {t: decoded[t] for t in self.generation_order if t in decoded}
@@ -0,0 +1,517 @@
+#!/usr/bin/env python3
+"""
+Feasibility module for NFT Generator
+Works out, before anything is planned or rendered, how many unique NFTs a
+configuration can produce under its rules and uniqueness constraints.
+"""
+
+import math
+import random
+from dataclasses import dataclass
+from itertools import combinations
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from modules.constants import (
+    DEFAULT_MAX_ATTEMPTS,
+    FEASIBILITY_MAX_OPTIONAL_TRAITS,
+    FEASIBILITY_SAMPLES,
+    FEASIBILITY_SEARCH_STEPS,
+    FEASIBILITY_STATE_LIMIT,
+)
+from modules.rule_engine import CompiledRules
+from modules.trait_index import TraitIndex
+
+# Collection fill levels reported in the summary
+REPORT_FILL_FRACTIONS = (0.5, 0.9, 1.0)
+
+
+class _StateLimitExceeded(Exception):
+    """Raised when an exact count would need too many memoized states."""
+
+
+@dataclass
+class FeasibilityReport:
+    """
+    Result of a feasibility analysis.
+
+    ``pattern_limit``, ``signature_limit`` and ``uniqueness_limit`` are
+    proven upper bounds on the collection size; ``valid_combinations`` is
+    exact only when ``exact`` is set, otherwise it is a sampled estimate.
+    """
+
+    requested: int
+    existing: int
+    valid_combinations: int
+    exact: bool
+    pattern_limit: Optional[int]
+    pattern_traits: Optional[Tuple[str, ...]]
+    signature_limit: Optional[int]
+    uniqueness_limit: Optional[int]
+    # (fill fraction of ``requested``, expected attempts for the next NFT)
+    expected_attempts: List[Tuple[float, float]]
+    max_similar: int
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS
+
+    @property
+    def proven_limit(self) -> Optional[int]:
+        """Largest collection size that is provably reachable at most."""
+        limits = [
+            x
+            for x in (self.pattern_limit, self.signature_limit, self.uniqueness_limit)
+            if x is not None
+        ]
+        if self.exact:
+            limits.append(self.valid_combinations)
+        return min(limits) if limits else None
+
+    @property
+    def max_reachable(self) -> int:
+        """Largest collection size, using the estimate when no exact count exists."""
+        limits = [
+            x
+            for x in (
+                self.valid_combinations,
+                self.pattern_limit,
+                self.signature_limit,
+                self.uniqueness_limit,
+            )
+            if x is not None
+        ]
+        return min(limits)
+
+    @property
+    def feasible(self) -> bool:
+        return self.requested <= self.max_reachable
+
+    @property
+    def provably_infeasible(self) -> bool:
+        limit = self.proven_limit
+        return limit is not None and self.requested > limit
+
+    def failure_probability(self) -> float:
+        """Probability that the last NFT exhausts ``max_attempts``."""
+        attempts = self.expected_attempts[-1][1]
+        if math.isinf(attempts):
+            return 1.0
+        return (1 - 1 / attempts) ** self.max_attempts
+
+    def summary(self) -> List[str]:
+        """Return the report as human-readable lines."""
+        how = "exact" if self.exact else "estimated"
+        lines = [f"Valid trait combinations: {self.valid_combinations:,} ({how})"]
+        if self.pattern_limit is not None:
+            lines.append(
+                f"{len(self.pattern_traits)}-trait pattern limit: "
+                f"{self.pattern_limit:,} ({', '.join(self.pattern_traits)}; "
+                f"max_similar={self.max_similar})"
+            )
+        if self.signature_limit is not None:
+            lines.append(f"Signature trait limit: {self.signature_limit:,}")
+        if self.uniqueness_limit is not None:
+            lines.append(
+                "Uniqueness limit (rules, patterns, signature): "
+                f"{self.uniqueness_limit:,}"
+            )
+        lines.append(f"Largest reachable collection: {self.max_reachable:,}")
+        if self.existing >= self.requested:
+            lines.append(
+                f"Requested collection: {self.requested:,} (covered by the "
+                f"{self.existing:,} NFTs already planned; nothing new to plan)"
+            )
+        else:
+            lines.append(
+                f"Requested collection: {self.requested:,} ({self.existing:,} "
+                f"already planned, {self.requested - self.existing:,} new)"
+            )
+        attempts = []
+        for fraction, value in self.expected_attempts:
+            shown = "exhausted" if math.isinf(value) else f"{value:,.1f}"
+            attempts.append(f"{fraction:.0%}: {shown}")
+        lines.append(
+            f"Expected attempts per NFT (duplicates only) at fill {', '.join(attempts)}"
+        )
+        return lines
+
+
+class FeasibilityAnalyzer:
+    """
+    Counts the combinations a configuration can produce.
+
+    Valid combinations are counted exactly with a memoized depth-first
+    search over trait types, keyed on the exclusion bits that still affect
+    later trait types. When that needs more than ``state_limit`` states the
+    count is estimated from a uniform sample of the product space instead.
+    The same sample drives the expected-attempts estimate.
+    """
+
+    def __init__(
+        self,
+        index: TraitIndex,
+        rules: CompiledRules,
+        include_percent: Dict[str, float],
+        option_weights: Dict[str, Sequence[float]],
+        max_similar: int = 1,
+        pattern_size: int = 4,
+        signature_groups: Sequence[Sequence[str]] = (),
+        state_limit: int = FEASIBILITY_STATE_LIMIT,
+        samples: int = FEASIBILITY_SAMPLES,
+    ):
+        """
+        Initialize feasibility analyzer.
+
+        Args:
+            index: Trait index providing global option IDs
+            rules: Compiled exclusion rules
+            include_percent: Include probability (0-100) per trait type
+            option_weights: Option weights per trait type, in index order
+            max_similar: How often each tracked pattern may repeat
+            pattern_size: Number of traits in a tracked pattern
+            signature_groups: Groups of trait types whose combined values must be unique
+            state_limit: Memoized states allowed per exact count
+            samples: Combinations drawn for the sampled estimates
+        """
+        self.index = index
+        self.rules = rules
+        self.max_similar = max(1, max_similar)
+        self.pattern_size = pattern_size
+        self.state_limit = state_limit
+        self.samples = samples
+
+        self.include_percent = {t: include_percent.get(t, 0) for t in index.trait_order}
+        # Trait types that can appear at all, and those that always appear
+        self.trait_types = [t for t in index.trait_order if self.include_percent[t] > 0]
+        self.mandatory = [t for t in self.trait_types if self.include_percent[t] >= 100]
+        self.optional = frozenset(self.trait_types) - frozenset(self.mandatory)
+
+        # Options that can actually be drawn (positive weight)
+        self.option_weights: Dict[str, List[float]] = {}
+        self.options: Dict[str, List[int]] = {}
+        for trait_type in self.trait_types:
+            weights = list(option_weights.get(trait_type, []))
+            offset = index.offsets[trait_type]
+            self.option_weights[trait_type] = [w for w in weights if w > 0]
+            self.options[trait_type] = [
+                offset + k for k, w in enumerate(weights) if w > 0
+            ]
+        # Signature groups in index order; groups with a trait type that
+        # never appears can never be complete and so never bound anything
+        self.signature_groups = [
+            tuple(t for t in self.trait_types if t in group)
+            for group in map(set, signature_groups)
+            if group and group.issubset(self.trait_types)
+        ]
+
+        self._valid: Optional[Tuple[int, bool]] = None
+        self._pattern: Optional[Tuple[Optional[int], Optional[Tuple[str, ...]]]] = None
+        self._signatures: Dict[Tuple[str, ...], int] = {}
+        self._uniqueness: Optional[Tuple[Optional[int]]] = None
+        self._pattern_counts: Dict[Tuple[str, ...], int] = {}
+        self._sampled: Optional[Tuple[int, List[float]]] = None
+        # Memoized states used by the last count_valid call
+        self.states_used = 0
+
+    def count_valid(
+        self,
+        trait_types: Sequence[str],
+        optional=frozenset(),
+        limit: Optional[int] = None,
+    ) -> int:
+        """
+        Count rule-compatible selections over the given trait types exactly.
+
+        Args:
+            trait_types: Trait types to select from
+            optional: Trait types that may also be left out
+            limit: Memoized states allowed (default: state_limit)
+
+        Returns:
+            Number of valid selections
+
+        Raises:
+            _StateLimitExceeded: If the search needs more than ``limit`` states
+        """
+        masks = self.rules.exclusion_masks
+        n = len(trait_types)
+        rest = [0] * (n + 1)
+        for d in range(n - 1, -1, -1):
+            rest[d] = rest[d + 1] | self.index.trait_masks[trait_types[d]]
+        domains = [[(gid, masks[gid]) for gid in self.options[t]] for t in trait_types]
+        skippable = [t in optional for t in trait_types]
+        memo: Dict[Tuple[int, int], int] = {}
+        if limit is None:
+            limit = self.state_limit
+        self.states_used = 0
+
+        def count(depth: int, forbidden: int) -> int:
+            if depth == n:
+                return 1
+            forbidden &= rest[depth]
+            key = (depth, forbidden)
+            cached = memo.get(key)
+            if cached is not None:
+                return cached
+            if len(memo) >= limit:
+                raise _StateLimitExceeded()
+            total = count(depth + 1, forbidden) if skippable[depth] else 0
+            for gid, excluded in domains[depth]:
+                if not forbidden >> gid & 1:
+                    total += count(depth + 1, forbidden | excluded)
+            memo[key] = total
+            return total
+
+        try:
+            return count(0, 0)
+        finally:
+            self.states_used = len(memo)
+
+    def exact_valid(self) -> Optional[int]:
+        """Return the exact valid combination count, or None if too costly."""
+        if self._valid is None:
+            try:
+                self._valid = (self.count_valid(self.trait_types, self.optional), True)
+            except _StateLimitExceeded:
+                return None
+        return self._valid[0] if self._valid[1] else None
+
+    def valid_combinations(self) -> Tuple[int, bool]:
+        """Return (valid combination count, whether it is exact)."""
+        if self._valid is None and self.exact_valid() is None:
+            self._valid = (self.estimate_valid(), False)
+        return self._valid
+
+    def _count_or_bound(
+        self, trait_types: Sequence[str], limit: Optional[int] = None
+    ) -> int:
+        """Count full selections over ``trait_types``, or bound them by the product."""
+        try:
+            return self.count_valid(trait_types, limit=limit)
+        except _StateLimitExceeded:
+            return math.prod(len(self.options[t]) for t in trait_types)
+
+    def _pattern_bound(
+        self, trait_types: Sequence[str]
+    ) -> Tuple[Optional[int], Optional[Tuple[str, ...]]]:
+        """
+        Bound how many NFTs can contain all of ``trait_types``.
+
+        Each such NFT contains every pattern-sized subset of them, so a
+        subset with P valid patterns allows at most P * max_similar NFTs.
+        Every subset is counted: rules can make a subset with a large
+        product the tightest one.
+
+        Returns:
+            (bound, trait types of the limiting subset), or (None, None)
+        """
+        best: Optional[int] = None
+        best_traits: Optional[Tuple[str, ...]] = None
+        for subset in combinations(trait_types, self.pattern_size):
+            patterns = self._pattern_counts.get(subset)
+            if patterns is None:
+                patterns = self._pattern_counts[subset] = self._count_or_bound(subset)
+            if best is None or patterns < best:
+                best, best_traits = patterns, subset
+        if best is None:
+            return None, None
+        return best * self.max_similar, best_traits
+
+    def pattern_limit(self) -> Tuple[Optional[int], Optional[Tuple[str, ...]]]:
+        """Return the pattern bound over the trait types every NFT contains."""
+        if self._pattern is None:
+            self._pattern = self._pattern_bound(self.mandatory)
+        return self._pattern
+
+    def signature_limit(self) -> Optional[int]:
+        """Return the tightest bound from signature groups that always appear."""
+        counts = [
+            self._signature_count(group)
+            for group in self.signature_groups
+            if all(t in self.mandatory for t in group)
+        ]
+        return min(counts) if counts else None
+
+    def _signature_count(self, group: Tuple[str, ...]) -> int:
+        count = self._signatures.get(group)
+        if count is None:
+            count = self._signatures[group] = self._count_or_bound(group)
+        return count
+
+    def uniqueness_limit(self) -> Optional[int]:
+        """
+        Bound the collection size under both the rules and the tracker.
+
+        NFTs are grouped by which trait types they include; each group is
+        capped by its valid combinations, its pattern bound and the
+        signature count of every signature group it includes. Groups share
+        patterns, so the sum of the caps is an upper bound, not an estimate.
+
+        Returns:
+            The bound, or None when there are too many optional trait types
+            or the valid combinations could not be counted exactly
+        """
+        if self._uniqueness is not None:
+            return self._uniqueness[0]
+        limit = None
+        optional = [t for t in self.trait_types if t in self.optional]
+        # Each group is a slice of the full count, so skip this when the full
+        # count was already too large; the groups share one state budget
+        if (
+            len(optional) <= FEASIBILITY_MAX_OPTIONAL_TRAITS
+            and self.valid_combinations()[1]
+        ):
+            budget = self.state_limit
+            limit = 0
+            for r in range(len(optional) + 1):
+                for chosen in combinations(optional, r):
+                    chosen = set(chosen)
+                    included = [
+                        t
+                        for t in self.trait_types
+                        if t in chosen or t not in self.optional
+                    ]
+                    cap = self._count_or_bound(included, limit=budget)
+                    budget = max(1, budget - self.states_used)
+                    if cap and len(included) >= self.pattern_size:
+                        cap = min(cap, self._pattern_bound(included)[0])
+                    for group in self.signature_groups:
+                        if cap and set(group).issubset(included):
+                            cap = min(cap, self._signature_count(group))
+                    limit += cap
+        self._uniqueness = (limit,)
+        return limit
+
+    def _sample_space(self, seed: int = 0) -> Tuple[int, List[float]]:
+        """
+        Draw combinations uniformly from the unconstrained product space.
+
+        Uses its own RNG so that the global random state is left untouched.
+
+        Returns:
+            (size of the product space, sampling probability of each drawn
+            combination that satisfies the rules)
+        """
+        masks = self.rules.exclusion_masks
+        rng = random.Random(seed)
+        domains = []
+        space = 1
+        for trait_type in self.trait_types:
+            q = min(self.include_percent[trait_type], 100) / 100
+            weights = self.option_weights[trait_type]
+            total = sum(weights) or 1
+            probabilities = [q * w / total for w in weights]
+            skippable = trait_type in self.optional
+            domains.append((self.options[trait_type], probabilities, skippable, 1 - q))
+            space *= len(weights) + (1 if skippable else 0)
+        if space == 0:
+            return 0, []
+
+        valid = []
+        for _ in range(self.samples):
+            forbidden = 0
+            p = 1.0
+            for options, probabilities, skippable, excluded in domains:
+                k = rng.randrange(len(options) + (1 if skippable else 0))
+                if k == len(options):
+                    p *= excluded
+                    continue
+                gid = options[k]
+                if forbidden >> gid & 1:
+                    break
+                forbidden |= masks[gid]
+                p *= probabilities[k]
+            else:
+                valid.append(p)
+        return space, valid
+
+    def _sample(self) -> Tuple[int, List[float]]:
+        if self._sampled is None:
+            self._sampled = self._sample_space()
+        return self._sampled
+
+    def estimate_valid(self) -> int:
+        """Estimate the number of valid combinations from the uniform sample."""
+        space, valid = self._sample()
+        return round(space * len(valid) / self.samples) if space else 0
+
+    def expected_attempts(self, filled: int, reachable: int) -> float:
+        """
+        Approximate attempts needed for the next NFT once ``filled`` are taken.
+
+        Weighted sampling keeps revisiting common combinations, so this
+        finds the number of draws T that yields ``filled`` distinct
+        combinations and returns 1 / (1 - probability mass covered by then),
+        both estimated from the uniform sample of combination probabilities.
+
+        Args:
+            filled: Number of unique NFTs already in the collection
+            reachable: Largest reachable collection size
+
+        Returns:
+            Expected attempts, or ``math.inf`` when the space is exhausted
+        """
+        if filled <= 0:
+            return 1.0
+        if filled >= reachable:
+            return math.inf
+        space, valid = self._sample()
+        if not valid:
+            return math.inf
+        scale = space / self.samples
+        logs = [math.log1p(-p) if p < 1 else -math.inf for p in valid]
+
+        def distinct(draws: float) -> float:
+            return scale * sum(-math.expm1(draws * lg) for lg in logs)
+
+        lo, hi = float(filled), float(filled)
+        while distinct(hi) < filled:
+            lo, hi = hi, hi * 2
+            if hi > 1e18:
+                return math.inf
+        for _ in range(FEASIBILITY_SEARCH_STEPS):
+            mid = (lo + hi) / 2
+            if distinct(mid) < filled:
+                lo = mid
+            else:
+                hi = mid
+        covered = scale * sum(-p * math.expm1(hi * lg) for p, lg in zip(valid, logs))
+        if covered >= 1:
+            return math.inf
+        return 1 / (1 - covered)
+
+    def analyze(
+        self,
+        requested: int,
+        existing: int = 0,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    ) -> FeasibilityReport:
+        """
+        Analyze whether a collection of ``requested`` unique NFTs is reachable.
+
+        Args:
+            requested: Total collection size, including existing NFTs
+            existing: NFTs already planned
+            max_attempts: Attempts allowed per NFT
+
+        Returns:
+            FeasibilityReport: Counts, bounds and attempt estimates
+        """
+        valid, exact = self.valid_combinations()
+        pattern_limit, pattern_traits = self.pattern_limit()
+        report = FeasibilityReport(
+            requested=requested,
+            existing=existing,
+            valid_combinations=valid,
+            exact=exact,
+            pattern_limit=pattern_limit,
+            pattern_traits=pattern_traits,
+            signature_limit=self.signature_limit(),
+            uniqueness_limit=self.uniqueness_limit(),
+            expected_attempts=[],
+            max_similar=self.max_similar,
+            max_attempts=max_attempts,
+        )
+        for fraction in REPORT_FILL_FRACTIONS:
+            filled = max(0, math.ceil(requested * fraction) - 1)
+            report.expected_attempts.append(
+                (fraction, self.expected_attempts(filled, report.max_reachable))
+            )
+        return report
@@ -5,8 +5,8 @@ Handles image loading, caching, and composition with enhanced error handling.
 """
 
 import logging
-import time
 from collections import OrderedDict
+from dataclasses import dataclass
 from pathlib import Path
 from PIL import Image
 from typing import Dict, List, Tuple, Optional, Union
@@ -15,36 +15,365 @@ from modules.constants import (
     DEFAULT_IMAGE_CACHE_SIZE,
     DEFAULT_GIF_DURATION_MS,
     DEFAULT_GIF_LOOP,
+    FREQUENCY_SKETCH_WIDTH_FACTOR,
+    FREQUENCY_SKETCH_SAMPLE_FACTOR,
+    COMPOSITE_CACHE_MEMORY_SHARE,
+    COMPOSITE_WINDOW_SHARE,
 )
 
+KEY_MASK = (1 << 64) - 1
+# Odd multipliers giving each sketch row its own hash of the key
+SKETCH_ROW_MULTIPLIERS = (
+    0x9E3779B97F4A7C15,
+    0xC2B2AE3D27D4EB4F,
+    0x165667B19E3779F9,
+    0xD6E8FEB86659FD93,
+)
+# Pixel of the blank canvas layers are composited onto
+BLANK_PIXEL = (255, 255, 255, 0)
+
+
+@dataclass
+class LayerSprite:
+    """The non-transparent part of a trait layer and where it sits on the layer."""
+
+    image: Optional[Image.Image]  # Cropped RGBA image; None if fully transparent
+    offset: Tuple[int, int]  # (left, top)
+    size: Tuple[int, int]  # (width, height) of the full layer
+
+    @property
+    def size_bytes(self) -> int:
+        if self.image is None:
+            return 0
+        # RGBA: 4 bytes per pixel
+        return self.image.size[0] * self.image.size[1] * 4
+
+
+def _crop_sprite(image: Image.Image) -> LayerSprite:
+    """
+    Crop a layer to the bounding box of its non-transparent pixels.
+
+    Args:
+        image: RGBA layer
+
+    Returns:
+        LayerSprite with the cropped image
+    """
+    alpha = image.getchannel("A")
+    box = alpha.getbbox()
+    if box is None:
+        return LayerSprite(None, (0, 0), image.size)
+    # Transparent pixels take the blank canvas color, so a sprite can be
+    # pasted onto a blank canvas with the same result as blending it
+    sprite = Image.new("RGBA", (box[2] - box[0], box[3] - box[1]), BLANK_PIXEL)
+    mask = alpha.crop(box).point(lambda a: 255 if a else 0)
+    sprite.paste(image.crop(box), mask=mask)
+    return LayerSprite(sprite, box[:2], image.size)
+
+
+class FrequencySketch:
+    """
+    Count-min sketch of recent access frequencies (TinyLFU).
+
+    Four rows of small saturating counters; an increment only raises the
+    rows holding the current minimum. After ``sample_size`` increments
+    every counter is halved, so popularity fades unless it is renewed.
+    """
+
+    MAX_COUNT = 15
+
+    def __init__(self, capacity: int):
+        """
+        Initialize frequency sketch.
+
+        Args:
+            capacity: Number of entries in the cache it guards
+        """
+        width = max(64, capacity * FREQUENCY_SKETCH_WIDTH_FACTOR)
+        self._bits = (width - 1).bit_length()
+        self._rows = [bytearray(1 << self._bits) for _ in SKETCH_ROW_MULTIPLIERS]
+        self.sample_size = max(1, capacity) * FREQUENCY_SKETCH_SAMPLE_FACTOR
+        self._additions = 0
+
+    def _indexes(self, key: str) -> List[int]:
+        h = hash(key) & KEY_MASK
+        shift = 64 - self._bits
+        return [((h * m) & KEY_MASK) >> shift for m in SKETCH_ROW_MULTIPLIERS]
+
+    def estimate(self, key: str) -> int:
+        """Return the estimated recent access count of a key."""
+        return min(row[i] for row, i in zip(self._rows, self._indexes(key)))
+
+    def increment(self, key: str) -> None:
+        """Record one access to a key."""
+        indexes = self._indexes(key)
+        current = min(row[i] for row, i in zip(self._rows, indexes))
+        if current >= self.MAX_COUNT:
+            return
+        for row, i in zip(self._rows, indexes):
+            if row[i] == current:
+                row[i] = current + 1
+        self._additions += 1
+        if self._additions >= self.sample_size:
+            self._age()
+
+    def seed(self, key: str, count: int) -> None:
+        """Raise a key's estimate to at least ``count`` before any access."""
+        count = min(max(count, 0), self.MAX_COUNT)
+        for row, i in zip(self._rows, self._indexes(key)):
+            if row[i] < count:
+                row[i] = count
+
+    def _age(self) -> None:
+        halve = bytes(c >> 1 for c in range(256))
+        self._rows = [bytearray(row.translate(halve)) for row in self._rows]
+        self._additions //= 2
+
+
+class CompositeCache:
+    """
+    Partial composites keyed by the ordered layer paths they contain.
+
+    Many NFTs share a stack prefix such as Background + Body, so rendering
+    starts from the deepest cached prefix and only composites the layers
+    after it. New composites enter a small LRU window, which holds the
+    stack of the NFTs just rendered; this is what NFTs rendered in
+    layer-stack order reuse. A composite leaving the window moves to the
+    main LRU only if a frequency sketch, counting every prefix of every
+    rendered stack, rates it above the entries it would evict, so popular
+    shallow prefixes stay cached under any render order. Composites only
+    take memory the layer cache leaves free and are released first when
+    it needs more.
+    """
+
+    def __init__(self, max_bytes: int, capacity_hint: int):
+        """
+        Initialize composite cache.
+
+        Args:
+            max_bytes: Memory limit for cached composites
+            capacity_hint: Expected number of entries, sizes the sketch
+        """
+        self.max_bytes = max_bytes
+        self.window_bytes = int(max_bytes * COMPOSITE_WINDOW_SHARE)
+        self.current_bytes = 0
+        # layer prefix tuple -> (image, size_bytes), LRU first
+        self._window = OrderedDict()
+        self._main = OrderedDict()
+        self._window_current = 0
+        self._frequency = FrequencySketch(capacity_hint)
+        self.hits = 0
+        self.layers_skipped = 0
+
+    def __len__(self) -> int:
+        return len(self._window) + len(self._main)
+
+    def deepest(self, layers: List[str]) -> Tuple[int, Optional[Image.Image]]:
+        """
+        Find the deepest cached prefix of a layer stack and count its prefixes.
+
+        Args:
+            layers: Layer paths in composition order
+
+        Returns:
+            Tuple of (number of layers covered, composite or None)
+        """
+        for depth in range(1, len(layers) + 1):
+            self._frequency.increment(tuple(layers[:depth]))
+        for depth in range(len(layers), 0, -1):
+            prefix = tuple(layers[:depth])
+            for entries in (self._window, self._main):
+                entry = entries.get(prefix)
+                if entry is not None:
+                    entries.move_to_end(prefix)
+                    self.hits += 1
+                    self.layers_skipped += depth
+                    return depth, entry[0]
+        return 0, None
+
+    def offer(
+        self, prefix: Tuple[str, ...], image: Image.Image, total_free: int
+    ) -> None:
+        """
+        Add a composite to the window, moving older window entries to the main LRU.
+
+        Args:
+            prefix: Layer paths the composite contains
+            image: The composite; it must not be modified afterwards
+            total_free: Free bytes left in the shared memory budget
+        """
+        size = image.size[0] * image.size[1] * 4
+        if not self.accepts(prefix, size, total_free):
+            return
+        budget = min(self.max_bytes, self.current_bytes + total_free)
+        self._window[prefix] = (image, size)
+        self._window_current += size
+        self.current_bytes += size
+        while len(self._window) > 1 and (
+            self._window_current > self.window_bytes or self.current_bytes > budget
+        ):
+            candidate, (candidate_image, candidate_size) = self._window.popitem(
+                last=False
+            )
+            self._window_current -= candidate_size
+            self.current_bytes -= candidate_size
+            self._promote(candidate, candidate_image, candidate_size, budget)
+        # Only the new composite is left in the window
+        if self.current_bytes > budget and not self._make_room(
+            prefix, self.current_bytes - budget
+        ):
+            del self._window[prefix]
+            self._window_current -= size
+            self.current_bytes -= size
+
+    def frequency(self, prefix: Tuple[str, ...]) -> int:
+        """Return how often a prefix was recently part of a rendered stack."""
+        return self._frequency.estimate(prefix)
+
+    def accepts(self, prefix: Tuple[str, ...], size: int, total_free: int) -> bool:
+        """Return True if ``offer`` would add a composite of ``size`` bytes."""
+        if prefix in self._window or prefix in self._main:
+            return False
+        budget = min(self.max_bytes, self.current_bytes + total_free)
+        return size <= min(self.window_bytes, budget)
+
+    def _promote(
+        self, prefix: Tuple[str, ...], image: Image.Image, size: int, budget: int
+    ) -> None:
+        """Move a composite leaving the window to the main LRU if it beats victims."""
+        if self._make_room(prefix, self.current_bytes + size - budget):
+            self._main[prefix] = (image, size)
+            self.current_bytes += size
+
+    def _make_room(self, prefix: Tuple[str, ...], excess: int) -> bool:
+        """
+        Free ``excess`` bytes from the main LRU for a composite.
+
+        The least recently used entries that would free the bytes are only
+        evicted if the frequency sketch rates every one of them below
+        ``prefix``.
+
+        Returns:
+            bool: True if the room was made
+        """
+        if excess <= 0:
+            return True
+        if excess > self.current_bytes - self._window_current:
+            return False
+        frequency = self._frequency.estimate(prefix)
+        victims = 0
+        for victim, (_, victim_size) in self._main.items():
+            if excess <= 0:
+                break
+            if self._frequency.estimate(victim) >= frequency:
+                return False
+            victims += 1
+            excess -= victim_size
+        for _ in range(victims):
+            _, (_, victim_size) = self._main.popitem(last=False)
+            self.current_bytes -= victim_size
+        return True
+
+    def release(self, required_bytes: int) -> int:
+        """
+        Evict least recently used composites to free memory for layers.
+
+        Returns:
+            Number of bytes freed
+        """
+        freed = 0
+        while freed < required_bytes and (self._main or self._window):
+            if self._main:
+                _, (_, size) = self._main.popitem(last=False)
+            else:
+                _, (_, size) = self._window.popitem(last=False)
+                self._window_current -= size
+            self.current_bytes -= size
+            freed += size
+        return freed
+
 
 class ImageProcessor:
-    """Handles image loading, caching, and composition with memory-aware LRU cache optimization."""
+    """
+    Handles image loading, caching, and composition with a memory-aware LRU cache.
 
-    def __init__(self, cache_size: int = DEFAULT_IMAGE_CACHE_SIZE, max_memory_mb: int = 512):
+    Eviction takes the least recently used entry from the front of the
+    ordered cache. A loaded image is only admitted if the frequency sketch
+    rates it above every entry it would evict, so one-off rare layers do not
+    push out the base layers that nearly every NFT uses.
+    """
+
+    def __init__(
+        self,
+        cache_size: int = DEFAULT_IMAGE_CACHE_SIZE,
+        max_memory_mb: int = 512,
+        composite_memory_share: float = COMPOSITE_CACHE_MEMORY_SHARE,
+    ):
         """
         Initialize image processor with memory-aware LRU cache.
 
         Args:
             cache_size: Maximum number of images to cache (default: 128)
             max_memory_mb: Maximum memory usage in MB for cached images (default: 512MB)
+            composite_memory_share: Share of the memory limit partial
+                composites may use (0 disables the composite cache)
         """
         self.cache_size = cache_size
         self.max_memory_bytes = max_memory_mb * 1024 * 1024
         self.current_memory_bytes = 0
-        self._image_cache = OrderedDict()  # (path, image, size_bytes, access_time)
+        self._composites = CompositeCache(
+            int(self.max_memory_bytes * composite_memory_share), cache_size
+        )
+        self._image_cache = OrderedDict()  # path -> {image, size_bytes}, LRU first
+        self._frequency = FrequencySketch(cache_size)
         self._cache_hits = 0
         self._cache_misses = 0
+        self._admission_rejections = 0
+
+    def seed_frequencies(self, frequencies: Dict[Union[str, Path], float]) -> None:
+        """
+        Seed the admission sketch with expected layer popularity.
+
+        Args:
+            frequencies: Layer path -> expected share of NFTs using it (0-1)
+        """
+        for path, share in frequencies.items():
+            key = str(self._sanitize_path(path))
+            self._frequency.seed(key, round(share * FrequencySketch.MAX_COUNT))
 
     def load_image_cached(self, path: Union[str, Path]) -> Image.Image:
         """
         Load image with memory-aware LRU caching for better performance.
 
+        Only the cropped sprite is cached; the full-canvas image is rebuilt
+        from it, with fully transparent pixels set to the blank canvas color.
+
+        Args:
+            path: Path to the image file
+
+        Returns:
+            PIL.Image: Loaded image, safe for the caller to modify
+
+        Raises:
+            Exception: If there's an error loading the image
+        """
+        sprite = self.load_sprite_cached(path)
+        image = Image.new("RGBA", sprite.size, BLANK_PIXEL)
+        if sprite.image is not None:
+            image.paste(sprite.image, sprite.offset)
+        return image
+
+    def load_sprite_cached(self, path: Union[str, Path]) -> LayerSprite:
+        """
+        Load a layer cropped to its non-transparent region, with memory-aware
+        LRU caching for better performance.
+
         Args:
             path: Path to the image file
 
         Returns:
-            PIL.Image: Loaded image
+            LayerSprite: Cropped RGBA image and its offset; shared, must not
+            be modified
 
         Raises:
             Exception: If there's an error loading the image
@@ -52,75 +381,104 @@ class ImageProcessor:
         # Sanitize path to prevent path traversal
         safe_path = str(self._sanitize_path(path))
 
+        self._frequency.increment(safe_path)
+
         # Check cache first
-        if safe_path in self._image_cache:
-            # Update access time and move to end to mark as recently used
-            cache_entry = self._image_cache[safe_path]
-            cache_entry['access_time'] = time.time()
+        cache_entry = self._image_cache.get(safe_path)
+        if cache_entry is not None:
+            # Move to end to mark as recently used
             self._image_cache.move_to_end(safe_path)
             self._cache_hits += 1
-            return cache_entry['image']
+            return cache_entry["image"]
 
         # Load image if not in cache
         try:
             with Image.open(safe_path) as im:
-                image = im.convert("RGBA").copy()
-
-            # Calculate approximate memory usage (RGBA: 4 bytes per pixel)
-            image_memory_bytes = image.size[0] * image.size[1] * 4
-
-            # Make space if needed
-            self._ensure_cache_space(image_memory_bytes)
-
-            # Add to cache with metadata
-            cache_entry = {
-                'image': image,
-                'size_bytes': image_memory_bytes,
-                'access_time': time.time()
-            }
-            self._image_cache[safe_path] = cache_entry
-            self.current_memory_bytes += image_memory_bytes
+                image = _crop_sprite(im.convert("RGBA"))
+
+            image_memory_bytes = image.size_bytes
+
             self._cache_misses += 1
 
-            logging.debug(f"Cache stats - Hits: {self._cache_hits}, Misses: {self._cache_misses}, "
-                         f"Memory: {self.current_memory_bytes / 1024 / 1024:.1f}MB")
+            # Make space if the image is worth caching
+            if self._admit(safe_path, image_memory_bytes):
+                self._image_cache[safe_path] = {
+                    "image": image,
+                    "size_bytes": image_memory_bytes,
+                }
+                self.current_memory_bytes += image_memory_bytes
+
+            logging.debug(
+                f"Cache stats - Hits: {self._cache_hits}, "
+                f"Misses: {self._cache_misses}, "
+                f"Memory: {self.current_memory_bytes / 1024 / 1024:.1f}MB"
+            )
             return image
         except Exception as e:
             logging.error(f"Error loading image {safe_path}: {str(e)}")
             raise
 
-    def _ensure_cache_space(self, required_bytes: int) -> None:
+    def _admit(self, key: str, required_bytes: int) -> bool:
         """
-        Ensure there's enough space in cache for new image, evicting old entries if needed.
+        Decide whether to cache a new image, evicting LRU entries to make room.
 
         Args:
+            key: Cache key of the new image
             required_bytes: Memory space needed for new image
-        """
-        # First, evict based on count limit
-        while len(self._image_cache) >= self.cache_size:
-            self._evict_lru_item()
 
-        # Then, evict based on memory limit
-        while self.current_memory_bytes + required_bytes > self.max_memory_bytes and self._image_cache:
+        Returns:
+            bool: True if the image should be cached
+        """
+        if self.cache_size <= 0 or required_bytes > self.max_memory_bytes:
+            return False
+        excess_entries = len(self._image_cache) + 1 - self.cache_size
+        excess_bytes = (
+            self.current_memory_bytes
+            + self._composites.current_bytes
+            + required_bytes
+            - self.max_memory_bytes
+        )
+        # Composites only use memory that layers do not need; they are
+        # released once the image is admitted
+        composite_bytes = min(max(excess_bytes, 0), self._composites.current_bytes)
+        excess_bytes -= composite_bytes
+        if excess_entries <= 0 and excess_bytes <= 0:
+            self._composites.release(composite_bytes)
+            return True
+
+        # Walk the entries that would be evicted, least recently used first;
+        # keep them all if any is at least as popular as the newcomer
+        frequency = self._frequency.estimate(key)
+        victims = 0
+        for victim_key, entry in self._image_cache.items():
+            if excess_entries <= 0 and excess_bytes <= 0:
+                break
+            if self._frequency.estimate(victim_key) >= frequency:
+                self._admission_rejections += 1
+                return False
+            victims += 1
+            excess_entries -= 1
+            excess_bytes -= entry["size_bytes"]
+
+        self._composites.release(composite_bytes)
+        for _ in range(victims):
             self._evict_lru_item()
+        return True
 
     def _evict_lru_item(self) -> None:
         """Evict the least recently used cache item."""
         if not self._image_cache:
             return
 
-        # Find the least recently used item
-        lru_path = min(self._image_cache.keys(),
-                      key=lambda k: self._image_cache[k]['access_time'])
-
-        cache_entry = self._image_cache[lru_path]
-        self.current_memory_bytes -= cache_entry['size_bytes']
-
-        del self._image_cache[lru_path]
+        # The OrderedDict is kept in LRU order
+        lru_path, cache_entry = self._image_cache.popitem(last=False)
+        self.current_memory_bytes -= cache_entry["size_bytes"]
 
-        logging.debug(f"Evicted from cache: {lru_path} "
-                     f"(freed {cache_entry['size_bytes'] / 1024:.0f}KB, "
-                     f"memory now: {self.current_memory_bytes / 1024 / 1024:.1f}MB)")
+        logging.debug(
+            f"Evicted from cache: {lru_path} "
+            f"(freed {cache_entry['size_bytes'] / 1024:.0f}KB, "
+            f"memory now: {self.current_memory_bytes / 1024 / 1024:.1f}MB)"
+        )
 
     def get_cache_stats(self) -> Dict[str, float]:
         """
@@ -130,16 +488,25 @@ class ImageProcessor:
             Dictionary with cache statistics
         """
         total_requests = self._cache_hits + self._cache_misses
-        hit_rate = (self._cache_hits / total_requests * 100) if total_requests > 0 else 0
+        hit_rate = (
+            (self._cache_hits / total_requests * 100) if total_requests > 0 else 0
+        )
+
+        memory_bytes = self.current_memory_bytes + self._composites.current_bytes
 
         return {
-            'cache_size': len(self._image_cache),
-            'memory_usage_mb': self.current_memory_bytes / 1024 / 1024,
-            'max_memory_mb': self.max_memory_bytes / 1024 / 1024,
-            'cache_hits': self._cache_hits,
-            'cache_misses': self._cache_misses,
-            'hit_rate_percent': hit_rate,
-            'memory_utilization_percent': (self.current_memory_bytes / self.max_memory_bytes * 100)
+            "cache_size": len(self._image_cache),
+            "memory_usage_mb": memory_bytes / 1024 / 1024,
+            "max_memory_mb": self.max_memory_bytes / 1024 / 1024,
+            "cache_hits": self._cache_hits,
+            "cache_misses": self._cache_misses,
+            "hit_rate_percent": hit_rate,
+            "admission_rejections": self._admission_rejections,
+            "composite_cache_size": len(self._composites),
+            "composite_memory_mb": self._composites.current_bytes / 1024 / 1024,
+            "composite_hits": self._composites.hits,
+            "composites_skipped": self._composites.layers_skipped,
+            "memory_utilization_percent": (memory_bytes / self.max_memory_bytes * 100),
         }
 
     def _sanitize_path(self, path: Union[str, Path]) -> Path:
@@ -186,28 +553,102 @@ class ImageProcessor:
         Returns:
             PIL.Image: Composed NFT image
         """
-        # Create base image
-        base_image = Image.new("RGBA", image_size, (255, 255, 255, 0))
-        base_size = base_image.size
+        layers = [trait_layers[t] for t in trait_order if t in traits]
+        return self._compose_layers(layers, image_size)
 
-        # Composite trait layers in order
-        for trait_type in trait_order:
-            if trait_type in traits:
-                layer_path = trait_layers[trait_type]
-                try:
-                    layer_image = self.load_image_cached(layer_path)
-                    # Check if layer image size matches base image size
-                    if layer_image.size != base_size:
-                        raise ValueError(
-                            f"Image size mismatch: expected {base_size}, got {layer_image.size} for {layer_path}"
-                        )
-                    base_image = Image.alpha_composite(base_image, layer_image)
-                except Exception as e:
-                    logging.error(f"Error loading image {layer_path}: {str(e)}")
-                    raise
+    def _compose_layers(
+        self, layers: List[str], image_size: Tuple[int, int]
+    ) -> Image.Image:
+        """
+        Composite static layers in order, starting from the deepest cached prefix.
+
+        Args:
+            layers: Layer paths in composition order
+            image_size: Tuple of (width, height) for the image
+
+        Returns:
+            PIL.Image: Composed image, safe for the caller to modify
+        """
+        depth, base_image = self._composites.deepest(layers)
+        blank = base_image is None
+        if blank:
+            base_image = Image.new("RGBA", image_size, BLANK_PIXEL)
+        else:
+            # Cached composites are shared and must stay unmodified
+            base_image = base_image.copy()
+        base_size = base_image.size
+        # Pixels composited since the last cached prefix
+        composited = 0
+
+        # Composite the remaining trait layers in order
+        for i in range(depth, len(layers)):
+            layer_path = layers[i]
+            try:
+                sprite = self.load_sprite_cached(layer_path)
+                # Check if layer image size matches base image size
+                if sprite.size != base_size:
+                    raise ValueError(
+                        f"Image size mismatch: expected {base_size}, "
+                        f"got {sprite.size} for {layer_path}"
+                    )
+                # Blend in place over the sprite's box only
+                if sprite.image is None:
+                    pass
+                elif blank:
+                    base_image.paste(sprite.image, sprite.offset)
+                    blank = False
+                    composited += sprite.image.size[0] * sprite.image.size[1]
+                else:
+                    base_image.alpha_composite(sprite.image, dest=sprite.offset)
+                    composited += sprite.image.size[0] * sprite.image.size[1]
+            except Exception as e:
+                logging.error(f"Error loading image {layer_path}: {str(e)}")
+                raise
+            if i + 1 < len(layers) and self._offer_composite(
+                tuple(layers[: i + 1]), composited, base_image
+            ):
+                composited = 0
 
         return base_image
 
+    def _offer_composite(
+        self, prefix: Tuple[str, ...], composited: int, canvas: Image.Image
+    ) -> bool:
+        """
+        Offer a copy of a prefix composite to the composite cache.
+
+        Copying the canvas costs about as much as compositing one canvas
+        worth of pixels. Each reuse of the prefix saves the pixels
+        composited since the last cached prefix, and the frequency sketch
+        estimates how often it will be reused, so a prefix is only offered
+        once the expected saving covers the copy. Prefixes of popular stacks
+        are cached even when their layers are small; a stack seen once is
+        cached only if rebuilding it costs a full canvas.
+
+        Args:
+            prefix: Layer paths the composite contains
+            composited: Pixels pasted or blended since the last cached prefix
+            canvas: The canvas being composited; copied only if cached
+
+        Returns:
+            bool: True if the composite was offered
+        """
+        width, height = canvas.size
+        if not composited:
+            return False
+        reuses = self._composites.frequency(prefix)
+        if composited * max(reuses, 1) < width * height:
+            return False
+        free = (
+            self.max_memory_bytes
+            - self.current_memory_bytes
+            - self._composites.current_bytes
+        )
+        if not self._composites.accepts(prefix, width * height * 4, free):
+            return False
+        self._composites.offer(prefix, canvas.copy(), free)
+        return True
+
     def compose_animated_nft(
         self,
         gif_layers: List[str],
@@ -261,18 +702,12 @@ class ImageProcessor:
                     if gif_file.info.get("loop", gif_loop) != lp:
                         raise ValueError("All GIF traits must have same loop count")
 
+            # Static layers go under every frame; composite them once
+            static_base = self._compose_layers(static_layers, tuple(image_size))
+
             # Generate frames
             for f in range(frame_count or 1):
-                frame = Image.new("RGBA", image_size, (255, 255, 255, 0))
-                # Composite static layers first
-                for sp in static_layers:
-                    li = self.load_image_cached(sp)
-                    # Check if layer image size matches frame size
-                    if li.size != image_size:
-                        raise ValueError(
-                            f"Image size mismatch: expected {image_size}, got {li.size} for {sp}"
-                        )
-                    frame = Image.alpha_composite(frame, li)
+                frame = static_base
                 # Then composite GIF frame
                 for gif_file in opened_gifs:
                     gif_file.seek(f)
@@ -280,9 +715,16 @@ class ImageProcessor:
                     # Check if GIF frame size matches expected size
                     if gif_frame.size != image_size:
                         raise ValueError(
-                            f"Image size mismatch: expected {image_size}, got {gif_frame.size} for animated frame"
+                            f"Image size mismatch: expected {image_size}, "
+                            f"got {gif_frame.size} for animated frame"
                         )
-                    frame = Image.alpha_composite(frame, gif_frame)
+                    # Blend only the frame's non-transparent box
+                    box = gif_frame.getchannel("A").getbbox()
+                    if box is None:
+                        continue
+                    if frame is static_base:
+                        frame = static_base.copy()
+                    frame.alpha_composite(gif_frame, dest=box[:2], source=box)
                 frames.append(frame)
 
             return frames, dur, lp
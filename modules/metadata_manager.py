@@ -143,15 +143,28 @@ class MetadataManager:
             dict: Collection statistics
         """
         distribution = self.calculate_trait_distribution(collection)
+        signatures = dict(
+            zip(tracker.signature_groups, tracker.signature_combinations)
+        )
 
         stats_data = {
             "total_nfts": len(collection),
-            "unique_bsh_combinations": len(tracker.bsh_combinations),
-            "unique_4trait_patterns": len(tracker.trait_patterns),
+            "unique_signature_combinations": {
+                ", ".join(group): len(used) for group, used in signatures.items()
+            },
+            "unique_trait_patterns": len(tracker.trait_patterns),
+            "pattern_size": tracker.PATTERN_SIZE,
             "generation_failures": dict(failed_attempts),
             "trait_distribution": distribution,
             "timestamp": str(int(time.time())),
         }
+        default_group = tracker.SIGNATURE_TRAITS[0]
+        if default_group in signatures:
+            # Key written before signature groups became configurable
+            stats_data["unique_bsh_combinations"] = len(signatures[default_group])
+        if tracker.PATTERN_SIZE == 4:
+            # Key written before the pattern size became configurable
+            stats_data["unique_4trait_patterns"] = stats_data["unique_trait_patterns"]
 
         return stats_data
 
@@ -10,20 +10,43 @@ import os
 import hashlib
 import logging
 import multiprocessing as mp
+import queue
 import threading
-from collections import Counter, OrderedDict, defaultdict
-from typing import Dict, List, Tuple, Optional, Any, Callable
-from pathlib import Path
+from array import array
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple, Optional, Any, Callable, Sequence
 from tqdm import tqdm
 
-from modules.resource_manager import resource_manager
-
-from modules.trait_tracker import TraitTracker
+from modules.trait_tracker import SelectionLookahead, TraitTracker
 from modules.image_processor import ImageProcessor
 from modules.config_manager import ConfigManager
 from modules.metadata_manager import MetadataManager
 from modules.validation import NFTConfiguration, RulerConfiguration
 from modules.dependency_container import GeneratorDependencies
+from modules.collection_plan import CollectionPlan, PlannedNFT
+from modules.trait_index import TraitIndex
+from modules.combination_space import CombinationSpace
+from modules.rule_engine import CompiledRules
+from modules.trait_sampler import AliasTable, CounterRandom, TraitSampler, derive_seed
+from modules.batch_sampler import BatchCandidateSampler, NUMPY_AVAILABLE
+from modules.feasibility import FeasibilityAnalyzer, FeasibilityReport
+from modules.exhaustive_sampler import ExhaustiveSampler
+from modules.seen_set import create_combination_set
+from modules.state_store import (
+    CombinationLog,
+    StateFormatError,
+    config_fingerprint,
+    read_snapshot,
+    write_snapshot,
+)
+from modules.run_journal import JournalRecord, OutputFiles, RunJournal, scan_directory
+from modules.nft_renderer import (
+    NFTRenderer,
+    RenderOptions,
+    init_render_worker,
+    render_worker_chunk,
+)
 from modules.constants import (
     DEFAULT_MAX_ATTEMPTS,
     DEFAULT_MAX_TRAIT_ATTEMPTS,
@@ -32,9 +55,26 @@ from modules.constants import (
     OUTPUT_DIR,
     IMAGE_DIR,
     METADATA_DIR,
-    SEEN_HASHES_FILE,
+    SEEN_COMBINATIONS_FILE,
+    LEGACY_SEEN_HASHES_FILE,
     TRACKER_STATE_FILE,
-    RNG_STATE_FILE,
+    RUN_JOURNAL_FILE,
+    RNG_STREAM_CANDIDATES,
+    RNG_STREAM_ID_ORDER,
+    RNG_STREAM_BATCH,
+    RNG_STREAM_ENUMERATION,
+    RNG_STREAM_SELECT,
+    PLAN_FILE,
+    DEFAULT_CANDIDATE_BATCH_SIZE,
+    BATCH_PLANNING_THRESHOLD,
+    RENDER_CHUNKS_IN_FLIGHT_PER_WORKER,
+    MAX_RENDER_CHUNK_SIZE,
+    RENDER_RESULT_TIMEOUT_S,
+    FEASIBILITY_FAILURE_WARN_PROBABILITY,
+    ENUMERATION_LIMIT,
+    ENUMERATION_POOL_FACTOR,
+    ENUMERATION_MIN_FILL,
+    LOOKAHEAD_TRIGGER_ATTEMPTS,
 )
 
 
@@ -60,7 +100,7 @@ class NFTGenerator:
         Args:
             config_file: Path to configuration file
             ruler_file: Path to rules file
-            seed: Random seed for reproducible runs
+            seed: Seed for reproducible runs (random if omitted)
             max_similar: Override max_similar_combinations
             include_overrides: Override include probability per trait
             max_attempts: Max attempts per NFT
@@ -99,9 +139,12 @@ class NFTGenerator:
 
         # Use injected trait tracker if provided, otherwise create new one
         if not hasattr(self, 'trait_tracker') or not self.trait_tracker:
-            self.trait_tracker = TraitTracker(max_similar_combinations)
+            self.trait_tracker = TraitTracker(
+                max_similar_combinations,
+                self.config.similarity_subset_size,
+                self.config.signature_traits,
+            )
 
-        self.generated_hashes = set()
         self.failed_attempts = Counter()
 
         # Apply include overrides
@@ -119,6 +162,40 @@ class NFTGenerator:
             else DEFAULT_MAX_TRAIT_ATTEMPTS
         )
 
+        # Integer IDs for trait types and options, and whole combinations
+        self.trait_index = TraitIndex.from_config(self.config)
+        self.combination_space = CombinationSpace(self.trait_index)
+        # Combination IDs of every planned NFT, in a compact table when possible
+        self.seen_combinations = create_combination_set(
+            self.combination_space.size.bit_length()
+        )
+        # Pack tracker patterns by option ID instead of trait-name tuples
+        self.trait_tracker.configure(self.trait_index)
+
+        # Binary resume state: combination IDs are appended to a log, the
+        # tracker is snapshotted with the number of logged IDs it covers
+        self._space_fingerprint = config_fingerprint(
+            self.trait_index.trait_order,
+            [self.trait_index.option_names[t] for t in self.trait_index.trait_order],
+        )
+        self._combination_log = CombinationLog(
+            self._seen_combinations_path,
+            self.combination_space.size.bit_length(),
+            self._space_fingerprint,
+        )
+        self._unsaved_combinations = self._combination_log.buffer()
+        self._logged_combinations = 0
+        self._tracker_saved_at: Optional[int] = None
+        # Every rendered NFT is appended to the run journal as it completes
+        self._journal = RunJournal(
+            self._run_journal_path,
+            self.combination_space.size.bit_length(),
+            self._space_fingerprint,
+        )
+        self.journal_records: Dict[int, JournalRecord] = {}
+        # False if the journal is missing or belongs to another configuration
+        self._journal_loaded = False
+
         # Precompute weights per trait for fast sampling
         # Convert rarity (1-5) to weights where 1 = rarest (lowest weight), 5 = most common (highest weight)
         self._option_cache = {}
@@ -127,14 +204,41 @@ class NFTGenerator:
             names = [o["name"] for o in options]
             # Use rarity value directly as weight: 1->1, 2->2, 3->3, 4->4, 5->5 (1 is rarest)
             weights = [o["rarity"] if o["rarity"] is not None else 3 for o in options]
-            self._option_cache[trait_type] = (options, names, weights)
+            option_ids = [self.trait_index.option_id(trait_type, n) for n in names]
+            alias_table = AliasTable(range(len(options)), weights)
+            self._option_cache[trait_type] = (
+                options,
+                names,
+                weights,
+                option_ids,
+                alias_table,
+            )
 
-        # Index rules by involved trait types for quicker checks
-        self._rules_by_then = defaultdict(list)
-        self._rules_by_if = defaultdict(list)
-        for rule in self.ruler.rules:
-            self._rules_by_then[rule.then_condition.trait_type].append(rule)
-            self._rules_by_if[rule.if_condition.trait_type].append(rule)
+        # Compile rules into per-option exclusion bitsets for quicker checks
+        self.rules = CompiledRules(self.trait_index, self.ruler.rules)
+
+        # Priority traits for uniqueness (use first 3 traits in order if not specified)
+        priority_traits = self.config.priority_traits or (
+            self.trait_order[:3] if len(self.trait_order) >= 3 else self.trait_order
+        )
+        remaining_traits = [t for t in self.trait_order if t not in priority_traits]
+        self.generation_order = priority_traits + remaining_traits
+        self.sampler = TraitSampler(
+            self.trait_index,
+            self.rules,
+            self.generation_order,
+            {t: data["rarity"] for t, data in self.traits.items()},
+            {t: cache[2] for t, cache in self._option_cache.items()},
+            {t: cache[4] for t, cache in self._option_cache.items()},
+        )
+        self.renderer = NFTRenderer(
+            self.config,
+            self.image_processor,
+            self.metadata_manager,
+            self.image_dir,
+            self.metadata_dir,
+            include_percent=self.sampler.include_percent,
+        )
 
         if not validate_skip:
             self.config_manager.validate_setup()
@@ -142,9 +246,17 @@ class NFTGenerator:
         # Thread lock for resume functionality to prevent race conditions
         self._resume_lock = threading.Lock()
 
-        # Seed RNG if provided
-        if seed is not None:
-            random.seed(seed)
+        # Every random draw comes from a counter-based stream under this
+        # seed, so no RNG state has to be saved to reproduce a run
+        self.seed = seed if seed is not None else random.SystemRandom().getrandbits(64)
+        # Stream for the one-off selection helpers below
+        self._uniform = CounterRandom(self.seed, RNG_STREAM_SELECT)
+        # Set while planning with vectorized candidate batches
+        self._batch_sampler: Optional[BatchCandidateSampler] = None
+        # Built on first use; counting can be expensive for large configs
+        self._feasibility: Optional[FeasibilityAnalyzer] = None
+        # Set once uniqueness rejections get frequent (see _enable_lookahead)
+        self._lookahead: Optional[SelectionLookahead] = None
 
         # Resume state
         self._resume_load_existing()
@@ -158,9 +270,15 @@ class NFTGenerator:
         os.makedirs(self.image_dir, exist_ok=True)
         os.makedirs(self.metadata_dir, exist_ok=True)
         # Paths for resume state
-        self._seen_hashes_path = os.path.join(self.output_dir, SEEN_HASHES_FILE)
+        self._seen_combinations_path = os.path.join(
+            self.output_dir, SEEN_COMBINATIONS_FILE
+        )
+        self._legacy_seen_hashes_path = os.path.join(
+            self.output_dir, LEGACY_SEEN_HASHES_FILE
+        )
         self._tracker_state_path = os.path.join(self.output_dir, TRACKER_STATE_FILE)
-        self._rng_state_path = os.path.join(self.output_dir, RNG_STATE_FILE)
+        self._run_journal_path = os.path.join(self.output_dir, RUN_JOURNAL_FILE)
+        self._plan_path = os.path.join(self.output_dir, PLAN_FILE)
 
     def should_include_trait(self, trait_type: str) -> bool:
         """Determine if a trait should be included based on rarity weight."""
@@ -171,97 +289,93 @@ class NFTGenerator:
             weight = 1
         # Convert weight (1-5) to probability (1 = 20% rarest, 5 = 100% most common)
         probability = weight * 20  # 1->20%, 2->40%, 3->60%, 4->80%, 5->100%
-        return random.random() * 100 < probability
+        return self._uniform.random() * 100 < probability
+
+    def _select_option_index(self, trait_type: str) -> int:
+        """Draw an option index for a trait type based on weighted randomness."""
+        return self._option_cache[trait_type][4].draw(self._uniform.random())
 
     def select_trait(self, trait_type: str) -> Dict[str, Any]:
         """Select a trait option based on weighted randomness."""
-        options, _names, weights = self._option_cache[trait_type]
-        idx = random.choices(range(len(options)), weights=weights, k=1)[0]
-        return options[idx]
+        return self._option_cache[trait_type][0][self._select_option_index(trait_type)]
 
     def is_valid_trait(
         self, selected_traits: Dict[str, str], new_trait_type: str, new_trait_value: str
     ) -> bool:
         """Check if a new trait value is valid according to the rules."""
-        # Rules where then.trait_type == new_trait_type
-        for rule in self._rules_by_then.get(new_trait_type, []):
-            if_condition = rule.if_condition
-            then_condition = rule.then_condition
-            condition_trait_type = if_condition.trait_type
-            if condition_trait_type in selected_traits:
-                condition_value = selected_traits[condition_trait_type]
-                condition_values = if_condition.value
-                if "*" in condition_values or condition_value in condition_values:
-                    excluded_values = then_condition.excluded_values
-                    if "*" in excluded_values or new_trait_value in excluded_values:
-                        return False
-
-        # Rules where if.trait_type == new_trait_type
-        for rule in self._rules_by_if.get(new_trait_type, []):
-            if_condition = rule.if_condition
-            then_condition = rule.then_condition
-            condition_values = if_condition.value
-            if "*" in condition_values or new_trait_value in condition_values:
-                affected_trait = then_condition.trait_type
-                if affected_trait in selected_traits:
-                    existing_value = selected_traits[affected_trait]
-                    excluded_values = then_condition.excluded_values
-                    if "*" in excluded_values or existing_value in excluded_values:
-                        return False
+        return self.rules.is_valid(selected_traits, new_trait_type, new_trait_value)
+
+    def _next_candidate(self, nft_id: int, attempt: int) -> Optional[Dict[str, str]]:
+        """Return the next rule-valid candidate, or None on a dead end."""
+        # Saturated options are pruned while drawing, which batches cannot do
+        if self._batch_sampler is not None and self._lookahead is None:
+            return self._batch_sampler.next_candidate()
+        # Every draw comes from the options still legal given earlier picks
+        rng = CounterRandom(self.seed, RNG_STREAM_CANDIDATES, nft_id, attempt)
+        return self.sampler.sample(rng, self._lookahead)
+
+    def _generate_combination(self, nft_id: int) -> Tuple[Dict[str, str], int]:
+        """
+        Draw a unique trait combination and reserve it.
 
-        return True
+        Attempt ``a`` for an ID draws from the stream (seed, ID, a), so the
+        candidates tried for an ID do not depend on the IDs planned before
+        it, only on which of their combinations were already reserved.
 
-    def generate_nft(self, nft_id: int) -> Tuple[Dict[str, str], str]:
-        """Generate a single NFT with detailed error reporting."""
+        Returns:
+            Tuple of (traits, combination ID)
+        """
+        encode = self.combination_space.encode
         for attempt in range(self.MAX_ATTEMPTS):
-            traits = OrderedDict()
-            valid_combination = True
-
-            # Priority traits for uniqueness (use first 3 traits in order if not specified)
-            priority_traits = self.config.priority_traits or (
-                self.trait_order[:3]
-                if len(self.trait_order) >= 3
-                else self.trait_order
-            )
-            remaining_traits = [t for t in self.trait_order if t not in priority_traits]
-            generation_order = priority_traits + remaining_traits
-
-            for trait_type in generation_order:
-                if self.should_include_trait(trait_type):
-                    valid_trait = False
-                    trait_attempts = 0
-
-                    for _ in range(self.MAX_TRAIT_ATTEMPTS):
-                        trait = self.select_trait(trait_type)
-                        if self.is_valid_trait(traits, trait_type, trait["name"]):
-                            traits[trait_type] = trait["name"]
-                            valid_trait = True
-                            break
-                        trait_attempts += 1
-
-                    if not valid_trait:
-                        valid_combination = False
-                        self.failed_attempts["trait_validation"] += 1
-                        logging.debug(
-                            f"Failed to find valid trait for {trait_type} in NFT {nft_id}"
-                        )
-                        break
-
-            if valid_combination and self.trait_tracker.is_unique_enough(traits):
-                nft_hash = hashlib.sha256(
-                    json.dumps(traits, sort_keys=True).encode()
-                ).hexdigest()
-                if nft_hash not in self.generated_hashes:
-                    self.generated_hashes.add(nft_hash)
-                    self.trait_tracker.update_patterns(traits)
-                    return traits, nft_hash
-            else:
+            if attempt == LOOKAHEAD_TRIGGER_ATTEMPTS and self._lookahead is None:
+                self._enable_lookahead()
+            traits = self._next_candidate(nft_id, attempt)
+            if traits is None:
+                self.failed_attempts["trait_validation"] += 1
+                logging.debug(f"Dead end while sampling traits for NFT {nft_id}")
+                continue
+
+            combination_id = encode(traits)
+            if combination_id in self.seen_combinations:
                 self.failed_attempts["uniqueness"] += 1
+                continue
+            if self.trait_tracker.is_unique_enough(traits):
+                self._reserve(combination_id, traits)
+                return traits, combination_id
+            self.failed_attempts["uniqueness"] += 1
 
         raise Exception(
             f"Failed to generate unique NFT #{nft_id} after {self.MAX_ATTEMPTS} attempts"
         )
 
+    def _reserve(self, combination_id: int, traits: Dict[str, str]) -> None:
+        """Mark a combination as used and record its patterns."""
+        self.seen_combinations.add(combination_id)
+        self._unsaved_combinations.append(combination_id)
+        self.trait_tracker.update_patterns(traits)
+
+    def _enable_lookahead(self) -> None:
+        """Prune options that would complete a saturated pattern from now on."""
+        self.trait_tracker.enable_lookahead(
+            self.combination_space.decode(combination_id)
+            for combination_id in self.seen_combinations
+        )
+        self._lookahead = SelectionLookahead(self.trait_tracker)
+        logging.info(
+            f"Uniqueness rejections are frequent; pruning saturated options "
+            f"before sampling ({len(self.seen_combinations):,} NFTs indexed)"
+        )
+
+    @staticmethod
+    def trait_hash(traits: Dict[str, str]) -> str:
+        """Return the SHA-256 trait hash emitted in metadata."""
+        return hashlib.sha256(json.dumps(traits, sort_keys=True).encode()).hexdigest()
+
+    def generate_nft(self, nft_id: int) -> Tuple[Dict[str, str], str]:
+        """Generate a single NFT with detailed error reporting."""
+        traits, _combination_id = self._generate_combination(nft_id)
+        return traits, self.trait_hash(traits)
+
     def save_nft(
         self,
         traits: Dict[str, str],
@@ -273,305 +387,732 @@ class NFTGenerator:
         gif_duration_ms: int = DEFAULT_GIF_DURATION_MS,
         gif_loop: int = DEFAULT_GIF_LOOP,
     ) -> Optional[str]:
+        """Save NFT image and metadata; see ``NFTRenderer.save_nft``."""
+        return self.renderer.save_nft(
+            traits,
+            nft_id,
+            nft_hash,
+            compact_metadata=compact_metadata,
+            img_format=img_format,
+            quality=quality,
+            gif_duration_ms=gif_duration_ms,
+            gif_loop=gif_loop,
+        )
+
+    def _resume_load_existing(self) -> None:
+        """Load existing state for resume functionality with thread safety."""
+        with self._resume_lock:
+            try:
+                # Load seen combination IDs
+                if self._combination_log.exists():
+                    logged = self._combination_log.load()
+                    self.seen_combinations.update(logged)
+                    self._logged_combinations = len(logged)
+                    if logged:
+                        self._load_tracker_state(logged)
+                elif os.path.exists(self._legacy_seen_hashes_path):
+                    self._import_legacy_state()
+            except Exception as e:
+                logging.warning(f"Failed to load resume state: {e}")
+            # Replay the run journal
+            try:
+                if self._journal.exists():
+                    self.journal_records = self._journal.load()
+                    self._journal_loaded = True
+            except (OSError, StateFormatError) as e:
+                logging.warning(f"Ignoring run journal: {e}")
+                self.journal_records = {}
+
+    def _import_legacy_state(self) -> None:
         """
-        Save NFT image and metadata with enhanced error handling.
+        Reserve the combinations of an output directory from before the binary
+        resume state.
+
+        Such directories list SHA-256 trait hashes in seen_hashes.json, which
+        cannot be decoded, so the combinations are read back from the
+        metadata files. Their tracker_state.json and rng_state.json are not
+        needed: the tracker is rebuilt from the combinations, and random
+        streams no longer carry state. The reserved IDs are written to the
+        combination log on the next save.
+        """
+        with open(self._legacy_seen_hashes_path, "r") as f:
+            hashes = set(json.load(f))
+        restored = 0
+        for name in scan_directory(self.metadata_dir):
+            if not name.endswith(".json"):
+                continue
+            try:
+                traits, combination_id = self._read_metadata_traits(
+                    os.path.join(self.metadata_dir, name)
+                )
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                logging.warning(f"Skipping unreadable metadata {name}: {e}")
+                continue
+            if combination_id is None:
+                continue
+            if combination_id not in self.seen_combinations:
+                self._reserve(combination_id, traits)
+                restored += 1
+            hashes.discard(self.trait_hash(traits))
+        logging.info(
+            f"Imported {restored} combinations from {LEGACY_SEEN_HASHES_FILE} "
+            f"and existing metadata"
+        )
+        if hashes:
+            logging.warning(
+                f"{len(hashes)} combinations listed in {LEGACY_SEEN_HASHES_FILE} "
+                f"have no metadata matching the configuration and cannot be "
+                f"restored; they may be generated again"
+            )
 
-        Args:
-            traits: Dictionary of trait types and values
-            nft_id: ID of the NFT
-            nft_hash: Hash of the NFT traits
-            compact_metadata: Whether to write compact JSON metadata
-            img_format: Output image format
-            quality: Quality for lossy formats
-            gif_duration_ms: Frame duration for GIF output
-            gif_loop: Loop count for GIF output
+    def _read_metadata_traits(
+        self, metadata_path: str
+    ) -> Tuple[Dict[str, str], Optional[int]]:
+        """
+        Read the traits of an NFT metadata file.
 
         Returns:
-            str: Background color used
+            Tuple of (traits, combination ID or None if the traits are not
+            in the configuration)
+        """
+        with open(metadata_path, "r") as f:
+            attributes = json.load(f)["attributes"]
+        traits = {a["trait_type"]: a["value"] for a in attributes}
+        return traits, self.combination_space.try_encode(traits)
+
+    def _tracker_fingerprint(self) -> bytes:
+        return config_fingerprint(
+            self._space_fingerprint.hex(), self.trait_tracker.state_signature()
+        )
+
+    def _load_tracker_state(self, logged: Sequence[int]) -> None:
+        """
+        Load the tracker snapshot and replay combinations logged after it.
+
+        Args:
+            logged: Combination IDs in log order
         """
         try:
-            # Determine trait file paths
-            trait_layers = {}
-            is_animated = False
-            gif_layers = []
-            static_layers = []
-
-            for trait_type in self.trait_order:
-                if trait_type in traits:
-                    base_path = f"traits/{trait_type}/{traits[trait_type]}"
-                    gif_path = base_path + ".gif"
-                    png_path = base_path + ".png"
-                    if os.path.exists(gif_path):
-                        is_animated = True
-                        gif_layers.append(gif_path)
-                        trait_layers[trait_type] = gif_path
-                    elif os.path.exists(png_path):
-                        static_layers.append(png_path)
-                        trait_layers[trait_type] = png_path
-                    else:
-                        raise FileNotFoundError(
-                            f"Missing trait file: {gif_path} or {png_path}"
-                        )
+            state = read_snapshot(self._tracker_state_path, self._tracker_fingerprint())
+            covered = state.pop("covered", [None])[0]
+            if covered is None or covered > len(logged):
+                raise StateFormatError("Tracker state does not match the combination log")
+            self.trait_tracker.load_state(state)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Rebuilding tracker state: {e}")
+            self._rebuild_tracker()
+            return
+        decode = self.combination_space.decode
+        for combination_id in logged[covered:]:
+            self.trait_tracker.update_patterns(decode(combination_id))
+        self._tracker_saved_at = covered
+
+    def _rebuild_tracker(self) -> None:
+        """Replay every reserved combination into a fresh trait tracker."""
+        tracker = TraitTracker(
+            self.trait_tracker.MAX_SIMILAR_COMBINATIONS,
+            self.trait_tracker.PATTERN_SIZE,
+            self.trait_tracker.signature_groups,
+        )
+        tracker.configure(self.trait_index)
+        for combination_id in self.seen_combinations:
+            tracker.update_patterns(self.combination_space.decode(combination_id))
+        self.trait_tracker = tracker
+        self._tracker_saved_at = None
 
-            # Ensure image_size is in config
-            if not self.config.image_size:
-                raise ValueError(
-                    "image_size is required in config.json. Please run 'python get_traits.py' to generate config with detected image size."
-                )
+    def _resume_pending_ids(
+        self,
+        num_nfts: int,
+        img_format: str,
+        verify_outputs: bool = False,
+        adopt: bool = True,
+    ) -> List[int]:
+        """
+        Find the IDs that still need rendering from one scan of the output directories.
 
-            if is_animated:
-                # Get image size from config (required field)
-                image_size = tuple(self.config.image_size)
+        A journaled NFT is kept while its image and metadata files have the
+        journaled size and mtime (and digests, with ``verify_outputs``).
+        Unjournaled outputs are re-rendered, except in output directories
+        without a usable journal (written before it existed, or for another
+        configuration), whose image and metadata pairs are adopted into the
+        journal. The combinations of every kept NFT are reserved, so none
+        is planned again.
 
-                # Compose animated NFT
-                frames, dur, lp = self.image_processor.compose_animated_nft(
-                    gif_layers, static_layers, image_size, gif_duration_ms, gif_loop
-                )
-                ext = "gif"
-                image_path = f"{self.image_dir}/{nft_id}.{ext}"
-                frames[0].save(
-                    image_path,
-                    save_all=True,
-                    append_images=frames[1:],
-                    loop=lp if lp is not None else gif_loop,
-                    duration=dur if dur is not None else gif_duration_ms,
-                    disposal=2,
-                )
-            else:
-                # Get image size from config (required field)
-                image_size = tuple(self.config.image_size)
+        Args:
+            num_nfts: Size of the collection
+            img_format: Requested image format
+            verify_outputs: Also compare file digests, in parallel
+            adopt: Journal outputs from before the journal instead of only
+                skipping them
 
-                # Compose static NFT
-                base_image = self.image_processor.compose_static_nft(
-                    trait_layers, self.trait_order, traits, image_size
+        Returns:
+            Sorted IDs whose outputs are missing, changed or corrupt
+        """
+        images = scan_directory(self.image_dir)
+        metadata = scan_directory(self.metadata_dir)
+        static_ext = "jpg" if img_format.lower() == "jpeg" else img_format.lower()
+        legacy = not self._journal_loaded
+        pending: List[int] = []
+        intact: List[JournalRecord] = []
+        adoptable: List[Tuple[int, str]] = []
+        for nft_id in range(1, num_nfts + 1):
+            record = self.journal_records.get(nft_id)
+            metadata_stat = metadata.get(f"{nft_id}.json")
+            if record is not None:
+                outputs = record.outputs
+                if (
+                    outputs.image_ext in (static_ext, "gif")
+                    and metadata_stat is not None
+                    and outputs.stats_match(
+                        images.get(f"{nft_id}.{outputs.image_ext}"), metadata_stat
+                    )
+                ):
+                    intact.append(record)
+                    continue
+            elif legacy and metadata_stat is not None:
+                ext = next(
+                    (e for e in (static_ext, "gif") if f"{nft_id}.{e}" in images), None
                 )
-
-                # Save image
-                ext = img_format.lower()
-                if ext == "jpeg":
-                    ext = "jpg"
-                image_path = f"{self.image_dir}/{nft_id}.{ext}"
-                save_kwargs = {}
-                if ext in ("jpg", "jpeg", "webp") and quality is not None:
-                    save_kwargs["quality"] = int(quality)
-                if ext in ("jpg", "jpeg"):
-                    save_kwargs["optimize"] = True
-                    # convert to RGB for JPEG
-                    base_to_save = base_image.convert("RGB")
+                if ext is not None:
+                    adoptable.append((nft_id, ext))
+                    continue
+            pending.append(nft_id)
+
+        if verify_outputs and intact:
+            # Hashing releases the GIL, so threads read files in parallel
+            with ThreadPoolExecutor() as pool:
+                matches = pool.map(self._digests_match, intact)
+                corrupt = [r.nft_id for r, ok in zip(intact, matches) if not ok]
+            if corrupt:
+                logging.warning(f"Re-rendering {len(corrupt)} NFTs with corrupt outputs")
+                pending.extend(corrupt)
+                corrupt_ids = set(corrupt)
+                intact = [r for r in intact if r.nft_id not in corrupt_ids]
+        kept = intact
+        if adoptable:
+            with ThreadPoolExecutor() as pool:
+                adopted = list(pool.map(lambda a: self._adopt_outputs(*a), adoptable))
+            for (nft_id, _ext), record in zip(adoptable, adopted):
+                if record is None:
+                    pending.append(nft_id)
                 else:
-                    base_to_save = base_image
-                base_to_save.save(
-                    image_path, format=None if ext != "webp" else "WEBP", **save_kwargs
+                    kept.append(record)
+                    if adopt:
+                        self._record_rendered(nft_id, record.combination_id, record.outputs)
+            count = len(adoptable) - adopted.count(None)
+            if adopt:
+                self._journal.sync()
+                logging.info(f"Adopted {count} existing NFTs into the run journal")
+            else:
+                logging.info(f"Skipping {count} NFTs rendered by an earlier run")
+        # Kept outputs may predate the combination log, or outlive a log
+        # rejected for another configuration
+        for record in kept:
+            if record.combination_id not in self.seen_combinations:
+                self._reserve(
+                    record.combination_id,
+                    self.combination_space.decode(record.combination_id),
                 )
 
-            logging.info(f"Saved NFT image: {image_path}")
+        skipped = num_nfts - len(pending)
+        if skipped:
+            logging.info(f"Resuming: {skipped} of {num_nfts} NFTs already rendered")
+        return sorted(pending)
 
-            # Create and save metadata
-            metadata = self.metadata_manager.create_nft_metadata(
-                nft_id,
-                traits,
-                nft_hash,
-                ipfs_cid=self.config.ipfs_cid or "<your-ipfs-cid>",
-                image_ext=ext,
-                metadata_config=self.config.metadata or {},
-            )
+    def _output_paths(self, nft_id: int, image_ext: str) -> Tuple[str, str]:
+        """Return the image and metadata paths of an NFT."""
+        return (
+            os.path.join(self.image_dir, f"{nft_id}.{image_ext}"),
+            os.path.join(self.metadata_dir, f"{nft_id}.json"),
+        )
 
-            self.metadata_manager.save_nft_metadata(nft_id, metadata, compact_metadata)
-            logging.info(f"Saved NFT metadata: {self.metadata_dir}/{nft_id}.json")
+    def _digests_match(self, record: JournalRecord) -> bool:
+        """Return True if a journaled NFT's files still have their digests."""
+        return record.outputs.digests_match(
+            *self._output_paths(record.nft_id, record.outputs.image_ext)
+        )
+
+    def _adopt_outputs(self, nft_id: int, image_ext: str) -> Optional[JournalRecord]:
+        """
+        Describe outputs rendered before the run journal existed.
 
+        Returns:
+            JournalRecord, or None if the metadata does not match the configuration
+        """
+        image_path, metadata_path = self._output_paths(nft_id, image_ext)
+        try:
+            _traits, combination_id = self._read_metadata_traits(metadata_path)
+            if combination_id is None:
+                return None
+            return JournalRecord(
+                nft_id, combination_id, OutputFiles.describe(image_path, metadata_path)
+            )
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logging.warning(f"Cannot adopt existing outputs of NFT {nft_id}: {e}")
             return None
 
-        except Exception as e:
-            logging.error(f"Error saving NFT {nft_id}: {str(e)}")
-            raise
+    def _record_rendered(
+        self, nft_id: int, combination_id: int, outputs: OutputFiles
+    ) -> None:
+        """Append a rendered NFT to the run journal."""
+        record = JournalRecord(nft_id, combination_id, outputs)
+        self.journal_records[nft_id] = record
+        try:
+            self._journal.append(record)
+        except (OSError, StateFormatError) as e:
+            logging.warning(f"Failed to journal NFT {nft_id}: {e}")
 
-    def _resume_load_existing(self) -> None:
-        """Load existing state for resume functionality with thread safety."""
+    def _resume_save_state(self) -> None:
+        """
+        Save current state for resume functionality with thread safety and atomic writes.
+
+        Called at phase boundaries only; progress within the render phase
+        is kept by the run journal, which this compacts.
+        """
         with self._resume_lock:
             try:
-                # Load generated hashes
-                if os.path.exists(self._seen_hashes_path):
-                    with open(self._seen_hashes_path, "r") as f:
-                        self.generated_hashes = set(json.load(f))
-                # Load tracker
-                if os.path.exists(self._tracker_state_path):
-                    with open(self._tracker_state_path, "r") as f:
-                        state = json.load(f)
-                    self.trait_tracker.bsh_combinations = set(
-                        tuple(x) for x in state.get("bsh", [])
-                    )
-                    self.trait_tracker.trait_patterns = defaultdict(
-                        int,
-                        {
-                            tuple(map(tuple, k.split("||"))): v
-                            for k, v in state.get("patterns", {}).items()
-                        },
+                # Append combination IDs reserved since the last save
+                if self._unsaved_combinations:
+                    self._combination_log.append(self._unsaved_combinations)
+                    self._logged_combinations += len(self._unsaved_combinations)
+                    self._unsaved_combinations = self._combination_log.buffer()
+
+                # Snapshot the tracker only when it covers new combinations
+                if self._tracker_saved_at != self._logged_combinations:
+                    state = self.trait_tracker.get_state()
+                    state["covered"] = array("Q", [self._logged_combinations])
+                    write_snapshot(
+                        self._tracker_state_path, self._tracker_fingerprint(), state
                     )
-            except Exception as e:
-                logging.warning(f"Failed to load resume state: {e}")
-            # Load RNG state if present
-            try:
-                if os.path.exists(self._rng_state_path):
-                    with open(self._rng_state_path, "r") as f:
-                        state = json.load(f)
-                    random.setstate(tuple(state))
-            except Exception as e:
-                logging.warning(f"Failed to load RNG state: {e}")
+                    self._tracker_saved_at = self._logged_combinations
 
-    def _resume_save_state(self) -> None:
-        """Save current state for resume functionality with thread safety and atomic writes."""
-        with self._resume_lock:
-            try:
-                # Write seen hashes atomically
-                with resource_manager.atomic_file_write(Path(self._seen_hashes_path)) as f:
-                    json.dump(sorted(list(self.generated_hashes)), f)
-
-                # Serialize tracker patterns
-                patterns_serialized = {
-                    "||".join([f"{a}:{b}" for (a, b) in pattern]): count
-                    for pattern, count in self.trait_tracker.trait_patterns.items()
-                }
-                tracker_data = {
-                    "bsh": sorted(list(self.trait_tracker.bsh_combinations)),
-                    "patterns": patterns_serialized,
-                }
-
-                # Write tracker state atomically
-                with resource_manager.atomic_file_write(Path(self._tracker_state_path)) as f:
-                    json.dump(tracker_data, f)
+                # Drop journal records superseded by re-renders
+                if self._journal.records_on_disk > len(self.journal_records):
+                    self._journal.compact(
+                        self.journal_records[nft_id]
+                        for nft_id in sorted(self.journal_records)
+                    )
 
             except Exception as e:
                 logging.warning(f"Failed to save resume state: {e}")
 
-            # Save RNG state atomically
-            try:
-                state = random.getstate()
-                with resource_manager.atomic_file_write(Path(self._rng_state_path)) as f:
-                    json.dump(list(state), f)
-            except Exception as e:
-                logging.warning(f"Failed to save RNG state: {e}")
+    def _feasibility_analyzer(self) -> FeasibilityAnalyzer:
+        """Return the feasibility analyzer, creating it on first use."""
+        if self._feasibility is None:
+            self._feasibility = FeasibilityAnalyzer(
+                self.trait_index,
+                self.rules,
+                self.sampler.include_percent,
+                {t: cache[2] for t, cache in self._option_cache.items()},
+                max_similar=self.trait_tracker.MAX_SIMILAR_COMBINATIONS,
+                pattern_size=self.trait_tracker.PATTERN_SIZE,
+                signature_groups=self.trait_tracker.signature_groups,
+            )
+        return self._feasibility
+
+    def analyze_feasibility(
+        self, requested: int, existing: Optional[int] = None
+    ) -> FeasibilityReport:
+        """
+        Analyze whether a collection of the given size can be generated.
+
+        Args:
+            requested: Total number of unique NFTs wanted
+            existing: NFTs already planned (default: reserved combinations)
+
+        Returns:
+            FeasibilityReport: Combination counts, bounds and attempt estimates
+        """
+        if existing is None:
+            existing = len(self.seen_combinations)
+        return self._feasibility_analyzer().analyze(
+            requested, existing=existing, max_attempts=self.MAX_ATTEMPTS
+        )
 
-    def _generate_single_nft_worker(
+    def check_feasibility(self, num_new: int) -> FeasibilityReport:
+        """
+        Log a feasibility report and abort if the new NFTs cannot be planned.
+
+        Args:
+            num_new: NFTs about to be planned on top of the reserved ones
+
+        Returns:
+            FeasibilityReport: The report that was logged
+
+        Raises:
+            ValueError: If the requested collection size is provably unreachable
+        """
+        report = self.analyze_feasibility(len(self.seen_combinations) + num_new)
+        for line in report.summary():
+            logging.info(line)
+        if report.provably_infeasible:
+            raise ValueError(
+                f"Cannot generate {report.requested} unique NFTs: this configuration "
+                f"allows at most {report.proven_limit}"
+            )
+        if not report.feasible:
+            logging.warning(
+                f"Estimated only {report.max_reachable} reachable combinations for "
+                f"{report.requested} NFTs; planning will likely fail for some IDs"
+            )
+        elif (
+            report.failure_probability() > FEASIBILITY_FAILURE_WARN_PROBABILITY
+        ):
+            logging.warning(
+                f"The last NFTs may exceed {self.MAX_ATTEMPTS} attempts; consider "
+                f"fewer NFTs, more options or a higher max_similar_combinations"
+            )
+        return report
+
+    def _use_enumeration(
         self,
-        nft_id: int,
-        compact_metadata: bool,
-        img_format: str,
-        quality: Optional[int],
-        gif_duration_ms: int,
-        gif_loop: int,
-        dry_run: bool,
-    ) -> Optional[Dict[str, Any]]:
+        num_new: int,
+        enumeration_limit: Optional[int],
+        check_feasibility: bool = True,
+    ) -> bool:
         """
-        Worker function for generating a single NFT in multiprocessing.
+        Decide whether to plan by enumerating every valid combination.
+
+        Enumeration needs an exact count no larger than ``enumeration_limit``
+        and pays off once drawing with retries is expected to cost at least
+        as many candidates as a full pass over the space. Without the
+        feasibility report only the exact count is computed, and enumeration
+        is used once the plan fills ENUMERATION_MIN_FILL of the space.
+        """
+        limit = ENUMERATION_LIMIT if enumeration_limit is None else enumeration_limit
+        if not limit or not num_new:
+            return False
+        requested = len(self.seen_combinations) + num_new
+        if not check_feasibility:
+            valid = self._feasibility_analyzer().exact_valid()
+            if valid is None or valid > limit:
+                return False
+            return requested >= valid * ENUMERATION_MIN_FILL
+        report = self.analyze_feasibility(requested)
+        if not report.exact or report.valid_combinations > limit:
+            return False
+        expected_draws = num_new * report.expected_attempts[-1][1]
+        return expected_draws >= report.valid_combinations
+
+    def _plan_exhaustive(
+        self, nft_ids: List[int]
+    ) -> Tuple[CollectionPlan, List[int]]:
+        """
+        Plan IDs by drawing enumerated valid combinations without replacement.
+
+        Candidates come in weighted random order and each is offered once,
+        so there is no retry loop. The enumeration keeps a pool of
+        ENUMERATION_POOL_FACTOR candidates per ID; IDs left over when the pool
+        runs out are planned by sampling unless it held the whole space.
 
         Args:
-            nft_id: ID of the NFT to generate
-            compact_metadata: Whether to write compact JSON metadata
-            img_format: Output image format
-            quality: Quality for lossy formats
-            gif_duration_ms: Frame duration for GIF output
-            gif_loop: Loop count for GIF output
-            dry_run: Whether to simulate without writing files
+            nft_ids: IDs to plan, in planning order
 
         Returns:
-            Dictionary with NFT data or None if failed
+            Tuple of (planned ID -> trait assignments, IDs left to sample)
         """
-        try:
-            nft_traits, nft_hash = self.generate_nft(nft_id)
-            if not dry_run:
-                self.save_nft(
-                    nft_traits,
-                    nft_id,
-                    nft_hash,
-                    compact_metadata=compact_metadata,
-                    img_format=img_format,
-                    quality=quality,
-                    gif_duration_ms=gif_duration_ms,
-                    gif_loop=gif_loop,
+        logging.info("Planning by enumerating every valid trait combination")
+        sampler = ExhaustiveSampler(
+            self.sampler,
+            self.combination_space,
+            seed=derive_seed(
+                self.seed, RNG_STREAM_ENUMERATION, len(self.seen_combinations)
+            ),
+            pool_size=len(nft_ids) * ENUMERATION_POOL_FACTOR,
+        )
+        plan = CollectionPlan()
+        pending = iter(nft_ids)
+        nft_id = next(pending, None)
+        with tqdm(total=len(nft_ids), desc="Planning NFTs", unit="NFT") as progress:
+            for traits, combination_id in sampler.candidates():
+                if nft_id is None:
+                    break
+                if combination_id in self.seen_combinations or not (
+                    self.trait_tracker.is_unique_enough(traits)
+                ):
+                    self.failed_attempts["uniqueness"] += 1
+                    continue
+                self._reserve(combination_id, traits)
+                plan.add(
+                    PlannedNFT(
+                        nft_id=nft_id,
+                        traits=traits,
+                        nft_hash=self.trait_hash(traits),
+                        combination_id=combination_id,
+                    )
                 )
-            return {
-                "id": nft_id,
-                "image_name": f"{nft_id}",
-                "traits": nft_traits,
-                "hash": nft_hash,
-            }
+                progress.update(1)
+                nft_id = next(pending, None)
+        leftover = [] if nft_id is None else [nft_id, *pending]
+        if leftover and sampler.complete:
+            unplanned = len(leftover)
+            leftover = []
+            logging.error(
+                f"Failed to plan {unplanned} NFTs: every valid combination is "
+                f"already used or exceeds the uniqueness limits"
+            )
+        logging.info(
+            f"Planned {len(plan)}/{len(nft_ids)} NFTs after enumerating "
+            f"{sampler.enumerated} combinations"
+        )
+        return plan, leftover
+
+    def plan_collection(
+        self,
+        nft_ids: List[int],
+        batch_size: Optional[int] = None,
+        enumeration_limit: Optional[int] = None,
+        check_feasibility: bool = True,
+    ) -> CollectionPlan:
+        """
+        Plan trait assignments for the given IDs without rendering anything.
+
+        Selection and uniqueness tracking happen here, so the resulting plan
+        can be rendered later in any order or process.
+
+        Args:
+            nft_ids: IDs to plan, in planning order
+            batch_size: Rows per vectorized candidate batch; 0 disables
+                batching, None enables it for runs of BATCH_PLANNING_THRESHOLD+
+            enumeration_limit: Largest valid-combination count for which the
+                space may be enumerated instead of sampled (0 disables,
+                None uses ENUMERATION_LIMIT)
+            check_feasibility: Whether the feasibility report may be computed
+                to decide on enumeration
+
+        Returns:
+            CollectionPlan: Planned ID -> trait assignments
+        """
+        plan = CollectionPlan()
+        requested = len(nft_ids)
+        if self._use_enumeration(requested, enumeration_limit, check_feasibility):
+            plan, nft_ids = self._plan_exhaustive(nft_ids)
+            if not nft_ids:
+                return plan
+            logging.info(f"Planning the remaining {len(nft_ids)} NFTs by sampling")
+
+        if batch_size is None:
+            batch_size = (
+                DEFAULT_CANDIDATE_BATCH_SIZE
+                if len(nft_ids) >= BATCH_PLANNING_THRESHOLD and NUMPY_AVAILABLE
+                else 0
+            )
+        if batch_size and not NUMPY_AVAILABLE:
+            logging.warning("numpy not available, planning without candidate batches")
+            batch_size = 0
+        if batch_size:
+            logging.info(f"Planning with vectorized candidate batches of {batch_size}")
+            self._batch_sampler = BatchCandidateSampler(
+                self.trait_index,
+                self.rules,
+                self.generation_order,
+                self.sampler.include_percent,
+                {t: cache[2] for t, cache in self._option_cache.items()},
+                seed=derive_seed(
+                    self.seed, RNG_STREAM_BATCH, len(self.seen_combinations)
+                ),
+                batch_size=batch_size,
+            )
+
+        try:
+            for nft_id in tqdm(nft_ids, desc="Planning NFTs", unit="NFT"):
+                try:
+                    traits, combination_id = self._generate_combination(nft_id)
+                    plan.add(
+                        PlannedNFT(
+                            nft_id=nft_id,
+                            traits=dict(traits),
+                            nft_hash=self.trait_hash(traits),
+                            combination_id=combination_id,
+                        )
+                    )
+                except Exception as e:
+                    logging.error(f"Failed to plan NFT {nft_id}: {str(e)}")
+        finally:
+            if self._batch_sampler is not None:
+                self.failed_attempts["trait_validation"] += self._batch_sampler.rejected
+                self._batch_sampler = None
+        logging.info(f"Planned {len(plan)}/{requested} NFTs")
+        return plan
+
+    def load_plan(self, plan_path: str) -> Optional[CollectionPlan]:
+        """
+        Load a plan file and register its combinations with the uniqueness state.
+
+        Entries referencing trait types or options that are no longer in the
+        configuration invalidate the whole plan.
+
+        Args:
+            plan_path: Path to a plan written by ``CollectionPlan.save``
+
+        Returns:
+            CollectionPlan or None if the file is missing or unusable
+        """
+        if not os.path.exists(plan_path):
+            return None
+        try:
+            plan = CollectionPlan.load(plan_path)
         except Exception as e:
-            logging.error(f"Failed to generate NFT {nft_id}: {str(e)}")
+            logging.warning(f"Failed to load plan {plan_path}: {e}")
             return None
 
+        for item in plan:
+            combination_id = self.combination_space.try_encode(item.traits)
+            if combination_id is None:
+                logging.warning(
+                    f"Ignoring plan {plan_path}: NFT {item.nft_id} uses traits "
+                    f"that are not in the configuration"
+                )
+                return None
+            item.combination_id = combination_id
+
+        # Planned combinations must stay reserved when more IDs are planned
+        for item in plan:
+            if item.combination_id not in self.seen_combinations:
+                self._reserve(item.combination_id, item.traits)
+        logging.info(f"Loaded collection plan with {len(plan)} NFTs: {plan_path}")
+        return plan
+
+    def _prepare_plan(
+        self,
+        pending_ids: List[int],
+        plan_path: str,
+        save: bool,
+        batch_size: Optional[int] = None,
+        check_feasibility: bool = True,
+        enumeration_limit: Optional[int] = None,
+    ) -> CollectionPlan:
+        """
+        Reuse an existing plan where possible and plan any missing IDs.
+
+        Args:
+            pending_ids: IDs that still need to be rendered
+            plan_path: Plan file to reuse and update
+            save: Whether to write the plan and resume state to disk
+            batch_size: Candidate batch size passed to plan_collection
+            check_feasibility: Abort before planning if the IDs cannot all be planned
+            enumeration_limit: Valid-combination limit for enumeration planning
+
+        Returns:
+            CollectionPlan: Plan covering the pending IDs that could be planned
+        """
+        plan = self.load_plan(plan_path) or CollectionPlan()
+        unplanned = [i for i in pending_ids if i not in plan]
+        if unplanned:
+            if check_feasibility:
+                self.check_feasibility(len(unplanned))
+            for item in self.plan_collection(
+                unplanned,
+                batch_size=batch_size,
+                enumeration_limit=enumeration_limit,
+                check_feasibility=check_feasibility,
+            ):
+                plan.add(item)
+            if save:
+                plan.save(plan_path)
+                self._resume_save_state()
+        return plan
+
     def generate_collection(
         self,
         num_nfts: int,
         workers: Optional[int] = None,
         compact_metadata: bool = False,
         dry_run: bool = False,
-        checkpoint_every: int = 25,
+        journal_sync_every: int = 25,
         img_format: str = "png",
         quality: Optional[int] = None,
         progress_callback: Optional[Callable] = None,
+        plan_file: Optional[str] = None,
+        plan_only: bool = False,
+        batch_size: Optional[int] = None,
+        check_feasibility: bool = True,
+        enumeration_limit: Optional[int] = None,
+        verify_outputs: bool = False,
     ) -> None:
         """
         Generate collection with enhanced progress tracking and error handling.
 
+        Generation runs in two phases: every pending ID is planned first
+        (trait selection and uniqueness), then the plan is rendered.
+
         Args:
             num_nfts: Number of NFTs to generate
             workers: Number of worker processes for multiprocessing
             compact_metadata: Whether to write compact JSON metadata
             dry_run: Whether to simulate without writing files
-            checkpoint_every: Checkpoint interval
+            journal_sync_every: Rendered NFTs between fsyncs of the run journal
             img_format: Output image format
             quality: Quality for lossy formats
             progress_callback: Optional callback function to report progress
+            plan_file: Plan file to reuse and update (default: output/plan.json)
+            plan_only: Stop after writing the plan without rendering
+            batch_size: Vectorized candidate batch size for planning (0 disables)
+            check_feasibility: Abort before planning when num_nfts is unreachable
+            enumeration_limit: Largest valid-combination count planned by
+                enumeration instead of sampling (0 disables)
+            verify_outputs: Check digests of already rendered outputs on resume
         """
         collection = []
         logging.info(f"Starting generation of {num_nfts} NFTs...")
 
         # Track statistics
 
-        pending_ids = [
-            i
-            for i in range(1, num_nfts + 1)
-            if not (
-                os.path.exists(os.path.join(self.output_dir, f"{i}.{img_format}"))
-                and os.path.exists(os.path.join(self.metadata_dir, f"{i}.json"))
-            )
-        ]
-        # Deterministic shuffle of IDs based on current RNG state
+        pending_ids = self._resume_pending_ids(
+            num_nfts, img_format, verify_outputs, adopt=not dry_run
+        )
+        # Deterministic shuffle of IDs under the run seed
+        random.Random(derive_seed(self.seed, RNG_STREAM_ID_ORDER, num_nfts)).shuffle(
+            pending_ids
+        )
+
+        # Phase 1: plan every pending ID up front. Selection and uniqueness
+        # tracking only ever happen here, in the parent process.
+        plan = self._prepare_plan(
+            pending_ids,
+            plan_file or self._plan_path,
+            save=plan_only or not dry_run,
+            batch_size=batch_size,
+            check_feasibility=check_feasibility,
+            enumeration_limit=enumeration_limit,
+        )
+        if plan_only:
+            logging.info(f"Plan-only run complete: {len(plan)} NFTs planned")
+            return
+        # IDs were assigned in shuffled order; render in layer-stack order
+        planned = plan.render_order(pending_ids, self.trait_index)
+
+        # Phase 2: render the plan
+        self._journal.sync_every = max(1, journal_sync_every)
+        options = RenderOptions(
+            compact_metadata=compact_metadata,
+            img_format=img_format,
+            quality=quality,
+            gif_duration_ms=DEFAULT_GIF_DURATION_MS,
+            gif_loop=DEFAULT_GIF_LOOP,
+            dry_run=dry_run,
+        )
         try:
-            rng = random.Random()
-            rng.setstate(random.getstate())
-            rng.shuffle(pending_ids)
-        except Exception:
-            pass
-
-        # If workers specified and > 1, use multiprocessing
-        if workers is not None and workers > 1:
-            logging.info(f"Using multiprocessing with {workers} workers")
-            self._generate_collection_multiprocess(
-                pending_ids,
-                workers,
-                compact_metadata,
-                dry_run,
-                checkpoint_every,
-                img_format,
-                quality,
-                collection,
-                num_nfts,
-                progress_callback,
-            )
-        else:
-            # Single process generation
-            self._generate_collection_single_process(
-                pending_ids,
-                compact_metadata,
-                dry_run,
-                checkpoint_every,
-                img_format,
-                quality,
-                collection,
-                num_nfts,
-                progress_callback,
-            )
+            if workers is not None and workers > 1:
+                logging.info(f"Using multiprocessing with {workers} workers")
+                self._render_plan_multiprocess(
+                    planned,
+                    workers,
+                    options,
+                    collection,
+                    num_nfts,
+                    progress_callback,
+                )
+            else:
+                self._render_plan_single_process(
+                    planned,
+                    options,
+                    collection,
+                    num_nfts,
+                    progress_callback,
+                )
+        finally:
+            self._journal.close()
 
         # Save comprehensive collection data
         if not dry_run:
@@ -582,9 +1123,13 @@ class NFTGenerator:
             # Final resume save
             self._resume_save_state()
 
-        # Print final statistics
-        success_rate = (len(collection) / num_nfts) * 100
-        logging.info(f"Generation complete. Success rate: {success_rate:.2f}%")
+        # Print final statistics; intact outputs from earlier runs count too
+        already_rendered = num_nfts - len(pending_ids)
+        success_rate = ((already_rendered + len(collection)) / num_nfts) * 100
+        logging.info(
+            f"Generation complete. Success rate: {success_rate:.2f}% "
+            f"({len(collection)} rendered, {already_rendered} already rendered)"
+        )
         logging.info(f"Failed attempts: {dict(self.failed_attempts)}")
 
         # Log cache performance statistics
@@ -603,34 +1148,78 @@ class NFTGenerator:
         for pct, trait_type, name, cnt in sorted(rare_list)[:10]:
             print(f"  Rare: {trait_type}={name} -> {cnt} ({pct:.2f}%)")
 
-    def _generate_collection_single_process(
+    def render_ids(
         self,
-        pending_ids: List[int],
-        compact_metadata: bool,
-        dry_run: bool,
-        checkpoint_every: int,
-        img_format: str,
-        quality: Optional[int],
+        nft_ids: List[int],
+        compact_metadata: bool = False,
+        img_format: str = "png",
+        quality: Optional[int] = None,
+        plan_file: Optional[str] = None,
+    ) -> List[int]:
+        """
+        Re-render individual planned NFTs, e.g. after fixing a trait image.
+
+        Traits come from the plan, so nothing is sampled and the rest of
+        the collection is left alone.
+
+        Args:
+            nft_ids: IDs to render
+            compact_metadata: Whether to write compact JSON metadata
+            img_format: Output image format
+            quality: Quality for lossy formats
+            plan_file: Plan file to render from (default: output/plan.json)
+
+        Returns:
+            IDs that were rendered
+        """
+        plan = self.load_plan(plan_file or self._plan_path)
+        if plan is None:
+            raise ValueError("No collection plan to render from")
+        options = RenderOptions(
+            compact_metadata=compact_metadata,
+            img_format=img_format,
+            quality=quality,
+            gif_duration_ms=DEFAULT_GIF_DURATION_MS,
+            gif_loop=DEFAULT_GIF_LOOP,
+        )
+        rendered = []
+        try:
+            for nft_id in nft_ids:
+                item = plan.get(nft_id)
+                if item is None:
+                    logging.error(f"NFT {nft_id} is not in the plan")
+                    continue
+                _, outputs = self.renderer.render(
+                    nft_id, item.traits, item.nft_hash, options
+                )
+                if outputs is not None:
+                    self._record_rendered(nft_id, item.combination_id, outputs)
+                    rendered.append(nft_id)
+        finally:
+            self._journal.close()
+        return rendered
+
+    def _render_plan_single_process(
+        self,
+        planned: List[PlannedNFT],
+        options: RenderOptions,
         collection: List[Dict[str, Any]],
         num_nfts: int,
         progress_callback: Optional[Callable] = None,
     ) -> None:
-        """Generate collection using single process."""
-        with tqdm(total=num_nfts, desc="Generating NFTs", unit="NFT") as pbar:
+        """Render planned NFTs in a single process."""
+        with tqdm(total=num_nfts, desc="Rendering NFTs", unit="NFT") as pbar:
             # Pre-advance for already existing
-            pbar.update(num_nfts - len(pending_ids))
+            pbar.update(num_nfts - len(planned))
 
-            for i in pending_ids:
+            for completed, item in enumerate(planned, 1):
+                i = item.nft_id
                 try:
-                    result = self._generate_single_nft_worker(
-                        i,
-                        compact_metadata,
-                        img_format,
-                        quality,
-                        DEFAULT_GIF_DURATION_MS,
-                        DEFAULT_GIF_LOOP,
-                        dry_run,
+                    result, outputs = self.renderer.render(
+                        i, item.traits, item.nft_hash, options
                     )
+                    if outputs is not None:
+                        self._record_rendered(i, item.combination_id, outputs)
                     if result:
                         collection.append(result)
                         # Call progress callback if provided
@@ -640,69 +1229,110 @@ class NFTGenerator:
                     logging.error(f"Failed to generate NFT {i}: {str(e)}")
                 finally:
                     pbar.update(1)
-                    if not dry_run and i % checkpoint_every == 0:
-                        self._resume_save_state()
-                    if i % 100 == 0:
-                        logging.info(f"Generated {i}/{num_nfts} NFTs")
+                    # Render order is not ID order, so count completed NFTs
+                    if completed % 100 == 0:
+                        logging.info(f"Rendered {completed}/{len(planned)} planned NFTs")
 
-    def _generate_collection_multiprocess(
+    def _render_plan_multiprocess(
         self,
-        pending_ids: List[int],
+        planned: List[PlannedNFT],
         workers: int,
-        compact_metadata: bool,
-        dry_run: bool,
-        checkpoint_every: int,
-        img_format: str,
-        quality: Optional[int],
+        options: RenderOptions,
         collection: List[Dict[str, Any]],
         num_nfts: int,
         progress_callback: Optional[Callable] = None,
     ) -> None:
-        """Generate collection using multiprocessing."""
-        # Split pending IDs into chunks for each worker
-        chunk_size = max(1, len(pending_ids) // workers)
-        chunks = [
-            pending_ids[i : i + chunk_size]
-            for i in range(0, len(pending_ids), chunk_size)
-        ]
-
-        with tqdm(total=num_nfts, desc="Generating NFTs", unit="NFT") as pbar:
+        """
+        Render planned NFTs using multiprocessing.
+
+        Each worker builds its renderer (and image cache) once in the pool
+        initializer; tasks only carry an ID, its traits and their hash.
+        """
+        initargs = (
+            str(self.config_manager.config_file),
+            str(self.config_manager.ruler_file),
+            self.image_dir,
+            self.metadata_dir,
+            options,
+            tuple(self.config.image_size),
+            self.image_processor.cache_size,
+            self.image_processor.max_memory_bytes // (1024 * 1024),
+            dict(self.sampler.include_percent),
+        )
+
+        # Small chunks amortize IPC; a bounded window of chunks keeps memory
+        # flat and lets results stream back in completion order
+        chunk_size = max(
+            1, min(MAX_RENDER_CHUNK_SIZE, len(planned) // (workers * 16))
+        )
+        max_in_flight = workers * RENDER_CHUNKS_IN_FLIGHT_PER_WORKER
+        chunks = (
+            [
+                (item.nft_id, item.traits, item.nft_hash)
+                for item in planned[i : i + chunk_size]
+            ]
+            for i in range(0, len(planned), chunk_size)
+        )
+        combination_ids = {item.nft_id: item.combination_id for item in planned}
+        results: "queue.Queue" = queue.Queue()
+        completed = 0
+
+        with tqdm(total=num_nfts, desc="Rendering NFTs", unit="NFT") as pbar:
             # Pre-advance for already existing
-            pbar.update(num_nfts - len(pending_ids))
-
-            # Process chunks with multiprocessing
-            with mp.Pool(processes=workers) as pool:
-                # Create tasks for each NFT
-                tasks = []
-                for chunk in chunks:
-                    for nft_id in chunk:
-                        task = pool.apply_async(
-                            self._generate_single_nft_worker,
-                            args=(
-                                nft_id,
-                                compact_metadata,
-                                img_format,
-                                quality,
-                                DEFAULT_GIF_DURATION_MS,
-                                DEFAULT_GIF_LOOP,
-                                dry_run,
-                            ),
-                        )
-                        tasks.append((nft_id, task))
+            pbar.update(num_nfts - len(planned))
 
-                # Collect results
-                for nft_id, task in tasks:
+            with mp.Pool(
+                processes=workers, initializer=init_render_worker, initargs=initargs
+            ) as pool:
+
+                def submit_next() -> bool:
+                    chunk = next(chunks, None)
+                    if chunk is None:
+                        return False
+                    ids = [task[0] for task in chunk]
+                    pool.apply_async(
+                        render_worker_chunk,
+                        args=(chunk,),
+                        callback=results.put,
+                        error_callback=lambda e, ids=ids: results.put(
+                            [(nft_id, e, None) for nft_id in ids]
+                        ),
+                    )
+                    return True
+
+                in_flight = 0
+                while in_flight < max_in_flight and submit_next():
+                    in_flight += 1
+
+                while in_flight:
                     try:
-                        result = task.get(timeout=300)  # 5 minute timeout
-                        if result:
+                        chunk_results = results.get(timeout=RENDER_RESULT_TIMEOUT_S)
+                    except queue.Empty:
+                        logging.error(
+                            f"No render results for {RENDER_RESULT_TIMEOUT_S}s; "
+                            f"abandoning {in_flight} in-flight chunks"
+                        )
+                        break
+                    in_flight -= 1
+                    if submit_next():
+                        in_flight += 1
+
+                    for nft_id, result, outputs in chunk_results:
+                        if outputs is not None:
+                            self._record_rendered(
+                                nft_id, combination_ids[nft_id], outputs
+                            )
+                        if isinstance(result, Exception):
+                            logging.error(
+                                f"Failed to generate NFT {nft_id}: {str(result)}"
+                            )
+                        elif result:
                             collection.append(result)
-                    except Exception as e:
-                        logging.error(f"Failed to generate NFT {nft_id}: {str(e)}")
-                    finally:
+                            if progress_callback:
+                                progress_callback(len(collection), num_nfts)
+                        completed += 1
                         pbar.update(1)
-                        # Checkpointing in multiprocessing context is complex
-                        # For simplicity, we'll do it periodically based on index
-                        if not dry_run and nft_id % checkpoint_every == 0:
-                            self._resume_save_state()
-                        if nft_id % 100 == 0:
-                            logging.info(f"Generated {nft_id}/{num_nfts} NFTs")
+                        if completed % 100 == 0:
+                            logging.info(
+                                f"Rendered {completed}/{len(planned)} planned NFTs"
+                            )
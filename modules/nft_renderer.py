@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+NFT renderer module for NFT Generator
+Composites planned trait assignments into images and metadata files, and
+provides the per-process state used by multiprocessing render workers.
+"""
+
+import logging
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from modules.config_manager import ConfigManager
+from modules.image_processor import ImageProcessor
+from modules.metadata_manager import MetadataManager
+from modules.run_journal import OutputFiles
+from modules.validation import NFTConfiguration
+from modules.constants import (
+    DEFAULT_GIF_DURATION_MS,
+    DEFAULT_GIF_LOOP,
+    DEFAULT_IMAGE_CACHE_SIZE,
+)
+
+
+@dataclass
+class RenderOptions:
+    """Output options shared by every NFT rendered in a run."""
+
+    compact_metadata: bool = False
+    img_format: str = "png"
+    quality: Optional[int] = None
+    gif_duration_ms: int = DEFAULT_GIF_DURATION_MS
+    gif_loop: int = DEFAULT_GIF_LOOP
+    dry_run: bool = False
+
+
+class NFTRenderer:
+    """Renders planned NFTs: layer composition, image encoding and metadata."""
+
+    def __init__(
+        self,
+        config: NFTConfiguration,
+        image_processor: ImageProcessor,
+        metadata_manager: MetadataManager,
+        image_dir: str,
+        metadata_dir: str,
+        include_percent: Optional[Dict[str, float]] = None,
+    ):
+        """
+        Initialize NFT renderer.
+
+        Args:
+            config: Validated configuration
+            image_processor: Image processor used for composition
+            metadata_manager: Metadata manager used for metadata files
+            image_dir: Directory for rendered images
+            metadata_dir: Directory for metadata files
+            include_percent: Inclusion probability in percent per trait type,
+                as sampled (default: derived from the configured rarities)
+        """
+        self.config = config
+        self.trait_order = config.trait_order
+        self.image_processor = image_processor
+        self.metadata_manager = metadata_manager
+        self.image_dir = image_dir
+        self.metadata_dir = metadata_dir
+        # Let common layers win cache admission from the first NFT on
+        self.image_processor.seed_frequencies(self._layer_frequencies(include_percent))
+
+    def _layer_frequencies(
+        self, include_percent: Optional[Dict[str, float]] = None
+    ) -> Dict[str, float]:
+        """Return the expected share of NFTs using each static trait layer."""
+        include_percent = include_percent or {}
+        frequencies = {}
+        for trait_type in self.trait_order:
+            trait = self.config.traits.get(trait_type)
+            if trait is None:
+                continue
+            # Inclusion as in TraitSampler.include_percent
+            percent = include_percent.get(trait_type, (trait.rarity or 1) * 20)
+            include = min(max(percent, 0), 100) / 100
+            total = sum(option.rarity for option in trait.options) or 1
+            for option in trait.options:
+                path = f"traits/{trait_type}/{option.name}.png"
+                frequencies[path] = include * option.rarity / total
+        return frequencies
+
+    def save_nft(
+        self,
+        traits: Dict[str, str],
+        nft_id: int,
+        nft_hash: str,
+        compact_metadata: bool = False,
+        img_format: str = "png",
+        quality: Optional[int] = None,
+        gif_duration_ms: int = DEFAULT_GIF_DURATION_MS,
+        gif_loop: int = DEFAULT_GIF_LOOP,
+    ) -> Optional[str]:
+        """
+        Save NFT image and metadata with enhanced error handling.
+
+        Args:
+            traits: Dictionary of trait types and values
+            nft_id: ID of the NFT
+            nft_hash: Hash of the NFT traits
+            compact_metadata: Whether to write compact JSON metadata
+            img_format: Output image format
+            quality: Quality for lossy formats
+            gif_duration_ms: Frame duration for GIF output
+            gif_loop: Loop count for GIF output
+
+        Returns:
+            str: Path of the saved image
+        """
+        try:
+            # Determine trait file paths
+            trait_layers = {}
+            is_animated = False
+            gif_layers = []
+            static_layers = []
+
+            for trait_type in self.trait_order:
+                if trait_type in traits:
+                    base_path = f"traits/{trait_type}/{traits[trait_type]}"
+                    gif_path = base_path + ".gif"
+                    png_path = base_path + ".png"
+                    if os.path.exists(gif_path):
+                        is_animated = True
+                        gif_layers.append(gif_path)
+                        trait_layers[trait_type] = gif_path
+                    elif os.path.exists(png_path):
+                        static_layers.append(png_path)
+                        trait_layers[trait_type] = png_path
+                    else:
+                        raise FileNotFoundError(
+                            f"Missing trait file: {gif_path} or {png_path}"
+                        )
+
+            # Ensure image_size is in config
+            if not self.config.image_size:
+                raise ValueError(
+                    "image_size is required in config.json. Please run "
+                    "'python get_traits.py' to generate config with detected "
+                    "image size."
+                )
+
+            if is_animated:
+                # Get image size from config (required field)
+                image_size = tuple(self.config.image_size)
+
+                # Compose animated NFT
+                frames, dur, lp = self.image_processor.compose_animated_nft(
+                    gif_layers, static_layers, image_size, gif_duration_ms, gif_loop
+                )
+                ext = "gif"
+                image_path = f"{self.image_dir}/{nft_id}.{ext}"
+                frames[0].save(
+                    image_path,
+                    save_all=True,
+                    append_images=frames[1:],
+                    loop=lp if lp is not None else gif_loop,
+                    duration=dur if dur is not None else gif_duration_ms,
+                    disposal=2,
+                )
+            else:
+                # Get image size from config (required field)
+                image_size = tuple(self.config.image_size)
+
+                # Compose static NFT
+                base_image = self.image_processor.compose_static_nft(
+                    trait_layers, self.trait_order, traits, image_size
+                )
+
+                # Save image
+                ext = img_format.lower()
+                if ext == "jpeg":
+                    ext = "jpg"
+                image_path = f"{self.image_dir}/{nft_id}.{ext}"
+                save_kwargs = {}
+                if ext in ("jpg", "jpeg", "webp") and quality is not None:
+                    save_kwargs["quality"] = int(quality)
+                if ext in ("jpg", "jpeg"):
+                    save_kwargs["optimize"] = True
+                    # convert to RGB for JPEG
+                    base_to_save = base_image.convert("RGB")
+                else:
+                    base_to_save = base_image
+                base_to_save.save(
+                    image_path, format=None if ext != "webp" else "WEBP", **save_kwargs
+                )
+
+            logging.info(f"Saved NFT image: {image_path}")
+
+            # Create and save metadata
+            metadata = self.metadata_manager.create_nft_metadata(
+                nft_id,
+                traits,
+                nft_hash,
+                ipfs_cid=self.config.ipfs_cid or "<your-ipfs-cid>",
+                image_ext=ext,
+                metadata_config=self.config.metadata or {},
+            )
+
+            self.metadata_manager.save_nft_metadata(nft_id, metadata, compact_metadata)
+            logging.info(f"Saved NFT metadata: {self.metadata_dir}/{nft_id}.json")
+
+            return image_path
+
+        except Exception as e:
+            logging.error(f"Error saving NFT {nft_id}: {str(e)}")
+            raise
+
+    def render(
+        self, nft_id: int, traits: Dict[str, str], nft_hash: str, options: RenderOptions
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[OutputFiles]]:
+        """
+        Render a planned NFT and return its collection entry.
+
+        Args:
+            nft_id: ID of the NFT
+            traits: Planned traits
+            nft_hash: Hash of the planned traits
+            options: Output options for the run
+
+        Returns:
+            Tuple of the dictionary with NFT data (None if failed) and the
+            written files for the run journal (None for dry runs)
+        """
+        outputs = None
+        try:
+            if not options.dry_run:
+                image_path = self.save_nft(
+                    traits,
+                    nft_id,
+                    nft_hash,
+                    compact_metadata=options.compact_metadata,
+                    img_format=options.img_format,
+                    quality=options.quality,
+                    gif_duration_ms=options.gif_duration_ms,
+                    gif_loop=options.gif_loop,
+                )
+                outputs = OutputFiles.describe(
+                    image_path, os.path.join(self.metadata_dir, f"{nft_id}.json")
+                )
+            entry = {
+                "id": nft_id,
+                "image_name": f"{nft_id}",
+                "traits": traits,
+                "hash": nft_hash,
+            }
+            return entry, outputs
+        except Exception as e:
+            logging.error(f"Failed to render NFT {nft_id}: {str(e)}")
+            return None, None
+
+
+# Per-process state for multiprocessing render workers, set by init_render_worker
+_worker_renderer: Optional[NFTRenderer] = None
+_worker_options: Optional[RenderOptions] = None
+
+
+def init_render_worker(
+    config_file: str,
+    ruler_file: str,
+    image_dir: str,
+    metadata_dir: str,
+    options: RenderOptions,
+    image_size: Optional[Tuple[int, int]] = None,
+    cache_size: int = DEFAULT_IMAGE_CACHE_SIZE,
+    max_memory_mb: int = 512,
+    include_percent: Optional[Dict[str, float]] = None,
+) -> None:
+    """
+    Pool initializer: build this process's renderer once from the config paths.
+
+    The image cache then lives for the whole worker lifetime instead of being
+    pickled with every task.
+
+    Args:
+        config_file: Path to configuration file
+        ruler_file: Path to rules file
+        image_dir: Directory for rendered images
+        metadata_dir: Directory for metadata files
+        options: Output options for the run
+        image_size: Optional image size override
+        cache_size: Image cache entry limit for this worker
+        max_memory_mb: Image cache memory limit for this worker
+        include_percent: Inclusion probability in percent per trait type
+    """
+    global _worker_renderer, _worker_options
+
+    config = ConfigManager(config_file, ruler_file).load_config()
+    if image_size is not None:
+        config.image_size = image_size
+    _worker_renderer = NFTRenderer(
+        config,
+        ImageProcessor(cache_size=cache_size, max_memory_mb=max_memory_mb),
+        MetadataManager(),
+        image_dir,
+        metadata_dir,
+        include_percent=include_percent,
+    )
+    _worker_options = options
+
+
+def render_worker_task(
+    task: Tuple[int, Dict[str, str], str],
+) -> Tuple[int, Optional[Dict[str, Any]], Optional[OutputFiles]]:
+    """
+    Render one planned NFT in a worker set up by ``init_render_worker``.
+
+    Args:
+        task: (nft_id, traits, nft_hash)
+
+    Returns:
+        Tuple of the NFT ID, its collection entry (None if failed) and its
+        written files (None for dry runs or failures)
+    """
+    nft_id, traits, nft_hash = task
+    if _worker_renderer is None or _worker_options is None:
+        raise RuntimeError("Render worker used before init_render_worker was called")
+    return (nft_id, *_worker_renderer.render(nft_id, traits, nft_hash, _worker_options))
+
+
+def render_worker_chunk(
+    tasks: List[Tuple[int, Dict[str, str], str]],
+) -> List[Tuple[int, Optional[Dict[str, Any]], Optional[OutputFiles]]]:
+    """
+    Render a chunk of planned NFTs in one round trip to the worker.
+
+    Args:
+        tasks: List of (nft_id, traits, nft_hash)
+
+    Returns:
+        List of (nft_id, collection entry or None, written files or None)
+        in task order
+    """
+    return [render_worker_task(task) for task in tasks]
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Pattern store module for NFT Generator
+Counts packed 64-bit trait-pattern keys for TraitTracker: in a NumPy
+open-addressing table when NumPy is available, in a dict otherwise.
+"""
+
+import math
+from array import array
+from itertools import combinations
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+# Optional import for the array-backed pattern table
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+KEY_MASK = (1 << 64) - 1
+# Fibonacci hashing multiplier (2^64 / golden ratio)
+HASH_MULTIPLIER = 0x9E3779B97F4A7C15
+INITIAL_TABLE_BITS = 12
+MAX_LOAD_FACTOR = 0.5
+# Below this many keys per call, probing key by key beats NumPy call overhead
+VECTOR_PROBE_MIN_KEYS = 32
+
+
+class PatternCounter:
+    """
+    Dict-backed counter of packed pattern keys.
+
+    A pattern key is the sum, modulo 2**64, of the packed terms of the
+    traits in the pattern, so keys for every subset of a selection can be
+    built without sorting or tuple allocation.
+    """
+
+    def __init__(self):
+        self._counts: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def keys_for(self, terms: Sequence[int], size: int) -> List[int]:
+        """
+        Return the pattern keys of every ``size``-subset of ``terms``.
+
+        Args:
+            terms: Packed terms of the selected traits
+            size: Number of traits per pattern
+
+        Returns:
+            Pattern keys, in the form ``all_below`` and ``add`` accept
+        """
+        return [key & KEY_MASK for key in map(sum, combinations(terms, size))]
+
+    def all_below(self, keys, limit: int) -> bool:
+        """Return True if every key has been counted fewer than ``limit`` times."""
+        get = self._counts.get
+        return all(get(key, 0) < limit for key in keys)
+
+    def counts(self, keys) -> List[int]:
+        """Return how often each key has been counted."""
+        get = self._counts.get
+        return [get(key, 0) for key in keys]
+
+    def add(self, keys) -> None:
+        """Count one more occurrence of every key."""
+        counts = self._counts
+        get = counts.get
+        for key in keys:
+            counts[key] = get(key, 0) + 1
+
+    def export(self) -> Tuple[array, array]:
+        """Return the stored keys and their counts as packed arrays."""
+        return array("Q", self._counts.keys()), array("I", self._counts.values())
+
+    def load(self, keys: Sequence[int], counts: Sequence[int]) -> None:
+        """Replace the stored counts with those of ``export``."""
+        self._counts = {key: count for key, count in zip(keys, counts) if count > 0}
+
+    def items(self) -> Iterator[Tuple[int, int]]:
+        """Iterate over (key, count) pairs."""
+        return iter(self._counts.items())
+
+
+class ArrayPatternCounter(PatternCounter):
+    """
+    Pattern counter backed by NumPy arrays.
+
+    Keys live in a linear-probing hash table of uint64 slots (0 marks an
+    empty slot) with a parallel uint32 count array, about 12 bytes per
+    slot instead of a dict entry plus a Python int per pattern. Lookups
+    and inserts probe all keys of a candidate at once; candidates with
+    only a few patterns are probed key by key instead.
+    """
+
+    def __init__(self):
+        if not NUMPY_AVAILABLE:
+            raise ImportError("ArrayPatternCounter requires numpy")
+        self._allocate(INITIAL_TABLE_BITS)
+        self._size = 0
+        # Cached subset index matrices per (number of traits, pattern size)
+        self._subsets: Dict[Tuple[int, int], "np.ndarray"] = {}
+
+    def _allocate(self, bits: int) -> None:
+        self._bits = bits
+        self._mask = (1 << bits) - 1
+        self._keys = np.zeros(1 << bits, dtype=np.uint64)
+        self._counts = np.zeros(1 << bits, dtype=np.uint32)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def keys_for(self, terms: Sequence[int], size: int):
+        n = len(terms)
+        if math.comb(n, size) < VECTOR_PROBE_MIN_KEYS:
+            return [
+                (key & KEY_MASK) or 1 for key in map(sum, combinations(terms, size))
+            ]
+        subsets = self._subsets.get((n, size))
+        if subsets is None:
+            subsets = np.array(list(combinations(range(n), size)), dtype=np.intp)
+            subsets = subsets.reshape(-1, size)
+            self._subsets[(n, size)] = subsets
+        keys = np.array(terms, dtype=np.uint64)[subsets].sum(axis=1, dtype=np.uint64)
+        # 0 marks empty slots; a zero key has probability 2**-64 at most
+        keys[keys == 0] = 1
+        return keys
+
+    def _find(self, keys: "np.ndarray") -> "np.ndarray":
+        """Return, per key, the slot holding it or the empty slot ending its probe."""
+        table = self._keys
+        slots = ((keys * np.uint64(HASH_MULTIPLIER)) >> np.uint64(64 - self._bits)).astype(
+            np.intp
+        )
+        pending = np.flatnonzero(table[slots] != keys)
+        pending = pending[table[slots[pending]] != 0]
+        while pending.size:
+            slots[pending] = (slots[pending] + 1) & self._mask
+            stored = table[slots[pending]]
+            pending = pending[(stored != keys[pending]) & (stored != 0)]
+        return slots
+
+    def _find_one(self, key: int) -> int:
+        """Scalar version of ``_find`` for a single key."""
+        table = self._keys
+        mask = self._mask
+        slot = ((key * HASH_MULTIPLIER) & KEY_MASK) >> (64 - self._bits)
+        stored = table.item(slot)
+        while stored != key and stored != 0:
+            slot = (slot + 1) & mask
+            stored = table.item(slot)
+        return slot
+
+    def all_below(self, keys, limit: int) -> bool:
+        if not len(keys):
+            return True
+        # Empty slots have a zero count, so no key comparison is needed
+        if isinstance(keys, list):
+            counts = self._counts
+            find = self._find_one
+            return all(counts.item(find(key)) < limit for key in keys)
+        return bool((self._counts[self._find(keys)] < limit).all())
+
+    def counts(self, keys) -> List[int]:
+        if not len(keys):
+            return []
+        if isinstance(keys, list):
+            counts = self._counts
+            return [counts.item(self._find_one(key)) for key in keys]
+        return self._counts[self._find(keys)].tolist()
+
+    def _insert(self, keys: "np.ndarray") -> "np.ndarray":
+        """Make sure every key has a slot and return the slots."""
+        if (self._size + len(keys)) > MAX_LOAD_FACTOR * len(self._keys):
+            self._grow(self._size + len(keys))
+        while True:
+            slots = self._find(keys)
+            empty = self._keys[slots] == 0
+            if not empty.any():
+                return slots
+            # Distinct keys can probe to the same empty slot; place one each round
+            placed, first = np.unique(slots[empty], return_index=True)
+            self._keys[placed] = keys[empty][first]
+            self._size += len(placed)
+
+    def _grow(self, needed: int) -> None:
+        bits = self._bits
+        while needed > MAX_LOAD_FACTOR * (1 << bits):
+            bits += 1
+        occupied = np.flatnonzero(self._keys)
+        keys = self._keys[occupied]
+        counts = self._counts[occupied]
+        self._allocate(bits)
+        self._size = 0
+        slots = self._insert(keys)
+        self._counts[slots] = counts
+
+    def add(self, keys) -> None:
+        if not len(keys):
+            return
+        if isinstance(keys, list) and len(keys) < VECTOR_PROBE_MIN_KEYS:
+            if (self._size + len(keys)) > MAX_LOAD_FACTOR * len(self._keys):
+                self._grow(self._size + len(keys))
+            for key in keys:
+                slot = self._find_one(key)
+                if self._keys.item(slot) == 0:
+                    self._keys[slot] = key
+                    self._size += 1
+                self._counts[slot] += 1
+            return
+        slots = self._insert(np.asarray(keys, dtype=np.uint64))
+        np.add.at(self._counts, slots, 1)
+
+    def export(self) -> Tuple[array, array]:
+        occupied = np.flatnonzero(self._keys)
+        keys = array("Q")
+        keys.frombytes(self._keys[occupied].tobytes())
+        counts = array("I")
+        counts.frombytes(self._counts[occupied].tobytes())
+        return keys, counts
+
+    def load(self, keys: Sequence[int], counts: Sequence[int]) -> None:
+        self._allocate(INITIAL_TABLE_BITS)
+        self._size = 0
+        keys = np.asarray(keys, dtype=np.uint64)
+        counts = np.asarray(counts, dtype=np.uint32)
+        keep = counts > 0
+        keys, counts = keys[keep], counts[keep]
+        if not len(keys):
+            return
+        keys[keys == 0] = 1
+        slots = self._insert(keys)
+        np.add.at(self._counts, slots, counts)
+
+    def items(self) -> Iterator[Tuple[int, int]]:
+        occupied = np.flatnonzero(self._keys)
+        return zip(self._keys[occupied].tolist(), self._counts[occupied].tolist())
+
+
+def create_pattern_counter() -> PatternCounter:
+    """Return the array-backed counter when NumPy is available, else the dict one."""
+    return ArrayPatternCounter() if NUMPY_AVAILABLE else PatternCounter()
@@ -221,13 +221,16 @@ class ResourceManager:
             raise
 
     @contextmanager
-    def atomic_file_write(self, file_path: Path, encoding: str = 'utf-8') -> Generator[Any, None, None]:
+    def atomic_file_write(
+        self, file_path: Path, encoding: str = 'utf-8', binary: bool = False
+    ) -> Generator[Any, None, None]:
         """
         Context manager for atomic file writes using temporary files.
 
         Args:
             file_path: Path to the target file
             encoding: Text encoding
+            binary: Open the temporary file in binary mode
 
         Yields:
             File object for writing
@@ -235,8 +238,12 @@ class ResourceManager:
         temp_path = file_path.with_suffix(f"{file_path.suffix}.tmp")
 
         try:
-            with open(temp_path, 'w', encoding=encoding) as f:
-                yield f
+            if binary:
+                with open(temp_path, 'wb') as f:
+                    yield f
+            else:
+                with open(temp_path, 'w', encoding=encoding) as f:
+                    yield f
 
             # Atomic move after successful write
             import os
@@ -269,9 +276,9 @@ def safe_image_operation(image_path: Path):
     return resource_manager.safe_image_operation(image_path)
 
 
-def atomic_file_write(file_path: Path, encoding: str = 'utf-8'):
+def atomic_file_write(file_path: Path, encoding: str = 'utf-8', binary: bool = False):
     """Convenience function for atomic file writes."""
-    return resource_manager.atomic_file_write(file_path, encoding)
+    return resource_manager.atomic_file_write(file_path, encoding, binary)
 
 
 def retry_on_io_error(max_retries: int = 3, base_delay: float = 1.0):
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Rule engine module for NFT Generator
+Compiles ruler.json rules into per-option exclusion bitsets so that a
+compatibility check is a single AND against the current selection.
+"""
+
+import logging
+from typing import Dict, List
+
+from modules.trait_index import TraitIndex
+from modules.validation import RuleConfig
+
+
+class CompiledRules:
+    """
+    Compatibility rules compiled to exclusion bitsets.
+
+    ``exclusion_masks[option_id]`` has a bit set for every option that may
+    not appear together with ``option_id``. Exclusions are symmetric, so the
+    order in which traits are selected does not matter.
+    """
+
+    def __init__(self, index: TraitIndex, rules: List[RuleConfig]):
+        """
+        Compile rules against a trait index.
+
+        Args:
+            index: Trait index providing option IDs
+            rules: Validated rules from the ruler configuration
+        """
+        self.index = index
+        self.exclusion_masks: List[int] = [0] * index.num_options
+        self.rule_count = 0
+
+        for rule in rules:
+            if_type = rule.if_condition.trait_type
+            then_type = rule.then_condition.trait_type
+            if if_type not in index.trait_ids or then_type not in index.trait_ids:
+                logging.warning(
+                    f"Skipping rule {if_type} -> {then_type}: unknown trait type"
+                )
+                continue
+            if if_type == then_type:
+                # A trait type only ever holds one value, so this can never apply
+                continue
+
+            if_mask = self._values_mask(if_type, rule.if_condition.value)
+            then_mask = self._values_mask(then_type, rule.then_condition.excluded_values)
+            if not if_mask or not then_mask:
+                continue
+
+            for option_id in self._mask_ids(if_mask):
+                self.exclusion_masks[option_id] |= then_mask
+            for option_id in self._mask_ids(then_mask):
+                self.exclusion_masks[option_id] |= if_mask
+            self.rule_count += 1
+
+    def _values_mask(self, trait_type: str, values) -> int:
+        """Return the bitset of configured options matched by a rule value list."""
+        if values is None:
+            return 0
+        if isinstance(values, str):
+            values = [values]
+        if "*" in values:
+            return self.index.trait_masks[trait_type]
+        mask = 0
+        for value in values:
+            option_id = self.index.option_id(trait_type, value)
+            if option_id is None:
+                logging.debug(f"Rule references unknown option {trait_type}={value}")
+                continue
+            mask |= 1 << option_id
+        return mask
+
+    def _mask_ids(self, mask: int) -> List[int]:
+        """Return the option IDs whose bits are set in ``mask``."""
+        ids = []
+        while mask:
+            low = mask & -mask
+            ids.append(low.bit_length() - 1)
+            mask ^= low
+        return ids
+
+    def is_compatible(self, option_id: int, selection_mask: int) -> bool:
+        """Check an option against the bitset of already selected options."""
+        return not (self.exclusion_masks[option_id] & selection_mask)
+
+    def is_valid(
+        self, selected_traits: Dict[str, str], trait_type: str, value: str
+    ) -> bool:
+        """
+        Check whether ``trait_type=value`` may join ``selected_traits``.
+
+        Values that are not configured options carry no exclusions.
+        """
+        option_id = self.index.option_id(trait_type, value)
+        if option_id is None:
+            return True
+        return self.is_compatible(option_id, self.index.selection_mask(selected_traits))
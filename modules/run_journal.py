@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Run journal module for NFT Generator
+Append-only journal of rendered NFTs: one fixed-size record per completed
+NFT with its combination ID and the size, mtime and digest of its image
+and metadata files, synced to disk in groups.
+"""
+
+import hashlib
+import logging
+import os
+import struct
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Tuple
+
+from modules.resource_manager import resource_manager
+from modules.state_store import (
+    HEADER,
+    KIND_RUN_JOURNAL,
+    StateFormatError,
+    pack_header,
+    read_header,
+)
+
+DIGEST_SIZE = 16
+# Image extensions by the code stored in a record
+IMAGE_EXTENSIONS = ("png", "jpg", "webp", "gif")
+# nft_id, image extension code, then size, mtime_ns and digest of the
+# image and of the metadata file; the combination ID follows
+RECORD = struct.Struct(f"<QB7xQQ{DIGEST_SIZE}sQQ{DIGEST_SIZE}s")
+
+
+def file_digest(path: str) -> bytes:
+    """Return the BLAKE2b digest of a file's contents."""
+    digest = hashlib.blake2b(digest_size=DIGEST_SIZE)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.digest()
+
+
+def scan_directory(path: str) -> Dict[str, Tuple[int, int]]:
+    """
+    List the files of a directory with one ``os.scandir`` pass.
+
+    Args:
+        path: Directory to scan; a missing directory is empty
+
+    Returns:
+        File name -> (size, mtime_ns)
+    """
+    files: Dict[str, Tuple[int, int]] = {}
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    stat = entry.stat()
+                    files[entry.name] = (stat.st_size, stat.st_mtime_ns)
+    except FileNotFoundError:
+        pass
+    return files
+
+
+@dataclass
+class OutputFiles:
+    """Size, modification time and digest of the files written for one NFT."""
+    image_ext: str
+    image_size: int
+    image_mtime_ns: int
+    image_digest: bytes
+    metadata_size: int
+    metadata_mtime_ns: int
+    metadata_digest: bytes
+
+    @classmethod
+    def describe(cls, image_path: str, metadata_path: str) -> "OutputFiles":
+        """Stat and hash the image and metadata files of an NFT."""
+        image_stat = os.stat(image_path)
+        metadata_stat = os.stat(metadata_path)
+        return cls(
+            image_ext=os.path.splitext(image_path)[1].lstrip(".").lower(),
+            image_size=image_stat.st_size,
+            image_mtime_ns=image_stat.st_mtime_ns,
+            image_digest=file_digest(image_path),
+            metadata_size=metadata_stat.st_size,
+            metadata_mtime_ns=metadata_stat.st_mtime_ns,
+            metadata_digest=file_digest(metadata_path),
+        )
+
+    def stats_match(
+        self, image: Tuple[int, int], metadata: Tuple[int, int]
+    ) -> bool:
+        """Return True if (size, mtime_ns) of both files are as recorded."""
+        return (
+            image == (self.image_size, self.image_mtime_ns)
+            and metadata == (self.metadata_size, self.metadata_mtime_ns)
+        )
+
+    def digests_match(self, image_path: str, metadata_path: str) -> bool:
+        """Return True if both files still hash to the recorded digests."""
+        try:
+            return (
+                file_digest(image_path) == self.image_digest
+                and file_digest(metadata_path) == self.metadata_digest
+            )
+        except OSError:
+            return False
+
+
+@dataclass
+class JournalRecord:
+    """A rendered NFT as recorded in the run journal."""
+    nft_id: int
+    combination_id: int
+    outputs: OutputFiles
+
+
+class RunJournal:
+    """
+    Append-only journal of rendered NFTs.
+
+    Records have a fixed size, so a record torn by a crash is detected
+    from the file length and dropped. Appends are fsync'd every
+    ``sync_every`` records or ``sync_interval`` seconds, whichever comes
+    first. A later record for the same NFT ID supersedes earlier ones;
+    ``compact`` rewrites the journal with only the latest records.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        id_bits: int,
+        fingerprint: bytes,
+        sync_every: int = 25,
+        sync_interval: float = 1.0,
+    ):
+        """
+        Initialize run journal.
+
+        Args:
+            path: Journal file path
+            id_bits: Bit length of the largest combination ID
+            fingerprint: Fingerprint of the combination space
+            sync_every: Records appended between fsyncs
+            sync_interval: Longest time in seconds between fsyncs
+        """
+        self.path = path
+        self.id_width = max(1, (id_bits + 63) // 64) * 8
+        self.record_size = RECORD.size + self.id_width
+        self.fingerprint = fingerprint
+        self.sync_every = max(1, sync_every)
+        self.sync_interval = sync_interval
+        self._file = None
+        self._unsynced = 0
+        self._last_sync = 0.0
+        # Records in the file, including superseded ones
+        self.records_on_disk = 0
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def _pack(self, record: JournalRecord) -> bytes:
+        outputs = record.outputs
+        return RECORD.pack(
+            record.nft_id,
+            IMAGE_EXTENSIONS.index(outputs.image_ext),
+            outputs.image_size,
+            outputs.image_mtime_ns,
+            outputs.image_digest,
+            outputs.metadata_size,
+            outputs.metadata_mtime_ns,
+            outputs.metadata_digest,
+        ) + record.combination_id.to_bytes(self.id_width, "little")
+
+    def _unpack(self, data: bytes, offset: int) -> JournalRecord:
+        (
+            nft_id,
+            ext_code,
+            image_size,
+            image_mtime_ns,
+            image_digest,
+            metadata_size,
+            metadata_mtime_ns,
+            metadata_digest,
+        ) = RECORD.unpack_from(data, offset)
+        start = offset + RECORD.size
+        return JournalRecord(
+            nft_id=nft_id,
+            combination_id=int.from_bytes(data[start : start + self.id_width], "little"),
+            outputs=OutputFiles(
+                image_ext=IMAGE_EXTENSIONS[ext_code],
+                image_size=image_size,
+                image_mtime_ns=image_mtime_ns,
+                image_digest=image_digest,
+                metadata_size=metadata_size,
+                metadata_mtime_ns=metadata_mtime_ns,
+                metadata_digest=metadata_digest,
+            ),
+        )
+
+    def load(self) -> Dict[int, JournalRecord]:
+        """
+        Replay the journal.
+
+        Returns:
+            Latest record per NFT ID
+
+        Raises:
+            StateFormatError: If the journal belongs to another configuration
+        """
+        with open(self.path, "rb") as f:
+            width = read_header(f, KIND_RUN_JOURNAL, self.fingerprint)
+            if width != self.record_size:
+                raise StateFormatError("Run journal has a different record size")
+            data = f.read()
+        records: Dict[int, JournalRecord] = {}
+        for offset in range(0, len(data) - self.record_size + 1, self.record_size):
+            record = self._unpack(data, offset)
+            records[record.nft_id] = record
+        self.records_on_disk = len(data) // self.record_size
+        return records
+
+    def open(self) -> None:
+        """
+        Open the journal for appending, creating it if needed.
+
+        A journal written for another configuration or record size is moved
+        aside to ``<path>.stale`` and a new one is started, so a changed
+        configuration never stops NFTs from being recorded.
+        """
+        if self._file is not None:
+            return
+        if not self.exists():
+            self.compact(())
+        f = open(self.path, "r+b")
+        try:
+            try:
+                if read_header(f, KIND_RUN_JOURNAL, self.fingerprint) != self.record_size:
+                    raise StateFormatError("Run journal has a different record size")
+            except StateFormatError as e:
+                f.close()
+                stale_path = f"{self.path}.stale"
+                logging.warning(f"Moving run journal aside to {stale_path}: {e}")
+                os.replace(self.path, stale_path)
+                self.compact(())
+                f = open(self.path, "r+b")
+                f.seek(HEADER.size)
+            # Drop a record torn by an interrupted append
+            size = f.seek(0, os.SEEK_END)
+            tail = (size - HEADER.size) % self.record_size
+            if tail:
+                f.truncate(size - tail)
+                f.seek(0, os.SEEK_END)
+        except Exception:
+            f.close()
+            raise
+        self._file = f
+        self._last_sync = time.monotonic()
+
+    def append(self, record: JournalRecord) -> None:
+        """Append one record; it is durable after the next sync."""
+        if self._file is None:
+            self.open()
+        self._file.write(self._pack(record))
+        self.records_on_disk += 1
+        self._unsynced += 1
+        if (
+            self._unsynced >= self.sync_every
+            or time.monotonic() - self._last_sync >= self.sync_interval
+        ):
+            self.sync()
+
+    def sync(self) -> None:
+        """Flush appended records to disk."""
+        if self._file is None or not self._unsynced:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def close(self) -> None:
+        """Sync and close the journal."""
+        if self._file is None:
+            return
+        self.sync()
+        self._file.close()
+        self._file = None
+
+    def compact(self, records: Iterable[JournalRecord]) -> None:
+        """Atomically replace the journal with the given records."""
+        reopen = self._file is not None
+        self.close()
+        count = 0
+        with resource_manager.atomic_file_write(Path(self.path), binary=True) as f:
+            f.write(pack_header(KIND_RUN_JOURNAL, self.record_size, self.fingerprint))
+            for record in records:
+                f.write(self._pack(record))
+                count += 1
+        self.records_on_disk = count
+        if reopen:
+            self.open()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Seen set module for NFT Generator
+Compact set of planned combination IDs: a NumPy open-addressing table of
+uint64 IDs when NumPy is available and IDs fit in 64 bits, a set otherwise.
+"""
+
+from typing import Iterable, Iterator, Set, Union
+
+# Optional import for the array-backed table
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+from modules.pattern_store import HASH_MULTIPLIER, KEY_MASK
+
+INITIAL_TABLE_BITS = 16
+MAX_LOAD_FACTOR = 0.7
+# Slots converted to Python ints at a time while iterating
+ITER_CHUNK_SLOTS = 1 << 16
+
+
+class CombinationTable:
+    """
+    Set of 64-bit combination IDs in a linear-probing uint64 table.
+
+    Each slot takes 8 bytes and the table is kept at most 70% full, so an
+    ID costs 11-23 bytes instead of about 70 for an int in a Python set.
+    0 marks an empty slot; the ID 0 (no optional trait included) is kept
+    as a flag. Single IDs are probed with scalar reads, bulk loads are
+    inserted with vectorized probes.
+    """
+
+    def __init__(self, capacity: int = 0):
+        """
+        Initialize combination table.
+
+        Args:
+            capacity: Number of IDs to allocate room for up front
+        """
+        if not NUMPY_AVAILABLE:
+            raise ImportError("CombinationTable requires numpy")
+        self._allocate(self._bits_for(capacity))
+        self._size = 0
+        self._has_zero = False
+
+    @staticmethod
+    def _bits_for(capacity: int) -> int:
+        bits = INITIAL_TABLE_BITS
+        while capacity > MAX_LOAD_FACTOR * (1 << bits):
+            bits += 1
+        return bits
+
+    def _allocate(self, bits: int) -> None:
+        self._shift = 64 - bits
+        self._mask = (1 << bits) - 1
+        self._keys = np.zeros(1 << bits, dtype=np.uint64)
+
+    def __len__(self) -> int:
+        return self._size + self._has_zero
+
+    def _slot(self, key: int) -> int:
+        """Return the slot holding ``key`` or the empty slot ending its probe."""
+        table = self._keys
+        mask = self._mask
+        slot = ((key * HASH_MULTIPLIER) & KEY_MASK) >> self._shift
+        stored = table.item(slot)
+        while stored != key and stored != 0:
+            slot = (slot + 1) & mask
+            stored = table.item(slot)
+        return slot
+
+    def __contains__(self, combination_id: int) -> bool:
+        if combination_id == 0:
+            return self._has_zero
+        return self._keys.item(self._slot(combination_id)) != 0
+
+    def add(self, combination_id: int) -> None:
+        if combination_id == 0:
+            self._has_zero = True
+            return
+        slot = self._slot(combination_id)
+        if self._keys.item(slot) != 0:
+            return
+        if self._size + 1 > MAX_LOAD_FACTOR * len(self._keys):
+            self._grow(self._size + 1)
+            slot = self._slot(combination_id)
+        self._keys[slot] = combination_id
+        self._size += 1
+
+    def update(self, combination_ids: Iterable[int]) -> None:
+        """Add many IDs; buffers such as ``array('Q')`` are not copied to Python ints."""
+        keys = np.asarray(combination_ids, dtype=np.uint64)
+        if not keys.size:
+            return
+        zero = keys == 0
+        if zero.any():
+            self._has_zero = True
+            keys = keys[~zero]
+        if self._size + len(keys) > MAX_LOAD_FACTOR * len(self._keys):
+            self._grow(self._size + len(keys))
+        self._insert(keys)
+
+    def _find(self, keys: "np.ndarray") -> "np.ndarray":
+        """Vectorized ``_slot``."""
+        table = self._keys
+        slots = ((keys * np.uint64(HASH_MULTIPLIER)) >> np.uint64(self._shift)).astype(
+            np.intp
+        )
+        pending = np.flatnonzero(table[slots] != keys)
+        pending = pending[table[slots[pending]] != 0]
+        while pending.size:
+            slots[pending] = (slots[pending] + 1) & self._mask
+            stored = table[slots[pending]]
+            pending = pending[(stored != keys[pending]) & (stored != 0)]
+        return slots
+
+    def _insert(self, keys: "np.ndarray") -> None:
+        while keys.size:
+            slots = self._find(keys)
+            empty = self._keys[slots] == 0
+            # Equal or colliding keys can probe to the same empty slot;
+            # place one per slot and retry the rest
+            placed, first = np.unique(slots[empty], return_index=True)
+            keys = keys[empty]
+            self._keys[placed] = keys[first]
+            self._size += len(placed)
+            keys = np.delete(keys, first)
+
+    def _grow(self, needed: int) -> None:
+        keys = self._keys[self._keys != 0]
+        self._allocate(self._bits_for(needed))
+        self._size = 0
+        self._insert(keys)
+
+    def __iter__(self) -> Iterator[int]:
+        if self._has_zero:
+            yield 0
+        for start in range(0, len(self._keys), ITER_CHUNK_SLOTS):
+            block = self._keys[start : start + ITER_CHUNK_SLOTS]
+            yield from block[block != 0].tolist()
+
+
+def create_combination_set(id_bits: int) -> Union[CombinationTable, Set[int]]:
+    """
+    Return an empty set of combination IDs.
+
+    Args:
+        id_bits: Bit length of the largest combination ID
+
+    Returns:
+        CombinationTable when NumPy is available and IDs fit in 64 bits,
+        else a set
+    """
+    if NUMPY_AVAILABLE and id_bits <= 64:
+        return CombinationTable()
+    return set()
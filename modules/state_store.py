@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+State store module for NFT Generator
+Binary resume-state files: an append-only log of planned combination IDs
+and sectioned snapshots of packed integer arrays, each behind a versioned
+header that ties the file to the configuration that wrote it.
+"""
+
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Sequence
+
+from modules.resource_manager import resource_manager
+
+STATE_MAGIC = b"NFTGSTAT"
+STATE_VERSION = 1
+# File kinds
+KIND_COMBINATION_LOG = 1
+KIND_SNAPSHOT = 2
+KIND_RUN_JOURNAL = 3
+# magic, version, kind, record width in bytes, configuration fingerprint
+HEADER = struct.Struct("<8sHHI16s")
+# Snapshot section: name length, typecode, item count
+SECTION = struct.Struct("<B1sQ")
+
+
+class StateFormatError(ValueError):
+    """Raised when a state file is damaged or belongs to another configuration."""
+
+
+def config_fingerprint(*parts: Any) -> bytes:
+    """Return a 16-byte digest of JSON-serializable configuration parts."""
+    data = json.dumps(parts, separators=(",", ":"), sort_keys=True).encode()
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def pack_header(kind: int, width: int, fingerprint: bytes) -> bytes:
+    """Return the header of a state file."""
+    return HEADER.pack(STATE_MAGIC, STATE_VERSION, kind, width, fingerprint)
+
+
+def read_header(f, kind: int, fingerprint: bytes) -> int:
+    """Validate a file header and return its record width."""
+    raw = f.read(HEADER.size)
+    if len(raw) < HEADER.size:
+        raise StateFormatError("State file header is truncated")
+    magic, version, file_kind, width, file_fingerprint = HEADER.unpack(raw)
+    if magic != STATE_MAGIC or file_kind != kind:
+        raise StateFormatError("Not a state file of the expected kind")
+    if version != STATE_VERSION:
+        raise StateFormatError(f"Unsupported state file version {version}")
+    if file_fingerprint != fingerprint:
+        raise StateFormatError("State file was written for a different configuration")
+    return width
+
+
+class CombinationLog:
+    """
+    Append-only file of combination IDs.
+
+    IDs are stored little-endian in fixed-width records of whole 64-bit
+    words, so a checkpoint only writes the IDs reserved since the last one
+    and loading is a bulk read instead of JSON parsing. A record cut short
+    by a crash is dropped on load.
+    """
+
+    def __init__(self, path: str, id_bits: int, fingerprint: bytes):
+        """
+        Initialize combination log.
+
+        Args:
+            path: Log file path
+            id_bits: Bit length of the largest combination ID
+            fingerprint: Fingerprint of the combination space
+        """
+        self.path = path
+        self.words = max(1, (id_bits + 63) // 64)
+        self.fingerprint = fingerprint
+
+    @property
+    def width(self) -> int:
+        return self.words * 8
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def buffer(self) -> Sequence[int]:
+        """Return an empty container for IDs waiting to be appended."""
+        return array("Q") if self.words == 1 else []
+
+    def load(self) -> Sequence[int]:
+        """
+        Read every complete record.
+
+        Returns:
+            IDs in log order; with 64-bit records on a little-endian host, a
+            read-only view of the memory-mapped log, so nothing is parsed
+            or copied until the IDs are used
+
+        Raises:
+            StateFormatError: If the header does not match this log
+        """
+        with open(self.path, "rb") as f:
+            width = read_header(f, KIND_COMBINATION_LOG, self.fingerprint)
+            if width != self.width:
+                raise StateFormatError("Combination log has a different record width")
+            size = f.seek(0, os.SEEK_END)
+            end = size - (size - HEADER.size) % width
+            if self.words == 1 and sys.byteorder == "little":
+                if end == HEADER.size:
+                    return array("Q")
+                # The mapping stays open as long as the view is referenced
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                return memoryview(mapped)[HEADER.size : end].cast("Q")
+            f.seek(HEADER.size)
+            data = f.read(end - HEADER.size)
+        words = array("Q")
+        words.frombytes(data)
+        if sys.byteorder != "little":
+            words.byteswap()
+        if self.words == 1:
+            return words
+        n = self.words
+        return [
+            sum(words[i + j] << (64 * j) for j in range(n))
+            for i in range(0, len(words), n)
+        ]
+
+    def _pack(self, combination_ids: Sequence[int]) -> bytes:
+        if self.words == 1:
+            words = array("Q", combination_ids)
+            if sys.byteorder != "little":
+                words.byteswap()
+            return words.tobytes()
+        return b"".join(c.to_bytes(self.width, "little") for c in combination_ids)
+
+    def _header(self) -> bytes:
+        return pack_header(KIND_COMBINATION_LOG, self.width, self.fingerprint)
+
+    def append(self, combination_ids: Sequence[int]) -> None:
+        """
+        Append IDs, creating the log if needed.
+
+        A log written for another configuration or record width is replaced
+        by the given IDs rather than extended with records it cannot hold.
+        """
+        if not self.exists():
+            self.rewrite(combination_ids)
+            return
+        with open(self.path, "r+b") as f:
+            try:
+                if read_header(f, KIND_COMBINATION_LOG, self.fingerprint) != self.width:
+                    raise StateFormatError("Combination log has a different record width")
+            except StateFormatError as e:
+                logging.warning(f"Replacing combination log {self.path}: {e}")
+                stale = True
+            else:
+                stale = False
+                # Drop a partial record left by an interrupted append
+                size = f.seek(0, os.SEEK_END)
+                tail = (size - HEADER.size) % self.width
+                if tail:
+                    f.truncate(size - tail)
+                    f.seek(0, os.SEEK_END)
+                f.write(self._pack(combination_ids))
+                f.flush()
+                os.fsync(f.fileno())
+        if stale:
+            self.rewrite(combination_ids)
+
+    def rewrite(self, combination_ids: Sequence[int]) -> None:
+        """Atomically replace the log with the given IDs."""
+        with resource_manager.atomic_file_write(Path(self.path), binary=True) as f:
+            f.write(self._header())
+            f.write(self._pack(combination_ids))
+
+
+def write_snapshot(path: str, fingerprint: bytes, sections: Dict[str, Any]) -> None:
+    """
+    Atomically write named arrays as a snapshot file.
+
+    Args:
+        path: Snapshot file path
+        fingerprint: Fingerprint of the state the arrays belong to
+        sections: Section name -> array.array; stored little-endian
+    """
+    with resource_manager.atomic_file_write(Path(path), binary=True) as f:
+        f.write(pack_header(KIND_SNAPSHOT, 0, fingerprint))
+        for name, values in sections.items():
+            encoded = name.encode()
+            f.write(SECTION.pack(len(encoded), values.typecode.encode(), len(values)))
+            f.write(encoded)
+            if sys.byteorder != "little":
+                values = array(values.typecode, values)
+                values.byteswap()
+            f.write(values.tobytes())
+
+
+def read_snapshot(path: str, fingerprint: bytes) -> Dict[str, array]:
+    """
+    Read a snapshot written by ``write_snapshot``.
+
+    Raises:
+        StateFormatError: If the file is damaged or has another fingerprint
+    """
+    sections: Dict[str, array] = {}
+    with open(path, "rb") as f:
+        read_header(f, KIND_SNAPSHOT, fingerprint)
+        while True:
+            raw = f.read(SECTION.size)
+            if not raw:
+                return sections
+            if len(raw) < SECTION.size:
+                raise StateFormatError("Snapshot section header is truncated")
+            name_length, typecode, count = SECTION.unpack(raw)
+            name = f.read(name_length).decode()
+            values = array(typecode.decode())
+            data = f.read(count * values.itemsize)
+            if len(data) < count * values.itemsize:
+                raise StateFormatError(f"Snapshot section {name} is truncated")
+            values.frombytes(data)
+            if sys.byteorder != "little":
+                values.byteswap()
+            sections[name] = values
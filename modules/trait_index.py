@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Trait index module for NFT Generator
+Assigns stable integer IDs to trait types and trait options so that rule
+checks, sampling and uniqueness tracking can work on integers and bitsets
+instead of strings.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+from modules.validation import NFTConfiguration
+
+
+class TraitIndex:
+    """
+    Integer IDs for trait types and options.
+
+    Options get a global ID, contiguous per trait type in ``trait_order``
+    order, which doubles as their bit position in option bitsets.
+    """
+
+    def __init__(self, trait_order: List[str], option_names: Dict[str, List[str]]):
+        """
+        Initialize trait index.
+
+        Args:
+            trait_order: Trait types in layering order
+            option_names: Option names per trait type, in configuration order
+        """
+        self.trait_order = list(trait_order)
+        self.trait_ids: Dict[str, int] = {}
+        self.option_names: Dict[str, List[str]] = {}
+        self.option_ids: Dict[str, Dict[str, int]] = {}
+        self.offsets: Dict[str, int] = {}
+        self.trait_masks: Dict[str, int] = {}
+        self._describe: List[Tuple[str, str]] = []
+
+        for trait_id, trait_type in enumerate(self.trait_order):
+            names = list(option_names.get(trait_type, []))
+            offset = len(self._describe)
+            self.trait_ids[trait_type] = trait_id
+            self.option_names[trait_type] = names
+            self.offsets[trait_type] = offset
+            self.option_ids[trait_type] = {
+                name: offset + i for i, name in enumerate(names)
+            }
+            self.trait_masks[trait_type] = ((1 << len(names)) - 1) << offset
+            self._describe.extend((trait_type, name) for name in names)
+
+        self.num_options = len(self._describe)
+
+    @classmethod
+    def from_config(cls, config: NFTConfiguration) -> "TraitIndex":
+        """Build an index from a validated configuration."""
+        return cls(
+            config.trait_order,
+            {
+                trait_type: [opt.name for opt in trait.options]
+                for trait_type, trait in config.traits.items()
+            },
+        )
+
+    def option_id(self, trait_type: str, name: str) -> Optional[int]:
+        """Return the global ID of an option, or None if it is not configured."""
+        return self.option_ids.get(trait_type, {}).get(name)
+
+    def describe(self, option_id: int) -> Tuple[str, str]:
+        """Return (trait_type, option name) for a global option ID."""
+        return self._describe[option_id]
+
+    def selection_mask(self, traits: Dict[str, str]) -> int:
+        """Return the option bitset for a (partial) trait selection."""
+        mask = 0
+        for trait_type, name in traits.items():
+            option_id = self.option_id(trait_type, name)
+            if option_id is not None:
+                mask |= 1 << option_id
+        return mask
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Trait sampler module for NFT Generator
+Samples trait combinations by constraint propagation: each trait is drawn
+from the options still legal given the earlier picks, with the rarity
+weights renormalized over that domain.
+"""
+
+import hashlib
+import random
+import struct
+from bisect import bisect_right
+from collections import OrderedDict
+from itertools import accumulate
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from modules.rule_engine import CompiledRules
+from modules.trait_index import TraitIndex
+
+DOMAIN_TABLE_CACHE_SIZE = 4096
+# A 64-byte BLAKE2b digest yields eight 64-bit words
+COUNTER_BLOCK = struct.Struct("<8Q")
+
+
+class AliasTable:
+    """
+    Walker/Vose alias table for O(1) weighted sampling.
+
+    Building is O(n); every draw afterwards costs one uniform number, one
+    multiplication and one comparison regardless of the number of options.
+    """
+
+    __slots__ = ("values", "prob", "alias", "n")
+
+    def __init__(self, values: Sequence[int], weights: Sequence[float]):
+        """
+        Build an alias table.
+
+        Args:
+            values: Values returned by ``draw`` (e.g. option indices)
+            weights: Non-negative weights, one per value
+        """
+        n = len(values)
+        if n == 0:
+            raise ValueError("AliasTable needs at least one value")
+        total = float(sum(weights))
+        if total <= 0:
+            weights = [1.0] * n
+            total = float(n)
+
+        scaled = [w * n / total for w in weights]
+        prob = [1.0] * n
+        alias = list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            prob[s] = scaled[s]
+            alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+        # Leftovers are 1.0 up to rounding error
+
+        self.values = list(values)
+        self.prob = prob
+        self.alias = alias
+        self.n = n
+
+    def draw(self, u: float) -> int:
+        """Map one uniform number in [0, 1) to a weighted value."""
+        scaled = u * self.n
+        i = int(scaled)
+        if scaled - i < self.prob[i]:
+            return self.values[i]
+        return self.values[self.alias[i]]
+
+
+class CumulativeTable:
+    """
+    Cumulative-weight table for O(log n) weighted sampling.
+
+    Cheaper to build than an AliasTable, so it is used for the short-lived
+    restricted domains that depend on earlier picks.
+    """
+
+    __slots__ = ("values", "cumulative", "total")
+
+    def __init__(self, values: Sequence[int], weights: Sequence[float]):
+        self.values = list(values)
+        self.cumulative = list(accumulate(weights))
+        self.total = self.cumulative[-1] if self.cumulative else 0
+
+    def draw(self, u: float) -> int:
+        """Map one uniform number in [0, 1) to a weighted value."""
+        i = bisect_right(self.cumulative, u * self.total)
+        return self.values[min(i, len(self.values) - 1)]
+
+
+def _counter_bytes(counter: Sequence[int]) -> bytes:
+    return b"".join((c % (1 << 64)).to_bytes(8, "little") for c in counter)
+
+
+def derive_seed(seed: int, *counter: int) -> int:
+    """Return a 64-bit seed for the stream identified by ``counter``."""
+    digest = hashlib.blake2b(
+        _counter_bytes(counter),
+        key=(seed % (1 << 64)).to_bytes(8, "little"),
+        digest_size=8,
+    ).digest()
+    return int.from_bytes(digest, "little")
+
+
+class CounterRandom:
+    """
+    Counter-based uniform numbers.
+
+    Block ``i`` of the stream for a counter tuple such as (purpose,
+    nft_id, attempt) is the BLAKE2b digest of the tuple and ``i``, keyed
+    by the seed. A stream therefore depends only on the seed and its
+    counter, never on draws made before it, and can be reproduced on its
+    own in any process.
+    """
+
+    def __init__(self, seed: int, *counter: int):
+        """
+        Initialize counter-based random source.
+
+        Args:
+            seed: Run seed
+            counter: Integers identifying the stream
+        """
+        self._key = (seed % (1 << 64)).to_bytes(8, "little")
+        self._prefix = _counter_bytes(counter)
+        self._index = 0
+        self._block: List[float] = []
+        self._pos = 0
+
+    def random(self) -> float:
+        """Return the next uniform number in [0, 1)."""
+        if self._pos >= len(self._block):
+            digest = hashlib.blake2b(
+                self._prefix + self._index.to_bytes(8, "little"), key=self._key
+            ).digest()
+            self._block = [
+                (w >> 11) * (1.0 / (1 << 53)) for w in COUNTER_BLOCK.unpack(digest)
+            ]
+            self._index += 1
+            self._pos = 0
+        value = self._block[self._pos]
+        self._pos += 1
+        return value
+
+
+class TraitSampler:
+    """
+    Draws rule-valid trait combinations without rejection sampling.
+
+    Each pick is drawn from the options its trait type still allows, with
+    the weights renormalized over them. That is the distribution of
+    retrying a pick until the rules accept it, so combinations follow the
+    same distribution as with per-trait retries. A trait type left without
+    legal options is a dead end; the caller draws a new candidate.
+    """
+
+    def __init__(
+        self,
+        index: TraitIndex,
+        rules: CompiledRules,
+        generation_order: List[str],
+        include_weights: Dict[str, Optional[float]],
+        option_weights: Dict[str, List[float]],
+        alias_tables: Optional[Dict[str, AliasTable]] = None,
+    ):
+        """
+        Initialize trait sampler.
+
+        Args:
+            index: Trait index providing option IDs
+            rules: Compiled compatibility rules
+            generation_order: Order in which trait types are drawn
+            include_weights: Trait-type rarity (1-5) controlling inclusion
+            option_weights: Option weights per trait type, in index order
+            alias_tables: Prebuilt full-domain alias tables per trait type
+        """
+        self.index = index
+        self.rules = rules
+        self.generation_order = list(generation_order)
+        self.option_weights = option_weights
+
+        # Inclusion probability in percent, as used by should_include_trait
+        self.include_percent: Dict[str, float] = {}
+        for trait_type in self.generation_order:
+            weight = include_weights.get(trait_type)
+            self.include_percent[trait_type] = (
+                weight if weight is not None else 1
+            ) * 20
+
+        # Full-domain tables, plus an LRU of tables for restricted domains
+        self.alias_tables = dict(alias_tables or {})
+        for trait_type in self.generation_order:
+            if trait_type not in self.alias_tables:
+                weights = option_weights[trait_type]
+                self.alias_tables[trait_type] = AliasTable(range(len(weights)), weights)
+        self._domain_tables: "OrderedDict[Tuple, Optional[CumulativeTable]]" = (
+            OrderedDict()
+        )
+
+        self.dead_ends = 0
+
+    def _candidates(self, trait_type: str, own: int) -> List[int]:
+        """Return the option indices not excluded by ``own``."""
+        offset = self.index.offsets[trait_type]
+        allowed = (self.index.trait_masks[trait_type] & ~own) >> offset
+        candidates = []
+        while allowed:
+            low = allowed & -allowed
+            candidates.append(low.bit_length() - 1)
+            allowed ^= low
+        return candidates
+
+    def domain(self, trait_type: str, forbidden: int) -> List[int]:
+        """
+        Return the local option indices of ``trait_type`` still legal.
+
+        Args:
+            trait_type: Trait type to draw next
+            forbidden: Union of the exclusion bitsets of earlier picks
+
+        Returns:
+            List of option indices (positions in the configured option list)
+        """
+        own = forbidden & self.index.trait_masks[trait_type]
+        return self._candidates(trait_type, own)
+
+    def domain_table(self, trait_type: str, forbidden: int):
+        """
+        Return a sampling table over the legal domain of ``trait_type``.
+
+        Args:
+            trait_type: Trait type to draw next
+            forbidden: Union of the exclusion bitsets of earlier picks
+
+        Returns:
+            AliasTable or CumulativeTable over option indices, or None if
+            the domain is empty
+        """
+        own = forbidden & self.index.trait_masks[trait_type]
+        if not own:
+            return self.alias_tables[trait_type]
+
+        key = (trait_type, own)
+        table = self._domain_tables.get(key, False)
+        if table is not False:
+            self._domain_tables.move_to_end(key)
+            return table
+
+        candidates = self._candidates(trait_type, own)
+        if candidates:
+            weights = self.option_weights[trait_type]
+            table = CumulativeTable(candidates, [weights[i] for i in candidates])
+        else:
+            table = None
+        self._domain_tables[key] = table
+        if len(self._domain_tables) > DOMAIN_TABLE_CACHE_SIZE:
+            self._domain_tables.popitem(last=False)
+        return table
+
+    def sample(self, rng=random, lookahead=None) -> Optional[Dict[str, str]]:
+        """
+        Draw one rule-valid trait combination.
+
+        Args:
+            rng: Random source providing ``random()``, e.g. a CounterRandom
+            lookahead: Optional SelectionLookahead whose blocked options are
+                removed from each domain before drawing
+
+        Returns:
+            Ordered trait dict, or None if earlier picks left a trait type
+            that must be included without any legal option
+        """
+        traits: Dict[str, str] = {}
+        forbidden = 0
+        exclusion_masks = self.rules.exclusion_masks
+        draw = rng.random
+        if lookahead is not None:
+            lookahead.reset()
+        for trait_type in self.generation_order:
+            if not draw() * 100 < self.include_percent[trait_type]:
+                continue
+            if lookahead is None:
+                table = self.domain_table(trait_type, forbidden)
+            else:
+                table = self.domain_table(
+                    trait_type, forbidden | lookahead.blocked(trait_type)
+                )
+            if table is None:
+                self.dead_ends += 1
+                return None
+            idx = table.draw(draw())
+            traits[trait_type] = self.index.option_names[trait_type][idx]
+            forbidden |= exclusion_masks[self.index.offsets[trait_type] + idx]
+            if lookahead is not None:
+                lookahead.pick(trait_type, idx)
+        return traits
@@ -4,26 +4,160 @@ Trait tracker module for NFT Generator
 Tracks trait patterns and combinations to ensure uniqueness in generated NFTs.
 """
 
-from collections import defaultdict
-from typing import Dict, List, Tuple, Optional
+import hashlib
+import logging
+from array import array
 from itertools import combinations
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from modules.constants import LOOKAHEAD_MAX_ENTRIES
+from modules.pattern_store import KEY_MASK, PatternCounter, create_pattern_counter
+from modules.trait_index import TraitIndex
 
 
 class TraitTracker:
     """
     Tracks trait patterns and combinations to ensure uniqueness in generated NFTs.
-    MAX_SIMILAR_COMBINATIONS controls how many times a specific 4-trait pattern
-    can appear in the collection. A value of 1 means each 4-trait pattern must be unique.
+    MAX_SIMILAR_COMBINATIONS controls how many times a specific pattern of
+    PATTERN_SIZE traits can appear in the collection. A value of 1 means each
+    pattern must be unique.
+
+    Patterns are counted as packed 64-bit keys: every trait value has a
+    term and a pattern key is the sum of its terms. After ``configure``,
+    each trait type owns a bit field sized to its option count and a term
+    is ``(option index + 1) << field shift``, so keys are exact as long as
+    the fields fit in 64 bits. Otherwise, and for values interned later,
+    terms are 64-bit hashes of the trait type and value.
+
+    A pattern can only have reached the limit if each of its trait values
+    has, so checks only build the patterns among a candidate's values that
+    already appear in at least MAX_SIMILAR_COMBINATIONS recorded NFTs.
+
+    Each signature group is a set of trait types whose combined values may
+    appear only once. Its key is the sum of the group's terms, checked
+    against a set before any pattern is built.
+
+    Once ``enable_lookahead`` is called the tracker also keeps a completion
+    index: for every saturated pattern and used signature, the key of each
+    member-less subset maps to the global option bit of the missing member.
+    ``SelectionLookahead`` uses it to block options while a candidate is
+    still being drawn.
     """
 
-    def __init__(self, max_similar_combinations: int = 1):
-        self.trait_patterns = defaultdict(int)
-        self.bsh_combinations = set()
+    # Default number of traits in each tracked pattern
+    PATTERN_SIZE = 4
+    # Default signature groups: trait types whose combined values must be unique
+    SIGNATURE_TRAITS = (("Body", "Eyewear", "Head"),)
+
+    def __init__(
+        self,
+        max_similar_combinations: int = 1,
+        pattern_size: Optional[int] = None,
+        signature_traits: Optional[Sequence[Sequence[str]]] = None,
+    ):
+        # Packed pattern key -> number of NFTs containing it
+        self.trait_patterns: PatternCounter = create_pattern_counter()
+        # Signature groups, and per group the packed keys already used
+        if signature_traits is None:
+            signature_traits = self.SIGNATURE_TRAITS
+        self.signature_groups: List[Tuple[str, ...]] = [tuple(g) for g in signature_traits]
+        self.signature_combinations: List[Set[int]] = [set() for _ in self.signature_groups]
         self.MAX_SIMILAR_COMBINATIONS = max_similar_combinations
+        if pattern_size is not None:
+            self.PATTERN_SIZE = pattern_size
+        # Packed term -> number of NFTs containing that trait value
+        self._value_counts: Dict[int, int] = {}
+
+        # trait type -> option name -> packed term
+        self._terms: Dict[str, Dict[str, int]] = {}
+        # [trait type, shift, width] per bit field, or None when hashed
+        self._layout: Optional[List[List[Any]]] = None
+        # Set by configure: trait index, packed term per option index, and
+        # packed term -> global option bit
+        self._index: Optional[TraitIndex] = None
+        self._option_terms: Dict[str, List[int]] = {}
+        self._term_bits: Dict[int, int] = {}
+        # Subset key -> global option bits it may not be completed with
+        self._completions: Optional[Dict[int, int]] = None
+
+    def configure(self, index: TraitIndex) -> None:
+        """
+        Assign packed terms to every configured trait type and option.
+
+        Must be called before any pattern is recorded. Signature groups that
+        name a trait type missing from the index are dropped.
+
+        Args:
+            index: Trait index providing trait types and option order
+        """
+        if len(self.trait_patterns) or self._value_counts or any(self.signature_combinations):
+            raise ValueError("TraitTracker must be configured before tracking patterns")
+        self.signature_groups = [
+            group
+            for group in self.signature_groups
+            if all(t in index.option_names for t in group)
+        ]
+        self.signature_combinations = [set() for _ in self.signature_groups]
+        widths = [
+            (len(index.option_names[t]) + 1).bit_length() for t in index.trait_order
+        ]
+        self._terms = {}
+        if sum(widths) > 64:
+            self._layout = None
+            for trait_type in index.trait_order:
+                for name in index.option_names[trait_type]:
+                    self._intern(trait_type, name)
+        else:
+            self._layout = []
+            shift = 0
+            for trait_type, width in zip(index.trait_order, widths):
+                self._layout.append([trait_type, shift, width])
+                self._terms[trait_type] = {
+                    name: (k + 1) << shift
+                    for k, name in enumerate(index.option_names[trait_type])
+                }
+                shift += width
+
+        self._index = index
+        self._option_terms = {
+            t: [self._terms[t][name] for name in index.option_names[t]]
+            for t in index.trait_order
+        }
+        self._term_bits = {
+            term: 1 << (index.offsets[t] + k)
+            for t, terms in self._option_terms.items()
+            for k, term in enumerate(terms)
+        }
+
+    def _intern(self, trait_type: str, value: str) -> int:
+        """Assign a hashed term to a trait value without a packed one."""
+        digest = hashlib.blake2b(
+            f"{trait_type}\x1f{value}".encode(), digest_size=8
+        ).digest()
+        term = self._terms.setdefault(trait_type, {})[value] = int.from_bytes(
+            digest, "little"
+        )
+        return term
+
+    def _term(self, trait_type: str, value: str) -> int:
+        """Return the packed term of one trait value."""
+        try:
+            return self._terms[trait_type][value]
+        except KeyError:
+            return self._intern(trait_type, value)
+
+    def _pack(self, traits: Dict[str, str]) -> List[int]:
+        """Return the packed term of every selected trait."""
+        table = self._terms
+        packed = []
+        for trait_type, value in traits.items():
+            try:
+                packed.append(table[trait_type][value])
+            except KeyError:
+                packed.append(self._intern(trait_type, value))
+        return packed
 
-    def get_trait_pattern(
-        self, traits: Dict[str, str]
-    ) -> List[Tuple[Tuple[str, str], ...]]:
+    def get_trait_pattern(self, traits: Dict[str, str]):
         """
         Generate trait patterns for uniqueness checking with optimized algorithm.
 
@@ -31,33 +165,32 @@ class TraitTracker:
             traits: Dictionary of trait types and values
 
         Returns:
-            List of trait patterns (4-trait combinations)
+            Packed keys of the trait patterns (PATTERN_SIZE-trait combinations)
         """
-        patterns = []
-        trait_items = list(traits.items())
+        packed = self._pack(traits)
+        if len(packed) < self.PATTERN_SIZE:
+            return []
+        return self.trait_patterns.keys_for(packed, self.PATTERN_SIZE)
 
-        if len(trait_items) >= 4:
-            # Use itertools.combinations for better performance
-            for combo in combinations(trait_items, 4):
-                pattern = tuple(sorted(combo))
-                patterns.append(pattern)
-        return patterns
-
-    def get_bsh_combination(
-        self, traits: Dict[str, str]
-    ) -> Optional[Tuple[str, str, str]]:
+    def get_signature_keys(self, traits: Dict[str, str]) -> List[Optional[int]]:
         """
-        Get BSH (Body, Eyewear, Head) combination for additional uniqueness check.
+        Get the signature key of every signature group.
 
         Args:
             traits: Dictionary of trait types and values
 
         Returns:
-            Tuple of (Body, Eyewear, Head) values or None if any are missing
+            Packed key of each group's values, or None for groups with a
+            trait type missing from ``traits``
         """
-        if all(t in traits for t in ["Body", "Eyewear", "Head"]):
-            return (traits["Body"], traits["Eyewear"], traits["Head"])
-        return None
+        term = self._term
+        keys = []
+        for group in self.signature_groups:
+            if all(t in traits for t in group):
+                keys.append(sum(term(t, traits[t]) for t in group) & KEY_MASK)
+            else:
+                keys.append(None)
+        return keys
 
     def is_unique_enough(self, traits: Dict[str, str]) -> bool:
         """
@@ -69,15 +202,17 @@ class TraitTracker:
         Returns:
             True if the combination is unique enough, False otherwise
         """
-        bsh_combo = self.get_bsh_combination(traits)
-        if bsh_combo and bsh_combo in self.bsh_combinations:
-            return False
+        for key, used in zip(self.get_signature_keys(traits), self.signature_combinations):
+            if key is not None and key in used:
+                return False
 
-        patterns = self.get_trait_pattern(traits)
-        return all(
-            self.trait_patterns[pattern] < self.MAX_SIMILAR_COMBINATIONS
-            for pattern in patterns
-        )
+        limit = self.MAX_SIMILAR_COMBINATIONS
+        get = self._value_counts.get
+        hot = [term for term in self._pack(traits) if get(term, 0) >= limit]
+        if len(hot) < self.PATTERN_SIZE:
+            return True
+        patterns = self.trait_patterns.keys_for(hot, self.PATTERN_SIZE)
+        return self.trait_patterns.all_below(patterns, limit)
 
     def update_patterns(self, traits: Dict[str, str]) -> None:
         """
@@ -86,10 +221,208 @@ class TraitTracker:
         Args:
             traits: Dictionary of trait types and values
         """
-        patterns = self.get_trait_pattern(traits)
-        for pattern in patterns:
-            self.trait_patterns[pattern] += 1
+        packed = self._pack(traits)
+        if len(packed) >= self.PATTERN_SIZE:
+            self.trait_patterns.add(self.trait_patterns.keys_for(packed, self.PATTERN_SIZE))
+        counts = self._value_counts
+        for term in packed:
+            counts[term] = counts.get(term, 0) + 1
+
+        for key, used in zip(self.get_signature_keys(traits), self.signature_combinations):
+            if key is not None:
+                used.add(key)
+
+        if self._completions is not None:
+            self._add_completions(traits)
+
+    def enable_lookahead(self, selections: Iterable[Dict[str, str]]) -> None:
+        """
+        Build the completion index used by ``SelectionLookahead``.
+
+        Args:
+            selections: Trait dicts of every NFT recorded so far
+        """
+        self._completions = {}
+        for traits in selections:
+            self._add_completions(traits)
+
+    @property
+    def lookahead_enabled(self) -> bool:
+        return self._completions is not None
+
+    @property
+    def index(self) -> Optional[TraitIndex]:
+        """Trait index passed to ``configure``, or None before that."""
+        return self._index
+
+    def option_term(self, trait_type: str, option_index: int) -> int:
+        """Return the packed term of a configured option."""
+        return self._option_terms[trait_type][option_index]
+
+    def is_hot(self, term: int) -> bool:
+        """Return True if a trait value appears in MAX_SIMILAR_COMBINATIONS NFTs."""
+        return self._value_counts.get(term, 0) >= self.MAX_SIMILAR_COMBINATIONS
+
+    def completion_bits(self, key: int) -> int:
+        """
+        Return the global option bits that may not complete a subset.
+
+        Args:
+            key: Sum of the packed terms of a subset, not yet masked
+
+        Returns:
+            Option bits that would complete a saturated pattern or used
+            signature together with the subset (0 without lookahead)
+        """
+        if self._completions is None:
+            return 0
+        return self._completions.get(key & KEY_MASK, 0)
+
+    def _add_completions(self, traits: Dict[str, str]) -> None:
+        """Index the saturated patterns and signatures of one recorded NFT."""
+        completions = self._completions
+        if len(completions) >= LOOKAHEAD_MAX_ENTRIES:
+            return
+        bits = self._term_bits
+        limit = self.MAX_SIMILAR_COMBINATIONS
+        get = self._value_counts.get
+        hot = [term for term in self._pack(traits) if get(term, 0) >= limit and term in bits]
+        saturated = []
+        if len(hot) >= self.PATTERN_SIZE:
+            keys = self.trait_patterns.keys_for(hot, self.PATTERN_SIZE)
+            counts = self.trait_patterns.counts(keys)
+            for members, count in zip(combinations(hot, self.PATTERN_SIZE), counts):
+                if count >= limit:
+                    saturated.append(members)
+        for group in self.signature_groups:
+            if all(t in traits for t in group):
+                saturated.append(tuple(self._term(t, traits[t]) for t in group))
+
+        for members in saturated:
+            key = sum(members)
+            for term in members:
+                if term in bits:
+                    partial = (key - term) & KEY_MASK
+                    completions[partial] = completions.get(partial, 0) | bits[term]
+        if len(completions) >= LOOKAHEAD_MAX_ENTRIES:
+            logging.warning(
+                f"Lookahead index reached {LOOKAHEAD_MAX_ENTRIES:,} entries; "
+                f"later saturated patterns are only caught after sampling"
+            )
+
+    def state_signature(self) -> List[Any]:
+        """
+        Return the settings packed state depends on.
+
+        State from ``get_state`` may only be loaded into a tracker with the
+        same signature and trait index.
+        """
+        return [
+            self._layout,
+            self.PATTERN_SIZE,
+            [list(group) for group in self.signature_groups],
+        ]
+
+    def get_state(self) -> Dict[str, array]:
+        """Return the tracker state as packed integer arrays."""
+        pattern_keys, pattern_counts = self.trait_patterns.export()
+        state = {
+            "value_terms": array("Q", self._value_counts.keys()),
+            "value_counts": array("I", self._value_counts.values()),
+            "pattern_keys": pattern_keys,
+            "pattern_counts": pattern_counts,
+        }
+        for gi, used in enumerate(self.signature_combinations):
+            state[f"signature_{gi}"] = array("Q", used)
+        return state
+
+    def load_state(self, state: Dict[str, Sequence[int]]) -> None:
+        """
+        Restore tracker state written by ``get_state``.
+
+        Args:
+            state: Previously saved tracker state
+
+        Raises:
+            ValueError: If a section is missing
+        """
+        try:
+            self.trait_patterns.load(state["pattern_keys"], state["pattern_counts"])
+            self.signature_combinations = [
+                set(state[f"signature_{gi}"]) for gi in range(len(self.signature_groups))
+            ]
+            self._value_counts = dict(zip(state["value_terms"], state["value_counts"]))
+        except KeyError as e:
+            raise ValueError(f"Tracker state is missing section {e}")
+
+
+class SelectionLookahead:
+    """
+    Tracks one partial selection and the options it may no longer take.
+
+    After each pick, the subsets that could be one value short of a
+    saturated pattern or used signature are looked up in the tracker's
+    completion index, and the options they block are accumulated. Only
+    trait values the tracker counts as hot take part in pattern subsets,
+    since saturated patterns contain nothing else.
+    """
+
+    def __init__(self, tracker: TraitTracker):
+        """
+        Initialize lookahead.
+
+        Args:
+            tracker: Configured tracker with lookahead enabled
+        """
+        if not tracker.lookahead_enabled:
+            raise ValueError("TraitTracker lookahead is not enabled")
+        self.tracker = tracker
+        self._trait_masks = tracker.index.trait_masks
+        # Signature groups each trait type belongs to
+        self._groups_of: Dict[str, List[int]] = {}
+        for gi, group in enumerate(tracker.signature_groups):
+            for trait_type in group:
+                self._groups_of.setdefault(trait_type, []).append(gi)
+        self.reset()
+
+    def reset(self) -> None:
+        """Start a new, empty selection."""
+        # Sums of the j-subsets of hot picks, for j below the pattern size
+        self._sums: List[List[int]] = [[0]] + [
+            [] for _ in range(self.tracker.PATTERN_SIZE - 2)
+        ]
+        # Per signature group: sum of picked terms and members not yet picked
+        self._group_sums = [0] * len(self.tracker.signature_groups)
+        self._group_left = [len(g) for g in self.tracker.signature_groups]
+        self._blocked = self.tracker.completion_bits(0)
+
+    def blocked(self, trait_type: str) -> int:
+        """Return the global option bits of ``trait_type`` that are blocked."""
+        return self._blocked & self._trait_masks[trait_type]
+
+    def pick(self, trait_type: str, option_index: int) -> None:
+        """
+        Add one drawn option to the selection.
+
+        Args:
+            trait_type: Trait type of the pick
+            option_index: Local option index of the pick
+        """
+        tracker = self.tracker
+        completion_bits = tracker.completion_bits
+        term = tracker.option_term(trait_type, option_index)
+        blocked = self._blocked
+
+        if tracker.is_hot(term):
+            sums = self._sums
+            for s in sums[-1]:
+                blocked |= completion_bits(s + term)
+            for j in range(len(sums) - 1, 0, -1):
+                sums[j].extend([s + term for s in sums[j - 1]])
 
-        bsh_combo = self.get_bsh_combination(traits)
-        if bsh_combo:
-            self.bsh_combinations.add(bsh_combo)
+        for gi in self._groups_of.get(trait_type, ()):
+            self._group_sums[gi] += term
+            self._group_left[gi] -= 1
+            if self._group_left[gi] == 1:
+                blocked |= completion_bits(self._group_sums[gi])
+        self._blocked = blocked
@@ -47,6 +47,8 @@ class NFTConfiguration:
     traits: Dict[str, TraitConfig]
     image_size: List[int]
     max_similar_combinations: Optional[int] = 1
+    similarity_subset_size: Optional[int] = None
+    signature_traits: Optional[List[List[str]]] = None
     ipfs_cid: Optional[str] = None
     metadata: Optional[Dict[str, Any]] = None
     priority_traits: Optional[List[str]] = None
@@ -64,6 +66,25 @@ class NFTConfiguration:
         if self.max_similar_combinations is not None and self.max_similar_combinations < 1:
             raise ValidationError("max_similar_combinations must be >= 1")
 
+        # Validate similarity_subset_size
+        if self.similarity_subset_size is not None and not (
+            2 <= self.similarity_subset_size < len(self.trait_order)
+        ):
+            raise ValidationError(
+                f"similarity_subset_size must be between 2 and {len(self.trait_order) - 1}"
+            )
+
+        # Validate signature_traits
+        if self.signature_traits is not None:
+            for group in self.signature_traits:
+                if not group or len(set(group)) != len(group):
+                    raise ValidationError(
+                        "signature_traits groups must be non-empty lists of distinct trait types"
+                    )
+                unknown = [t for t in group if t not in self.trait_order]
+                if unknown:
+                    raise ValidationError(f"Unknown signature trait types: {unknown}")
+
         # Validate all traits are in trait_order
         trait_names = set(self.traits.keys())
         order_names = set(self.trait_order)
@@ -187,6 +208,8 @@ class ConfigurationValidator:
                 traits=validated_traits,
                 image_size=config_dict['image_size'],
                 max_similar_combinations=config_dict.get('max_similar_combinations'),
+                similarity_subset_size=config_dict.get('similarity_subset_size'),
+                signature_traits=config_dict.get('signature_traits'),
                 ipfs_cid=config_dict.get('ipfs_cid'),
                 metadata=config_dict.get('metadata'),
                 priority_traits=config_dict.get('priority_traits')
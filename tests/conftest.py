@@ -0,0 +1,146 @@
+"""Shared fixtures for the NFT Generator tests."""
+
+import json
+import os
+import shutil
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from PIL import Image
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture
+def write_project(tmp_path, monkeypatch):
+    """
+    Return a function writing a two-layer project into the working directory.
+
+    The function takes the Background option names, so calling it again
+    changes the configuration of the same project.
+    """
+    monkeypatch.chdir(tmp_path)
+
+    def write(backgrounds):
+        layers = {
+            "Background": {
+                name: (40 * i, 90, 160, 255) for i, name in enumerate(backgrounds)
+            },
+            "Body": {
+                "Cat": (250, 200, 0, 255),
+                "Dog": (120, 60, 20, 255),
+                "Fox": (230, 90, 0, 255),
+            },
+        }
+        traits = {}
+        for trait, options in layers.items():
+            os.makedirs(tmp_path / "traits" / trait, exist_ok=True)
+            for name, color in options.items():
+                image = Image.new("RGBA", (16, 16), (0, 0, 0, 0))
+                box = (0, 0, 16, 16) if trait == "Background" else (4, 4, 12, 12)
+                image.paste(color, box)
+                image.save(tmp_path / "traits" / trait / f"{name}.png")
+            traits[trait] = {"options": [{"name": n, "rarity": 3} for n in options]}
+        config = {"trait_order": list(layers), "image_size": [16, 16], "traits": traits}
+        with open(tmp_path / "config.json", "w") as f:
+            json.dump(config, f)
+        with open(tmp_path / "ruler.json", "w") as f:
+            json.dump({"rules": []}, f)
+        for schema in ("config_schema.json", "ruler_schema.json"):
+            shutil.copy(REPO_ROOT / schema, tmp_path / schema)
+
+    return write
+
+
+SMALL_RULER_OPTIONS = {
+    "Body": ["Robot", "Ape", "Cat"],
+    "Mouth": ["Cigar", "Bubblegum", "Smile"],
+    "Head": ["Helmet", "Crown", "Cap"],
+    "Eyes": ["VR", "3D", "Plain"],
+}
+
+
+def _rule(if_type, values, then_type, excluded):
+    return {
+        "if": {"trait_type": if_type, "value": values},
+        "then": {"trait_type": then_type, "excluded_values": excluded},
+    }
+
+
+SMALL_RULER = {
+    "rules": [
+        _rule("Body", ["Robot"], "Mouth", ["Cigar", "Bubblegum"]),
+        _rule("Mouth", ["Cigar"], "Head", ["Helmet", "Crown"]),
+        _rule("Head", ["Helmet"], "Eyes", ["VR"]),
+        # Points from a later trait type back to an earlier one
+        _rule("Eyes", ["VR", "3D"], "Head", ["Helmet", "Crown"]),
+        _rule("Body", ["Ape"], "Head", ["Cap"]),
+        # With Crown, Eyes is left with VR, which excludes Crown: a dead end
+        _rule("Head", ["Cap", "Crown"], "Eyes", ["3D", "Plain"]),
+        # Never applies: a trait type holds one value
+        _rule("Eyes", ["Plain"], "Eyes", ["VR"]),
+        _rule("Mouth", ["Bubblegum"], "Eyes", ["*"]),
+        _rule("Body", ["*"], "Wings", ["Bat"]),
+    ]
+}
+
+
+@pytest.fixture
+def small_ruler(tmp_path, monkeypatch):
+    """
+    Return a four-trait setup whose rules are loaded from a ruler.json.
+
+    The namespace holds the options, rarities and option weights, the
+    validated ruler, its TraitIndex and CompiledRules, and
+    ``baseline_valid``, the pairwise rule check the generator used before
+    rules were compiled.
+    """
+    from modules.config_manager import ConfigManager
+    from modules.rule_engine import CompiledRules
+    from modules.trait_index import TraitIndex
+
+    monkeypatch.chdir(tmp_path)
+    with open(tmp_path / "ruler.json", "w") as f:
+        json.dump(SMALL_RULER, f)
+    shutil.copy(REPO_ROOT / "ruler_schema.json", tmp_path / "ruler_schema.json")
+    ruler = ConfigManager(ruler_file="ruler.json").load_ruler()
+
+    def baseline_valid(selected, trait_type, value):
+        for rule in ruler.rules:
+            if_condition, then_condition = rule.if_condition, rule.then_condition
+            if then_condition.trait_type == trait_type:
+                if if_condition.trait_type in selected:
+                    if (
+                        "*" in if_condition.value
+                        or selected[if_condition.trait_type] in if_condition.value
+                    ) and (
+                        "*" in then_condition.excluded_values
+                        or value in then_condition.excluded_values
+                    ):
+                        return False
+            if if_condition.trait_type == trait_type:
+                if "*" in if_condition.value or value in if_condition.value:
+                    affected = then_condition.trait_type
+                    if affected in selected and (
+                        "*" in then_condition.excluded_values
+                        or selected[affected] in then_condition.excluded_values
+                    ):
+                        return False
+        return True
+
+    index = TraitIndex(list(SMALL_RULER_OPTIONS), SMALL_RULER_OPTIONS)
+    return SimpleNamespace(
+        options=SMALL_RULER_OPTIONS,
+        rarity={"Body": 5, "Mouth": 3, "Head": 5, "Eyes": 4},
+        weights={
+            "Body": [3, 2, 1],
+            "Mouth": [1, 1, 2],
+            "Head": [2, 1, 1],
+            "Eyes": [1, 2, 1],
+        },
+        ruler=ruler,
+        index=index,
+        rules=CompiledRules(index, ruler.rules),
+        baseline_valid=baseline_valid,
+    )
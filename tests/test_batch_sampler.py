@@ -0,0 +1,90 @@
+"""Tests for vectorized candidate batches."""
+
+import math
+from collections import Counter
+from itertools import product
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from modules.batch_sampler import BatchCandidateSampler
+
+DRAWS = 30_000
+
+
+def make_sampler(setup, seed=5) -> BatchCandidateSampler:
+    return BatchCandidateSampler(
+        setup.index,
+        setup.rules,
+        list(setup.options),
+        {t: r * 20 for t, r in setup.rarity.items()},
+        setup.weights,
+        seed=seed,
+        batch_size=4096,
+    )
+
+
+def key(traits):
+    return tuple(sorted(traits.items()))
+
+
+def is_valid(setup, traits):
+    selected = {}
+    for trait_type, value in traits.items():
+        if not setup.baseline_valid(selected, trait_type, value):
+            return False
+        selected[trait_type] = value
+    return True
+
+
+def conditioned_distribution(setup):
+    """Independent per-trait draws, conditioned on passing the rules."""
+    distribution = {}
+    for values in product(*[[None] + names for names in setup.options.values()]):
+        p = 1.0
+        traits = {}
+        for (trait_type, names), value in zip(setup.options.items(), values):
+            include = setup.rarity[trait_type] * 20 / 100
+            if value is None:
+                p *= 1 - include
+            else:
+                weights = setup.weights[trait_type]
+                p *= include * weights[names.index(value)] / sum(weights)
+                traits[trait_type] = value
+        if p > 0 and is_valid(setup, traits):
+            distribution[key(traits)] = p
+    total = sum(distribution.values())
+    return {combination: p / total for combination, p in distribution.items()}
+
+
+def draw(sampler, count=DRAWS):
+    drawn = []
+    while len(drawn) < count:
+        traits = sampler.next_candidate()
+        if traits is not None:
+            drawn.append(traits)
+    return drawn
+
+
+def test_candidates_pass_the_rules(small_ruler):
+    sampler = make_sampler(small_ruler)
+    drawn = draw(sampler, 5_000)
+    assert all(is_valid(small_ruler, traits) for traits in drawn)
+    assert all("Body" in traits and "Head" in traits for traits in drawn)
+    assert {key(t) for t in drawn} == set(conditioned_distribution(small_ruler))
+    assert sampler.rejected > 0
+
+
+def test_matches_conditioned_independent_distribution(small_ruler):
+    expected = conditioned_distribution(small_ruler)
+    counts = Counter(key(traits) for traits in draw(make_sampler(small_ruler)))
+    assert set(counts) <= set(expected)
+
+    n = sum(counts.values())
+    chi_square = sum((counts[c] - n * p) ** 2 / (n * p) for c, p in expected.items())
+    # Wilson-Hilferty approximation of the 99.9th percentile
+    df = len(expected) - 1
+    z = 3.09
+    critical = df * (1 - 2 / (9 * df) + z * math.sqrt(2 / (9 * df))) ** 3
+    assert chi_square < critical
@@ -0,0 +1,48 @@
+"""Tests for the collection plan and its render order."""
+
+import random
+
+from modules.collection_plan import CollectionPlan, PlannedNFT
+from modules.trait_index import TraitIndex
+
+OPTIONS = {
+    "Background": ["Blue", "Red", "Green"],
+    "Body": ["Cat", "Dog"],
+    "Head": ["Cap", "Hat", "Crown"],
+    "Eyes": ["Shades", "VR"],
+}
+
+
+def make_plan(count: int, seed: int = 3) -> CollectionPlan:
+    rng = random.Random(seed)
+    plan = CollectionPlan()
+    for nft_id in range(1, count + 1):
+        traits = {
+            trait_type: rng.choice(names)
+            for trait_type, names in OPTIONS.items()
+            if trait_type == "Background" or rng.random() < 0.7
+        }
+        plan.add(PlannedNFT(nft_id=nft_id, traits=traits, nft_hash=str(nft_id)))
+    return plan
+
+
+def test_render_order_is_a_permutation_of_the_planned_ids():
+    plan = make_plan(200)
+    index = TraitIndex(list(OPTIONS), OPTIONS)
+    requested = list(range(150, 0, -1)) + [999]
+    ordered = plan.render_order(requested, index)
+    assert sorted(item.nft_id for item in ordered) == list(range(1, 151))
+
+
+def test_render_order_groups_shared_prefixes():
+    plan = make_plan(300)
+    index = TraitIndex(list(OPTIONS), OPTIONS)
+    ordered = plan.render_order(list(range(1, 301)), index)
+    stacks = [
+        [(t, item.traits[t]) for t in OPTIONS if t in item.traits] for item in ordered
+    ]
+    # For every depth, NFTs with the same leading layers form one run
+    for depth in range(1, len(OPTIONS) + 1):
+        prefixes = [tuple(stack[:depth]) for stack in stacks]
+        runs = [p for i, p in enumerate(prefixes) if i == 0 or p != prefixes[i - 1]]
+        assert len(runs) == len(set(runs))
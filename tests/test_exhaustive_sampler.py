@@ -0,0 +1,94 @@
+"""Tests for drawing enumerated combinations without replacement."""
+
+from itertools import product
+
+import pytest
+
+from modules.combination_space import CombinationSpace
+from modules.exhaustive_sampler import ExhaustiveSampler
+from modules.feasibility import FeasibilityAnalyzer
+from modules.nft_generator import NFTGenerator
+from modules.trait_sampler import TraitSampler
+
+
+def make_sampler(setup, seed=11, pool_size=10) -> ExhaustiveSampler:
+    sampler = TraitSampler(
+        setup.index, setup.rules, list(setup.options), setup.rarity, setup.weights
+    )
+    return ExhaustiveSampler(
+        sampler, CombinationSpace(setup.index), seed=seed, pool_size=pool_size
+    )
+
+
+def is_valid(setup, traits):
+    selected = {}
+    for trait_type, value in traits.items():
+        if not setup.baseline_valid(selected, trait_type, value):
+            return False
+        selected[trait_type] = value
+    return True
+
+
+def valid_combinations(setup):
+    valid = set()
+    for values in product(*[[None] + names for names in setup.options.values()]):
+        traits = {t: v for t, v in zip(setup.options, values) if v is not None}
+        required = [t for t, r in setup.rarity.items() if r == 5]
+        if all(traits.get(t) for t in required) and is_valid(setup, traits):
+            valid.add(tuple(sorted(traits.items())))
+    return valid
+
+
+def test_candidates_are_distinct_and_valid(small_ruler):
+    sampler = make_sampler(small_ruler, pool_size=10)
+    space = CombinationSpace(small_ruler.index)
+    drawn = list(sampler.candidates())
+
+    assert len(drawn) == 10
+    assert len({combination_id for _, combination_id in drawn}) == 10
+    for traits, combination_id in drawn:
+        assert is_valid(small_ruler, traits)
+        assert space.encode(traits) == combination_id
+    assert sampler.enumerated == len(valid_combinations(small_ruler))
+    assert not sampler.complete
+
+
+def test_large_pool_holds_the_whole_space(small_ruler):
+    sampler = make_sampler(small_ruler, pool_size=10_000)
+    drawn = [tuple(sorted(traits.items())) for traits, _ in sampler.candidates()]
+
+    assert len(drawn) == len(set(drawn))
+    assert set(drawn) == valid_combinations(small_ruler)
+    assert sampler.complete
+
+
+def test_order_is_deterministic_per_seed(small_ruler):
+    def order(seed):
+        return [cid for _, cid in make_sampler(small_ruler, seed=seed).candidates()]
+
+    assert order(11) == order(11)
+    assert order(11) != order(12)
+
+
+def test_skip_feasibility_enumerates_from_the_exact_count(write_project, monkeypatch):
+    # Both trait types are optional: 3 x 4 = 12 valid combinations
+    write_project(["Red", "Blue"])
+    generator = NFTGenerator("config.json", "ruler.json", seed=3, validate_skip=True)
+
+    def analyze(*args, **kwargs):
+        pytest.fail("the feasibility report must not be computed")
+
+    monkeypatch.setattr(FeasibilityAnalyzer, "analyze", analyze)
+    enumerated = []
+    plan_exhaustive = generator._plan_exhaustive
+    monkeypatch.setattr(
+        generator,
+        "_plan_exhaustive",
+        lambda ids: enumerated.append(ids) or plan_exhaustive(ids),
+    )
+
+    ids = list(range(1, 9))
+    plan = generator.plan_collection(ids, check_feasibility=False)
+    assert enumerated == [ids]
+    assert len(plan) == 8
+    assert len({item.combination_id for item in plan}) == 8
@@ -0,0 +1,110 @@
+"""Tests for the pre-flight feasibility analysis."""
+
+from itertools import combinations, product
+
+import pytest
+
+from modules.feasibility import FeasibilityAnalyzer
+from modules.rule_engine import CompiledRules
+from modules.trait_index import TraitIndex
+
+
+def valid_combinations(setup, trait_types, optional=()):
+    """Brute-force the rule-valid selections over ``trait_types``."""
+    choices = [
+        ([None] if t in optional else []) + setup.options[t] for t in trait_types
+    ]
+    valid = []
+    for values in product(*choices):
+        selected = {}
+        for trait_type, value in zip(trait_types, values):
+            if value is None:
+                continue
+            if not setup.baseline_valid(selected, trait_type, value):
+                break
+            selected[trait_type] = value
+        else:
+            valid.append(selected)
+    return valid
+
+
+def best_collection(candidates, pattern_size, max_similar):
+    """Size of the largest collection in which no pattern repeats too often."""
+    patterns = [
+        [frozenset(p) for p in combinations(c.items(), pattern_size)]
+        for c in candidates
+    ]
+    best = 0
+
+    def search(i, used, size):
+        nonlocal best
+        if size + len(candidates) - i <= best:
+            return
+        if i == len(candidates):
+            best = size
+            return
+        if all(used.get(p, 0) < max_similar for p in patterns[i]):
+            added = dict(used)
+            for p in patterns[i]:
+                added[p] = added.get(p, 0) + 1
+            search(i + 1, added, size + 1)
+        search(i + 1, used, size)
+
+    search(0, {}, 0)
+    return best
+
+
+@pytest.fixture
+def tiny(small_ruler):
+    """Body, Head and Eyes from the small ruler, every trait type always included."""
+    options = {t: small_ruler.options[t] for t in ("Body", "Head", "Eyes")}
+    index = TraitIndex(list(options), options)
+    analyzer = FeasibilityAnalyzer(
+        index,
+        CompiledRules(index, small_ruler.ruler.rules),
+        {t: 100 for t in options},
+        {t: [1, 1, 1] for t in options},
+        max_similar=1,
+        pattern_size=2,
+        signature_groups=[("Body", "Head")],
+    )
+    return small_ruler, analyzer
+
+
+def test_valid_combinations_are_counted_exactly(small_ruler):
+    include = {t: r * 20 for t, r in small_ruler.rarity.items()}
+    analyzer = FeasibilityAnalyzer(
+        small_ruler.index, small_ruler.rules, include, small_ruler.weights
+    )
+    optional = [t for t, p in include.items() if p < 100]
+    expected = valid_combinations(small_ruler, list(small_ruler.options), optional)
+    assert analyzer.valid_combinations() == (len(expected), True)
+
+
+def test_count_or_bound(tiny):
+    setup, analyzer = tiny
+    for pair in combinations(("Body", "Head", "Eyes"), 2):
+        count = len(valid_combinations(setup, pair))
+        assert analyzer._count_or_bound(pair) == count
+        # Out of states: fall back to the product of the option counts
+        assert analyzer._count_or_bound(pair, limit=1) == 9
+
+
+def test_bounds_cover_best_collection(tiny):
+    setup, analyzer = tiny
+    candidates = valid_combinations(setup, ["Body", "Head", "Eyes"])
+    best = best_collection(candidates, pattern_size=2, max_similar=1)
+    assert best == 2
+
+    # Head and Eyes allow the fewest pairs although every pair has 9 products
+    assert analyzer.pattern_limit() == (2, ("Head", "Eyes"))
+    assert analyzer.signature_limit() == len(
+        valid_combinations(setup, ["Body", "Head"])
+    )
+    assert analyzer.valid_combinations() == (len(candidates), True)
+    assert best <= analyzer.uniqueness_limit() <= len(candidates)
+
+    report = analyzer.analyze(requested=best)
+    assert report.proven_limit == best
+    assert report.feasible and not report.provably_infeasible
+    assert analyzer.analyze(requested=best + 1).provably_infeasible
@@ -0,0 +1,190 @@
+"""Tests for layer compositing and the composite cache."""
+
+import random
+
+from PIL import Image
+
+from modules.image_processor import (
+    BLANK_PIXEL,
+    CompositeCache,
+    FrequencySketch,
+    ImageProcessor,
+)
+
+TRAIT_ORDER = ["Background", "Body"]
+
+
+def write_layers(directory, count, size=32, seed=5):
+    """Write layers with random semi-transparent patches; return their paths."""
+    rng = random.Random(seed)
+    paths = []
+    for i in range(count):
+        # Invisible pixels carry arbitrary colors, as exported PNGs often do
+        image = Image.new("RGBA", (size, size), (rng.randrange(256), 7, 99, 0))
+        if i != 2:  # one fully transparent layer
+            left, top = rng.randrange(size // 2), rng.randrange(size // 2)
+            for x in range(left, left + rng.randrange(1, size // 2)):
+                for y in range(top, top + rng.randrange(1, size // 2)):
+                    color = tuple(rng.randrange(256) for _ in range(3))
+                    image.putpixel((x, y), color + (rng.choice([0, 1, 128, 255]),))
+        path = directory / f"layer{i}.png"
+        image.save(path)
+        paths.append(str(path))
+    return paths
+
+
+def test_sprites_match_full_canvas_compositing(tmp_path):
+    paths = write_layers(tmp_path, 6)
+    full = [Image.open(path).convert("RGBA") for path in paths]
+    processor = ImageProcessor()
+    for stack in ([0, 1, 2, 3, 4, 5], [2, 3], [5, 0, 4], [1]):
+        expected = Image.new("RGBA", (32, 32), BLANK_PIXEL)
+        for i in stack:
+            expected = Image.alpha_composite(expected, full[i])
+        composed = processor._compose_layers([paths[i] for i in stack], (32, 32))
+        assert composed.tobytes() == expected.tobytes()
+
+
+def test_load_image_cached_returns_full_canvas(tmp_path):
+    paths = write_layers(tmp_path, 3)
+    processor = ImageProcessor()
+    for path in paths:
+        original = Image.open(path).convert("RGBA")
+        loaded = processor.load_image_cached(path)
+        assert loaded.size == original.size
+        # Visible pixels are kept; invisible ones become the blank color
+        alpha = original.getchannel("A")
+        visible = Image.new("RGBA", original.size, BLANK_PIXEL)
+        visible.paste(original, mask=alpha.point(lambda a: 255 if a else 0))
+        assert loaded.tobytes() == visible.tobytes()
+        # Each call returns a copy the caller may modify
+        assert loaded is not processor.load_image_cached(path)
+
+
+def test_sparse_stacks_reuse_composites(write_project):
+    write_project(["Blue", "Red"])
+    stacks = [
+        {"Background": background, "Body": body}
+        for body in ("Cat", "Dog", "Fox")
+        for background in ("Blue", "Red")
+    ]
+    reference = ImageProcessor()
+    expected = [
+        reference.compose_static_nft(
+            {t: f"traits/{t}/{v}.png" for t, v in traits.items()},
+            TRAIT_ORDER,
+            traits,
+            (16, 16),
+        ).tobytes()
+        for traits in stacks
+    ]
+
+    processor = ImageProcessor()
+    for _ in range(3):
+        for traits, image in zip(stacks, expected):
+            layers = {t: f"traits/{t}/{v}.png" for t, v in traits.items()}
+            composed = processor.compose_static_nft(
+                layers, TRAIT_ORDER, traits, (16, 16)
+            )
+            assert composed.tobytes() == image
+    stats = processor.get_cache_stats()
+    # The full-canvas backgrounds are pasted, not blended, yet still cached
+    assert stats["composite_cache_size"] >= 2
+    assert stats["composite_hits"] >= len(stacks) * 2
+
+
+def test_frequency_sketch_counts_saturates_and_ages():
+    sketch = FrequencySketch(16)
+    for _ in range(3):
+        sketch.increment("a")
+    assert sketch.estimate("a") == 3
+    assert sketch.estimate("b") == 0
+    for _ in range(30):
+        sketch.increment("b")
+    assert sketch.estimate("b") == FrequencySketch.MAX_COUNT
+    sketch.seed("c", 6)
+    assert sketch.estimate("c") == 6
+
+    # Reaching the sample size halves every counter
+    for i in range(sketch.sample_size):
+        sketch.increment(f"key{i}")
+    assert sketch.estimate("a") <= 1
+    assert sketch.estimate("b") <= FrequencySketch.MAX_COUNT // 2 + 1
+
+
+def test_layer_admission_keeps_more_popular_entries(tmp_path):
+    paths = write_layers(tmp_path, 6)
+    hot_a, hot_b, cold, rising = paths[0], paths[1], paths[3], paths[4]
+    processor = ImageProcessor(cache_size=2)
+    for _ in range(3):
+        processor.load_sprite_cached(hot_a)
+        processor.load_sprite_cached(hot_b)
+
+    # Make the composite cache hold memory the layers would need
+    composite = Image.new("RGBA", (8, 8))
+    processor._composites.offer(("x",), composite, processor.max_memory_bytes)
+    processor.max_memory_bytes = (
+        processor.current_memory_bytes + processor._composites.current_bytes
+    )
+
+    processor.load_sprite_cached(cold)
+    cached = set(processor._image_cache)
+    assert cached == {hot_a, hot_b}
+    assert processor.get_cache_stats()["admission_rejections"] == 1
+    # A rejected layer does not release composites either
+    assert len(processor._composites) == 1
+
+    for _ in range(4):
+        processor.load_sprite_cached(rising)
+    assert set(processor._image_cache) == {hot_b, rising}
+
+
+def test_composite_admission_compares_with_its_victims():
+    size = 4 * 4 * 4
+    image = Image.new("RGBA", (4, 4))
+    # Room for five composites, one of them in the window
+    cache = CompositeCache(5 * size, 16)
+
+    def warm(prefix, count):
+        for _ in range(count):
+            cache.deepest(list(prefix))
+
+    hot = [(f"hot{i}",) for i in range(5)]
+    for prefix in hot:
+        warm(prefix, 5)
+        cache.offer(prefix, image, 10 * size)
+    assert cache.current_bytes == 5 * size
+
+    # With one composite worth of memory taken back by the layers, a cold
+    # composite may not evict the popular ones from the main LRU
+    cache.offer(("cold",), image, -size)
+    assert ("cold",) not in cache._window and ("cold",) not in cache._main
+    assert all(prefix in cache._main for prefix in hot[:4])
+    assert cache.current_bytes <= 4 * size
+
+    # A more popular one evicts the least recently used
+    warm(("popular",), 9)
+    cache.offer(("popular",), image, 0)
+    assert cache.current_bytes <= 4 * size
+    assert ("popular",) in cache._window
+    assert hot[0] not in cache._main
+
+
+def test_layer_frequencies_follow_include_overrides(write_project):
+    from modules.nft_generator import NFTGenerator
+
+    write_project(["Blue", "Red"])
+
+    def seeded(**kwargs):
+        generator = NFTGenerator(
+            "config.json", "ruler.json", validate_skip=True, **kwargs
+        )
+        processor = generator.image_processor
+        key = str(processor._sanitize_path("traits/Body/Cat.png"))
+        return processor._frequency.estimate(key)
+
+    # One of three equally weighted options, included 20% or 100% of the time
+    assert seeded() == round(0.2 / 3 * FrequencySketch.MAX_COUNT)
+    assert seeded(include_overrides={"Body": 5}) == round(
+        1 / 3 * FrequencySketch.MAX_COUNT
+    )
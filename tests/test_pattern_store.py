@@ -0,0 +1,81 @@
+"""Tests for the packed trait-pattern counters."""
+
+import random
+from itertools import combinations
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from modules.pattern_store import (
+    HASH_MULTIPLIER,
+    INITIAL_TABLE_BITS,
+    KEY_MASK,
+    ArrayPatternCounter,
+    PatternCounter,
+)
+
+
+def test_counters_agree_beyond_uint16():
+    counters = [PatternCounter(), ArrayPatternCounter()]
+    key = 0x1234_5678_9ABC_DEF0
+    for counter in counters:
+        counter.add([key] * 70_000)
+        counter.add(np.array([key, 42], dtype=np.uint64))
+    for counter in counters:
+        assert counter.counts([key, 42, 43]) == [70_001, 1, 0]
+        assert counter.all_below([key], 70_002)
+        assert not counter.all_below([key], 70_001)
+    keys, counts = counters[1].export()
+    restored = PatternCounter()
+    restored.load(keys, counts)
+    assert dict(restored.items()) == dict(counters[0].items())
+
+
+def colliding_keys(count: int, bits: int = INITIAL_TABLE_BITS):
+    """Return keys that all hash to the same home slot of a table of 2**bits slots."""
+    candidates = np.arange(1, 1 << 20, dtype=np.uint64)
+    slots = (candidates * np.uint64(HASH_MULTIPLIER)) >> np.uint64(64 - bits)
+    return candidates[slots == slots[0]][:count].tolist()
+
+
+@pytest.mark.parametrize("size", [2, 3])
+def test_keys_for_is_order_independent(size):
+    terms = [random.Random(i).getrandbits(64) for i in range(8)]
+    expected = {sum(subset) & KEY_MASK or 1 for subset in combinations(terms, size)}
+    for counter in (PatternCounter(), ArrayPatternCounter()):
+        shuffled = list(reversed(terms))
+        keys = counter.keys_for(shuffled, size)
+        assert len(keys) == len(expected)
+        assert {int(key) or 1 for key in keys} == expected
+
+
+def test_array_counter_collisions():
+    keys = colliding_keys(12)
+    counter = ArrayPatternCounter()
+    # Scalar path for short lists, vectorized path for arrays
+    counter.add(keys[:6])
+    counter.add(np.array(keys[3:] + keys[3:], dtype=np.uint64))
+    assert len(counter) == 12
+    assert counter.counts(keys) == [1, 1, 1, 3, 3, 3] + [2] * 6
+    assert counter.counts(np.array(keys, dtype=np.uint64)) == counter.counts(keys)
+    assert counter.counts(colliding_keys(13)[12:]) == [0]
+
+
+def test_array_counter_resize_matches_dict():
+    rng = random.Random(11)
+    pool = [rng.getrandbits(64) or 1 for _ in range(20_000)]
+    reference, counter = PatternCounter(), ArrayPatternCounter()
+    for _ in range(300):
+        batch = rng.sample(pool, rng.choice((5, 60)))
+        reference.add(batch)
+        counter.add(batch if len(batch) < 32 else np.array(batch, dtype=np.uint64))
+    assert len(counter) == len(reference)
+    assert dict(counter.items()) == dict(reference.items())
+
+    keys, counts = counter.export()
+    restored = ArrayPatternCounter()
+    restored.load(keys, counts)
+    assert dict(restored.items()) == dict(reference.items())
+    probe = pool[:500]
+    assert restored.counts(probe) == reference.counts(probe)
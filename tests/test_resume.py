@@ -0,0 +1,72 @@
+"""Tests for resuming into an existing output directory."""
+
+import json
+import os
+
+from modules.nft_generator import NFTGenerator
+
+
+def metadata_traits(output_dir):
+    """Return the trait tuples of every metadata file, by NFT ID."""
+    metadata_dir = os.path.join(output_dir, "metadata")
+    traits = {}
+    for name in os.listdir(metadata_dir):
+        with open(os.path.join(metadata_dir, name)) as f:
+            attributes = json.load(f)["attributes"]
+        traits[int(name.split(".")[0])] = tuple(
+            sorted((a["trait_type"], a["value"]) for a in attributes)
+        )
+    return traits
+
+
+def test_resume_after_adding_an_option(tmp_path, write_project):
+    write_project(["Blue", "Red", "Gray"])
+    NFTGenerator(
+        "config.json", "ruler.json", seed=3, validate_skip=True
+    ).generate_collection(5)
+    before = metadata_traits(tmp_path / "output")
+
+    # Every state file is rejected, but the outputs are still valid
+    write_project(["Blue", "Red", "Gray", "Green"])
+    generator = NFTGenerator("config.json", "ruler.json", seed=3, validate_skip=True)
+    assert generator._resume_pending_ids(12, "png") == list(range(6, 13))
+    # The adopted combinations are reserved before planning
+    assert len(generator.seen_combinations) == 5
+    generator.generate_collection(12)
+
+    after = metadata_traits(tmp_path / "output")
+    assert {nft_id: after[nft_id] for nft_id in before} == before
+    # 4 backgrounds x 3 bodies: the collection uses every combination once
+    assert len(set(after.values())) == 12
+
+
+def test_resume_without_state_files(tmp_path, write_project):
+    write_project(["Blue", "Red", "Gray"])
+    NFTGenerator(
+        "config.json", "ruler.json", seed=4, validate_skip=True
+    ).generate_collection(4)
+    for name in (
+        "run_journal.bin",
+        "seen_combinations.bin",
+        "tracker_state.bin",
+        "plan.json",
+    ):
+        os.remove(tmp_path / "output" / name)
+
+    generator = NFTGenerator("config.json", "ruler.json", seed=5, validate_skip=True)
+    generator.generate_collection(9)
+
+    assert sorted(generator.journal_records) == list(range(1, 10))
+    assert len(set(metadata_traits(tmp_path / "output").values())) == 9
+
+
+def test_success_rate_counts_outputs_from_earlier_runs(tmp_path, write_project, caplog):
+    write_project(["Blue", "Red", "Gray"])
+    NFTGenerator(
+        "config.json", "ruler.json", seed=6, validate_skip=True
+    ).generate_collection(6)
+
+    caplog.set_level("INFO")
+    generator = NFTGenerator("config.json", "ruler.json", seed=6, validate_skip=True)
+    generator.generate_collection(8)
+    assert "Success rate: 100.00% (2 rendered, 6 already rendered)" in caplog.text
@@ -0,0 +1,38 @@
+"""Tests for compiling ruler.json rules into exclusion bitsets."""
+
+from itertools import product
+
+
+def test_matches_pairwise_rule_check(small_ruler):
+    rules, options = small_ruler.rules, small_ruler.options
+    checked = 0
+    for values in product(*[[None] + names for names in options.values()]):
+        selected = {t: v for t, v in zip(options, values) if v is not None}
+        for trait_type, names in options.items():
+            if trait_type in selected:
+                continue
+            for value in names:
+                assert rules.is_valid(selected, trait_type, value) == (
+                    small_ruler.baseline_valid(selected, trait_type, value)
+                ), (selected, trait_type, value)
+                checked += 1
+    assert checked == 768
+
+
+def test_rules_apply_in_both_directions(small_ruler):
+    rules = small_ruler.rules
+    # Declared as Eyes -> Head, checked whichever is picked first
+    assert not rules.is_valid({"Eyes": "VR"}, "Head", "Helmet")
+    assert not rules.is_valid({"Head": "Helmet"}, "Eyes", "VR")
+    assert rules.is_valid({"Eyes": "Plain"}, "Head", "Helmet")
+
+
+def test_skipped_rules(small_ruler):
+    rules, index = small_ruler.rules, small_ruler.index
+    # The Eyes -> Eyes rule never applies and the Wings rule names an
+    # unknown trait type; every other rule is compiled
+    assert rules.rule_count == len(small_ruler.ruler.rules) - 2
+    plain = index.option_id("Eyes", "Plain")
+    assert not rules.exclusion_masks[plain] & index.trait_masks["Eyes"]
+    # Values that are not configured options carry no exclusions
+    assert rules.is_valid({"Body": "Robot"}, "Mouth", "Pipe")
@@ -0,0 +1,123 @@
+"""Tests for the run journal."""
+
+import os
+
+import pytest
+
+from modules.nft_generator import NFTGenerator
+from modules.run_journal import JournalRecord, OutputFiles, RunJournal
+from modules.state_store import StateFormatError, config_fingerprint
+
+FINGERPRINT = config_fingerprint("layers", [3, 4, 5])
+OTHER_FINGERPRINT = config_fingerprint("layers", [3, 4, 6])
+
+
+def make_record(nft_id: int, combination_id: int) -> JournalRecord:
+    return JournalRecord(
+        nft_id=nft_id,
+        combination_id=combination_id,
+        outputs=OutputFiles(
+            image_ext="png",
+            image_size=100 + nft_id,
+            image_mtime_ns=1_000_000 * nft_id,
+            image_digest=bytes([nft_id]) * 16,
+            metadata_size=50 + nft_id,
+            metadata_mtime_ns=2_000_000 * nft_id,
+            metadata_digest=bytes([nft_id + 1]) * 16,
+        ),
+    )
+
+
+class TestRunJournal:
+    @pytest.mark.parametrize("id_bits", [20, 100])
+    def test_round_trip(self, tmp_path, id_bits):
+        path = str(tmp_path / "journal.bin")
+        journal = RunJournal(path, id_bits, FINGERPRINT)
+        records = [make_record(i, (1 << (id_bits - 1)) + i) for i in range(1, 6)]
+        for record in records:
+            journal.append(record)
+        journal.close()
+        loaded = RunJournal(path, id_bits, FINGERPRINT).load()
+        assert loaded == {record.nft_id: record for record in records}
+
+    def test_later_record_supersedes(self, tmp_path):
+        path = str(tmp_path / "journal.bin")
+        journal = RunJournal(path, 20, FINGERPRINT)
+        journal.append(make_record(1, 10))
+        journal.append(make_record(1, 11))
+        journal.close()
+        replay = RunJournal(path, 20, FINGERPRINT)
+        assert replay.load()[1].combination_id == 11
+        assert replay.records_on_disk == 2
+
+    def test_torn_tail(self, tmp_path):
+        path = str(tmp_path / "journal.bin")
+        journal = RunJournal(path, 20, FINGERPRINT)
+        journal.append(make_record(1, 10))
+        journal.append(make_record(2, 20))
+        journal.close()
+        with open(path, "r+b") as f:
+            f.truncate(os.path.getsize(path) - 5)
+        assert list(RunJournal(path, 20, FINGERPRINT).load()) == [1]
+        # Appending after the torn record keeps the records aligned
+        journal = RunJournal(path, 20, FINGERPRINT)
+        journal.append(make_record(3, 30))
+        journal.close()
+        assert sorted(RunJournal(path, 20, FINGERPRINT).load()) == [1, 3]
+
+    def test_compact(self, tmp_path):
+        path = str(tmp_path / "journal.bin")
+        journal = RunJournal(path, 20, FINGERPRINT)
+        for combination_id in range(5):
+            journal.append(make_record(1, combination_id))
+        journal.append(make_record(2, 7))
+        journal.sync()
+        records = journal.load()
+        journal.compact(records[nft_id] for nft_id in sorted(records))
+        assert journal.records_on_disk == 2
+        # Compaction reopens a journal that was open for appending
+        journal.append(make_record(3, 8))
+        journal.close()
+        replay = RunJournal(path, 20, FINGERPRINT)
+        assert {k: r.combination_id for k, r in replay.load().items()} == {1: 4, 2: 7, 3: 8}
+        assert replay.records_on_disk == 3
+
+    def test_fingerprint_mismatch(self, tmp_path):
+        path = str(tmp_path / "journal.bin")
+        journal = RunJournal(path, 20, FINGERPRINT)
+        journal.append(make_record(1, 10))
+        journal.close()
+        other = RunJournal(path, 20, OTHER_FINGERPRINT)
+        with pytest.raises(StateFormatError):
+            other.load()
+        # Opening for append moves the old journal aside and starts anew
+        other.append(make_record(2, 20))
+        other.close()
+        assert list(RunJournal(path, 20, OTHER_FINGERPRINT).load()) == [2]
+        assert list(RunJournal(f"{path}.stale", 20, FINGERPRINT).load()) == [1]
+
+    def test_record_size_mismatch(self, tmp_path):
+        path = str(tmp_path / "journal.bin")
+        RunJournal(path, 20, FINGERPRINT).compact([make_record(1, 10)])
+        wide = RunJournal(path, 100, FINGERPRINT)
+        wide.append(make_record(2, 1 << 80))
+        wide.close()
+        assert RunJournal(path, 100, FINGERPRINT).load()[2].combination_id == 1 << 80
+
+
+def test_config_change_between_runs(tmp_path, write_project):
+    write_project(["Blue", "Red", "Gray"])
+    NFTGenerator("config.json", "ruler.json", seed=1, validate_skip=True).generate_collection(4)
+
+    # Dropping an option changes the fingerprint of every state file
+    write_project(["Blue", "Red"])
+    generator = NFTGenerator("config.json", "ruler.json", seed=1, validate_skip=True)
+    generator.generate_collection(4)
+
+    assert not generator.failed_attempts
+    assert sorted(generator.journal_records) == [1, 2, 3, 4]
+    assert sorted(os.listdir(tmp_path / "output" / "metadata")) == [
+        f"{nft_id}.json" for nft_id in range(1, 5)
+    ]
+    journal_path = str(tmp_path / "output" / "run_journal.bin")
+    assert sorted(RunJournal(journal_path, 3, generator._space_fingerprint).load()) == [1, 2, 3, 4]
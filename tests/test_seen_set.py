@@ -0,0 +1,76 @@
+"""Tests for the set of planned combination IDs."""
+
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from modules.pattern_store import HASH_MULTIPLIER
+from modules.seen_set import INITIAL_TABLE_BITS, CombinationTable, create_combination_set
+
+
+def colliding_ids(count: int, bits: int = INITIAL_TABLE_BITS):
+    """Return IDs that all hash to the same home slot of a table of 2**bits slots."""
+    candidates = np.arange(1, 1 << 22, dtype=np.uint64)
+    slots = (candidates * np.uint64(HASH_MULTIPLIER)) >> np.uint64(64 - bits)
+    return candidates[slots == slots[0]][:count].tolist()
+
+
+class TestCombinationTable:
+    def test_add_and_contains(self):
+        table = CombinationTable()
+        for combination_id in (5, 1 << 63, (1 << 64) - 1, 5):
+            table.add(combination_id)
+        assert len(table) == 3
+        assert 5 in table and (1 << 63) in table and (1 << 64) - 1 in table
+        assert 6 not in table
+
+    def test_zero_id(self):
+        table = CombinationTable()
+        assert 0 not in table
+        table.add(0)
+        table.update([0, 0, 3])
+        assert 0 in table
+        assert len(table) == 2
+        assert sorted(table) == [0, 3]
+
+    def test_collisions(self):
+        ids = colliding_ids(20)
+        assert len(ids) == 20
+        table = CombinationTable()
+        for combination_id in ids[:10]:
+            table.add(combination_id)
+        table.update(ids[10:] + ids[:5])
+        assert len(table) == 20
+        assert all(combination_id in table for combination_id in ids)
+        assert sorted(table) == sorted(ids)
+        # A probe over the run of colliding IDs still finds an absent ID missing
+        assert colliding_ids(21)[20] not in table
+
+    def test_resize_matches_set(self):
+        rng = random.Random(7)
+        ids = [rng.getrandbits(64) for _ in range(120_000)]
+        table = CombinationTable()
+        for combination_id in ids[:60_000]:
+            table.add(combination_id)
+        table.update(ids[60_000:] + ids[:1000])
+        assert len(table) == len(set(ids))
+        assert set(table) == set(ids)
+        assert all(combination_id in table for combination_id in ids[::97])
+        assert not any(rng.getrandbits(64) in table for _ in range(1000))
+
+    def test_update_from_buffer(self):
+        from array import array
+
+        table = CombinationTable(capacity=10)
+        table.update(array("Q", [1, 2, 3, 2]))
+        assert sorted(table) == [1, 2, 3]
+
+
+def test_create_combination_set():
+    assert isinstance(create_combination_set(64), CombinationTable)
+    wide = create_combination_set(65)
+    assert isinstance(wide, set)
+    wide.add(1 << 64)
+    assert 1 << 64 in wide
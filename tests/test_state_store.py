@@ -0,0 +1,127 @@
+"""Tests for the binary resume-state files."""
+
+import io
+import os
+from array import array
+
+import pytest
+
+from modules.state_store import (
+    HEADER,
+    KIND_COMBINATION_LOG,
+    KIND_SNAPSHOT,
+    CombinationLog,
+    StateFormatError,
+    config_fingerprint,
+    pack_header,
+    read_header,
+    read_snapshot,
+    write_snapshot,
+)
+
+FINGERPRINT = config_fingerprint("layers", [3, 4, 5])
+OTHER_FINGERPRINT = config_fingerprint("layers", [3, 4, 6])
+
+
+class TestHeader:
+    def test_round_trip(self):
+        f = io.BytesIO(pack_header(KIND_COMBINATION_LOG, 16, FINGERPRINT))
+        assert read_header(f, KIND_COMBINATION_LOG, FINGERPRINT) == 16
+        assert f.tell() == HEADER.size
+
+    def test_truncated(self):
+        raw = pack_header(KIND_COMBINATION_LOG, 8, FINGERPRINT)
+        with pytest.raises(StateFormatError):
+            read_header(io.BytesIO(raw[:-1]), KIND_COMBINATION_LOG, FINGERPRINT)
+
+    def test_wrong_kind(self):
+        f = io.BytesIO(pack_header(KIND_SNAPSHOT, 0, FINGERPRINT))
+        with pytest.raises(StateFormatError):
+            read_header(f, KIND_COMBINATION_LOG, FINGERPRINT)
+
+    def test_fingerprint_mismatch(self):
+        f = io.BytesIO(pack_header(KIND_COMBINATION_LOG, 8, FINGERPRINT))
+        with pytest.raises(StateFormatError):
+            read_header(f, KIND_COMBINATION_LOG, OTHER_FINGERPRINT)
+
+    def test_fingerprint_is_stable(self):
+        assert config_fingerprint({"b": 1, "a": 2}) == config_fingerprint({"a": 2, "b": 1})
+        assert FINGERPRINT != OTHER_FINGERPRINT
+
+
+class TestCombinationLog:
+    @pytest.mark.parametrize("id_bits", [20, 64, 130])
+    def test_append_and_load(self, tmp_path, id_bits):
+        log = CombinationLog(str(tmp_path / "log.bin"), id_bits, FINGERPRINT)
+        first = [0, 1, (1 << id_bits) - 1]
+        second = [12345, 1 << (id_bits - 1)]
+        log.append(first)
+        log.append(second)
+        assert list(log.load()) == first + second
+
+    def test_empty_log(self, tmp_path):
+        log = CombinationLog(str(tmp_path / "log.bin"), 20, FINGERPRINT)
+        log.append([])
+        assert list(log.load()) == []
+
+    def test_truncated_tail_is_dropped(self, tmp_path):
+        path = tmp_path / "log.bin"
+        log = CombinationLog(str(path), 20, FINGERPRINT)
+        log.append([7, 8, 9])
+        with open(path, "r+b") as f:
+            f.truncate(os.path.getsize(path) - 3)
+        assert list(log.load()) == [7, 8]
+        # The torn record is replaced, not extended
+        log.append([10])
+        assert list(log.load()) == [7, 8, 10]
+
+    def test_fingerprint_mismatch(self, tmp_path):
+        path = str(tmp_path / "log.bin")
+        CombinationLog(path, 20, FINGERPRINT).append([1, 2, 3])
+        log = CombinationLog(path, 20, OTHER_FINGERPRINT)
+        with pytest.raises(StateFormatError):
+            log.load()
+        # Appending replaces the log instead of mixing configurations
+        log.append([4])
+        assert list(log.load()) == [4]
+
+    def test_width_mismatch(self, tmp_path):
+        path = str(tmp_path / "log.bin")
+        CombinationLog(path, 20, FINGERPRINT).append([1, 2])
+        wide = CombinationLog(path, 100, FINGERPRINT)
+        with pytest.raises(StateFormatError):
+            wide.load()
+        wide.append([1 << 80])
+        assert list(wide.load()) == [1 << 80]
+
+    def test_rewrite(self, tmp_path):
+        log = CombinationLog(str(tmp_path / "log.bin"), 20, FINGERPRINT)
+        log.append([1, 2, 3])
+        log.rewrite([5])
+        assert list(log.load()) == [5]
+
+
+class TestSnapshot:
+    def test_round_trip(self, tmp_path):
+        path = str(tmp_path / "state.bin")
+        sections = {
+            "counts": array("I", [0, 1, 2**32 - 1]),
+            "keys": array("Q", [2**64 - 1, 3]),
+            "empty": array("H"),
+        }
+        write_snapshot(path, FINGERPRINT, sections)
+        assert read_snapshot(path, FINGERPRINT) == sections
+
+    def test_truncated_section(self, tmp_path):
+        path = str(tmp_path / "state.bin")
+        write_snapshot(path, FINGERPRINT, {"keys": array("Q", range(10))})
+        with open(path, "r+b") as f:
+            f.truncate(os.path.getsize(path) - 4)
+        with pytest.raises(StateFormatError):
+            read_snapshot(path, FINGERPRINT)
+
+    def test_fingerprint_mismatch(self, tmp_path):
+        path = str(tmp_path / "state.bin")
+        write_snapshot(path, FINGERPRINT, {"keys": array("Q", [1])})
+        with pytest.raises(StateFormatError):
+            read_snapshot(path, OTHER_FINGERPRINT)
@@ -0,0 +1,112 @@
+"""Tests for sampling traits from their still-legal domains."""
+
+import math
+from collections import Counter
+from itertools import product
+
+from modules.trait_sampler import CounterRandom, TraitSampler
+
+DRAWS = 30_000
+
+
+def make_sampler(setup) -> TraitSampler:
+    return TraitSampler(
+        setup.index, setup.rules, list(setup.options), setup.rarity, setup.weights
+    )
+
+
+def key(traits):
+    return tuple(sorted(traits.items()))
+
+
+def is_valid(setup, traits):
+    """Check a finished combination pair by pair with the baseline rule check."""
+    selected = {}
+    for trait_type, value in traits.items():
+        if not setup.baseline_valid(selected, trait_type, value):
+            return False
+        selected[trait_type] = value
+    return True
+
+
+def rejection_distribution(setup):
+    """
+    Exact output distribution of the old sampler.
+
+    It retried each pick until the rules accepted it and restarted the
+    whole NFT when a trait type had no acceptable option.
+    """
+    distribution = Counter()
+
+    def walk(depth, selected, p):
+        if depth == len(setup.options):
+            distribution[key(selected)] += p
+            return
+        trait_type = list(setup.options)[depth]
+        include = setup.rarity[trait_type] * 20 / 100
+        if include < 1:
+            walk(depth + 1, selected, p * (1 - include))
+        legal = [
+            (value, weight)
+            for value, weight in zip(
+                setup.options[trait_type], setup.weights[trait_type]
+            )
+            if setup.baseline_valid(selected, trait_type, value)
+        ]
+        total = sum(weight for _, weight in legal)
+        for value, weight in legal:
+            walk(
+                depth + 1, {**selected, trait_type: value}, p * include * weight / total
+            )
+
+    walk(0, {}, 1.0)
+    total = sum(distribution.values())
+    return {combination: p / total for combination, p in distribution.items()}
+
+
+def sample_all(sampler, seed=7):
+    results = [sampler.sample(CounterRandom(seed, i)) for i in range(DRAWS)]
+    return [traits for traits in results if traits is not None], results.count(None)
+
+
+def test_outputs_are_exactly_the_valid_combinations(small_ruler):
+    expected = set()
+    for values in product(*[[None] + names for names in small_ruler.options.values()]):
+        traits = {t: v for t, v in zip(small_ruler.options, values) if v is not None}
+        if all(
+            traits.get(t) for t, r in small_ruler.rarity.items() if r == 5
+        ) and is_valid(small_ruler, traits):
+            expected.add(key(traits))
+
+    drawn, _ = sample_all(make_sampler(small_ruler))
+    assert all(is_valid(small_ruler, traits) for traits in drawn)
+    assert {key(traits) for traits in drawn} == expected
+
+
+def test_matches_rejection_sampler_distribution(small_ruler):
+    expected = rejection_distribution(small_ruler)
+    drawn, _ = sample_all(make_sampler(small_ruler))
+    counts = Counter(key(traits) for traits in drawn)
+    assert set(counts) <= set(expected)
+
+    n = len(drawn)
+    chi_square = sum((counts[c] - n * p) ** 2 / (n * p) for c, p in expected.items())
+    # Wilson-Hilferty approximation of the 99.9th percentile
+    df = len(expected) - 1
+    z = 3.09
+    critical = df * (1 - 2 / (9 * df) + z * math.sqrt(2 / (9 * df))) ** 3
+    assert chi_square < critical
+
+
+def test_dead_ends_are_counted(small_ruler):
+    sampler = make_sampler(small_ruler)
+    index, masks = small_ruler.index, small_ruler.rules.exclusion_masks
+    # Crown rules out 3D and Plain, and VR rules out Crown
+    crown = masks[index.option_id("Head", "Crown")]
+    assert sampler.domain("Eyes", crown) == []
+    assert sampler.domain_table("Eyes", crown) is None
+    assert sampler.domain("Eyes", 0) == [0, 1, 2]
+
+    _, dead = sample_all(sampler)
+    assert dead > 0
+    assert sampler.dead_ends == dead
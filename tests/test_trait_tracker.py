@@ -0,0 +1,168 @@
+"""Tests for the trait pattern and signature tracker."""
+
+import random
+from collections import Counter
+from itertools import combinations
+
+import pytest
+
+from modules.metadata_manager import MetadataManager
+from modules.trait_index import TraitIndex
+from modules.trait_tracker import SelectionLookahead, TraitTracker
+
+OPTIONS = {
+    "Background": ["Blue", "Red"],
+    "Body": ["Cat", "Dog"],
+    "Eyewear": ["None", "Shades"],
+    "Head": ["Cap", "Hat"],
+}
+
+
+def make_tracker(**kwargs) -> TraitTracker:
+    tracker = TraitTracker(max_similar_combinations=10, **kwargs)
+    tracker.configure(TraitIndex(list(OPTIONS), OPTIONS))
+    return tracker
+
+
+def test_custom_signature_group_is_enforced():
+    tracker = make_tracker(signature_traits=[["Background", "Body"]])
+    first = {"Background": "Blue", "Body": "Cat", "Eyewear": "None", "Head": "Cap"}
+    assert tracker.is_unique_enough(first)
+    tracker.update_patterns(first)
+
+    # Same Background and Body with everything else changed
+    assert not tracker.is_unique_enough(dict(first, Eyewear="Shades", Head="Hat"))
+    # Same Body, Eyewear and Head: only the default group would reject it
+    assert tracker.is_unique_enough(dict(first, Background="Red"))
+
+
+def test_signature_group_with_unknown_trait_type_is_dropped():
+    tracker = make_tracker(signature_traits=[["Body", "Wings"]])
+    assert tracker.signature_groups == []
+
+
+def test_stats_keep_bsh_key_for_default_group(tmp_path):
+    manager = MetadataManager(str(tmp_path), str(tmp_path / "metadata"))
+    traits = {"Background": "Blue", "Body": "Cat", "Eyewear": "None", "Head": "Cap"}
+
+    tracker = make_tracker()
+    tracker.update_patterns(traits)
+    stats = manager.generate_collection_stats([], tracker, Counter())
+    assert stats["unique_signature_combinations"] == {"Body, Eyewear, Head": 1}
+    assert stats["unique_bsh_combinations"] == 1
+
+    tracker = make_tracker(signature_traits=[["Background", "Body"]])
+    tracker.update_patterns(traits)
+    stats = manager.generate_collection_stats([], tracker, Counter())
+    assert stats["unique_signature_combinations"] == {"Background, Body": 1}
+    assert "unique_bsh_combinations" not in stats
+
+
+WIDE_OPTIONS = {f"T{i}": ["a", "b", "c"] for i in range(8)}
+
+
+def make_wide_tracker(
+    pattern_size: int, max_similar: int, signature_traits=()
+) -> TraitTracker:
+    tracker = TraitTracker(
+        max_similar_combinations=max_similar,
+        pattern_size=pattern_size,
+        signature_traits=signature_traits,
+    )
+    tracker.configure(TraitIndex(list(WIDE_OPTIONS), WIDE_OPTIONS))
+    return tracker
+
+
+def random_traits(rng: random.Random):
+    """Return a random selection in which each trait type is optional."""
+    return {
+        trait_type: rng.choice(names)
+        for trait_type, names in WIDE_OPTIONS.items()
+        if rng.random() < 0.8
+    }
+
+
+@pytest.mark.parametrize("pattern_size", [2, 3, 5])
+@pytest.mark.parametrize("max_similar", [1, 2])
+def test_pattern_counts_match_subset_reference(pattern_size, max_similar):
+    tracker = make_wide_tracker(pattern_size, max_similar)
+    reference = Counter()
+    rng = random.Random(pattern_size * 10 + max_similar)
+
+    for _ in range(300):
+        traits = random_traits(rng)
+        subsets = [frozenset(s) for s in combinations(traits.items(), pattern_size)]
+        expected = all(reference[s] < max_similar for s in subsets)
+        assert tracker.is_unique_enough(traits) == expected
+        if expected:
+            tracker.update_patterns(traits)
+            reference.update(subsets)
+
+    assert len(tracker.trait_patterns) == len(reference)
+    assert sorted(count for _, count in tracker.trait_patterns.items()) == sorted(
+        reference.values()
+    )
+
+
+def test_pattern_size_above_included_traits_counts_nothing():
+    tracker = make_wide_tracker(5, 1)
+    short = {"T0": "a", "T1": "a", "T2": "a", "T3": "a"}
+    tracker.update_patterns(short)
+    assert len(tracker.trait_patterns) == 0
+    assert tracker.get_trait_pattern(short) == []
+    assert tracker.is_unique_enough(short)
+
+    tracker = make_wide_tracker(len(WIDE_OPTIONS) + 1, 1)
+    full = {trait_type: "a" for trait_type in WIDE_OPTIONS}
+    tracker.update_patterns(full)
+    assert len(tracker.trait_patterns) == 0
+    assert tracker.is_unique_enough(full)
+
+
+def blocked_picks(lookahead: SelectionLookahead, index: TraitIndex, traits):
+    """Pick ``traits`` in order and return the trait types that were blocked."""
+    blocked = []
+    lookahead.reset()
+    for trait_type, value in traits.items():
+        option_index = index.option_names[trait_type].index(value)
+        bit = 1 << (index.offsets[trait_type] + option_index)
+        if lookahead.blocked(trait_type) & bit:
+            blocked.append(trait_type)
+        lookahead.pick(trait_type, option_index)
+    return blocked
+
+
+@pytest.mark.parametrize("pattern_size", [2, 3])
+def test_lookahead_blocks_exactly_what_the_tracker_rejects(pattern_size):
+    tracker = make_wide_tracker(pattern_size, 2, signature_traits=[["T0", "T1", "T2"]])
+    rng = random.Random(pattern_size)
+    recorded = []
+    for _ in range(60):
+        traits = random_traits(rng)
+        if tracker.is_unique_enough(traits):
+            tracker.update_patterns(traits)
+            recorded.append(traits)
+    tracker.enable_lookahead(recorded)
+    lookahead = SelectionLookahead(tracker)
+
+    seen_blocked = 0
+    for _ in range(400):
+        traits = random_traits(rng)
+        blocked = blocked_picks(lookahead, tracker.index, traits)
+        if tracker.is_unique_enough(traits):
+            # Never block a combination the tracker would accept
+            assert not blocked
+            tracker.update_patterns(traits)
+        elif blocked:
+            seen_blocked += 1
+            # The picks up to the blocked one exceed the limits on their own,
+            # whatever the remaining trait types are
+            prefix = {}
+            for trait_type, value in traits.items():
+                prefix[trait_type] = value
+                if trait_type == blocked[0]:
+                    break
+            for _ in range(5):
+                rest = {t: v for t, v in random_traits(rng).items() if t not in prefix}
+                assert not tracker.is_unique_enough({**prefix, **rest})
+    assert seen_blocked > 0